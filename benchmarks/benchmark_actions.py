@@ -0,0 +1,86 @@
+""" Benchmark of the application of actions to the body parts.
+
+Measures the time to apply the actions of an agent with a platform, a head, eyes, arms and hands,
+from a dictionary of actions dispatched to all the body parts (previous implementation),
+from a dictionary dispatched directly to the handlers of each actuator,
+and from a flat array of actions.
+
+Usage:
+    python benchmarks/benchmark_actions.py --n-repeats 10000
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from simple_playgrounds.agents import HeadEyeAgent
+from simple_playgrounds.agents.controllers import Random
+from simple_playgrounds.agents.parts import Arm, Hand, HolonomicPlatform
+from simple_playgrounds.playgrounds import SingleRoom
+
+
+def make_agent():
+    """
+    Creates an interactive agent with a head, eyes, and two arms of two segments with hands.
+    """
+
+    agent = HeadEyeAgent(controller=Random(), interactive=True, platform=HolonomicPlatform)
+
+    for side in [1, -1]:
+
+        arm = Arm(agent.base_platform, position_anchor=[15 * side, 0], angle_offset=-side * math.pi / 2,
+                  rotation_range=math.pi)
+        arm_2 = Arm(arm, position_anchor=arm.extremity_anchor_point, rotation_range=9 * math.pi / 5)
+        hand = Hand(arm_2, position_anchor=arm_2.extremity_anchor_point, radius=8, rotation_range=0,
+                    can_grasp=True, can_activate=True)
+
+        for part in [arm, arm_2, hand]:
+            agent.add_body_part(part)
+
+    # Assign controller once all body parts are declared
+    agent.controller = Random()
+
+    return agent
+
+
+def apply_to_all_parts(agent, actions):
+    """ Offers each action to all the body parts, as agents did before dispatch tables. """
+
+    for actuator, value in actions.items():
+        for part in agent.parts:
+            part.apply_action(actuator, value)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n-repeats', type=int, default=10000)
+    args = parser.parse_args()
+
+    agent = make_agent()
+    playground = SingleRoom(size=(300, 300))
+    playground.add_agent(agent)
+
+    actuators = agent.get_all_actuators()
+    rng = np.random.default_rng(0)
+    vector = rng.uniform(-1, 1, len(actuators))
+    actions = dict(zip(actuators, vector.tolist()))
+
+    print('{} body parts, {} actuators'.format(len(agent.parts), len(actuators)))
+
+    for name, apply in [('all parts', lambda: apply_to_all_parts(agent, actions)),
+                        ('dispatch table', lambda: agent.apply_actions_to_body_parts(actions)),
+                        ('flat array', lambda: agent.apply_action_vector(vector))]:
+
+        start = time.perf_counter()
+        for _ in range(args.n_repeats):
+            apply()
+        duration = time.perf_counter() - start
+
+        print('{}: {:.1f} us per step'.format(name, duration / args.n_repeats * 1e6))
+
+
+if __name__ == '__main__':
+    main()
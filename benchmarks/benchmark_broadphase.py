@@ -0,0 +1,121 @@
+""" Benchmark of the collision broadphase.
+
+Measures the number of engine steps per second, with the default bounding box tree of pymunk,
+and with spatial hashes: tuned automatically by Playground.configure_broadphase
+(cells twice as large as the median shape), and with half and twice the tuned cell size.
+Scenes are a SingleRoom crowded with movable elements, and large sparse ConnectedRooms2D,
+with agents equipped with a Lidar. Each measure is the best of several repeats.
+
+Usage:
+    python benchmarks/benchmark_broadphase.py --n-steps 100 --repeats 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from simple_playgrounds import Engine
+from simple_playgrounds.agents import BaseAgent
+from simple_playgrounds.agents.controllers import Random
+from simple_playgrounds.agents.parts import ForwardPlatform
+from simple_playgrounds.agents.sensors import Lidar
+from simple_playgrounds.playgrounds import SingleRoom
+from simple_playgrounds.playgrounds.empty import ConnectedRooms2D
+from simple_playgrounds.playgrounds.scene_elements import Basic
+
+SCENES = {
+    'room-100': (SingleRoom, {'size': (400, 400)}, 100),
+    'room-1000': (SingleRoom, {'size': (800, 800)}, 1000),
+    'large-100': (ConnectedRooms2D, {'size': (3000, 3000), 'room_layout': (6, 6)}, 100),
+    'large-2000': (ConnectedRooms2D, {'size': (3000, 3000), 'room_layout': (6, 6)}, 2000),
+}
+
+
+def make_engine(scene, n_agents):
+    """
+    Creates an engine with movable elements placed randomly in a scene, and agents with a Lidar.
+
+    Args:
+        scene: name of the scene in SCENES.
+        n_agents: number of agents.
+
+    Returns:
+        Engine.
+
+    """
+
+    playground_class, playground_params, n_elements = SCENES[scene]
+    playground = playground_class(seed=0, **playground_params)
+
+    width, length = playground.size
+    rng = np.random.default_rng(0)
+
+    for _ in range(n_elements):
+        position = [rng.uniform(20, width - 20), rng.uniform(20, length - 20), 0]
+        radius = rng.uniform(5, 12)
+        playground.add_scene_element(Basic(position, default_config_key='circle', radius=radius, mass=1, movable=True))
+
+    for _ in range(n_agents):
+        agent = BaseAgent(controller=Random(), platform=ForwardPlatform)
+        agent.add_sensor(Lidar(anchor=agent.base_platform, invisible_elements=agent.parts, resolution=64))
+        playground.add_agent(agent)
+
+    return Engine(playground, time_limit=False)
+
+
+def run_benchmark(scene, broadphase, n_agents, n_steps):
+    """
+    Runs the agents randomly.
+
+    Args:
+        scene: name of the scene in SCENES.
+        broadphase: 'tree', or scale of the tuned cell size of the spatial hash.
+        n_agents: number of agents.
+        n_steps: number of steps.
+
+    Returns:
+        Steps per second, and spatial hash parameters.
+
+    """
+
+    engine = make_engine(scene, n_agents)
+    playground = engine.playground
+
+    params = None
+    if broadphase != 'tree':
+        cell_size, _ = playground.configure_broadphase()
+        params = playground.configure_broadphase(cell_size=cell_size * broadphase)
+
+    start = time.perf_counter()
+
+    for _ in range(n_steps):
+        engine.step(engine.get_actions())
+        engine.update_observations()
+
+    return n_steps / (time.perf_counter() - start), params
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenes', nargs='+', default=list(SCENES), choices=list(SCENES))
+    parser.add_argument('--n-agents', type=int, default=4)
+    parser.add_argument('--n-steps', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    for scene in args.scenes:
+
+        for broadphase in ['tree', 1, 0.5, 2]:
+
+            results = [run_benchmark(scene, broadphase, args.n_agents, args.n_steps) for _ in range(args.repeats)]
+            steps_per_second = max(result[0] for result in results)
+            params = results[0][1]
+
+            name = 'tree' if params is None else 'hash (cell {:.1f}, count {})'.format(*params)
+            print('{}: {} {:.0f} steps/s'.format(scene, name, steps_per_second))
+
+
+if __name__ == '__main__':
+    main()
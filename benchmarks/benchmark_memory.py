@@ -0,0 +1,123 @@
+""" Benchmark of the memory used by entities and agents.
+
+Measures, with tracemalloc, the Python memory allocated per scene element and per agent
+(with a Lidar, a camera, a semantic sensor and a touch sensor), once added to playgrounds.
+Memory allocated by SDL for pygame surfaces is not traced.
+
+Usage:
+    python benchmarks/benchmark_memory.py --n-entities 500 --n-agents 50
+
+Use --top to print the lines of code allocating the most memory.
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from simple_playgrounds.agents import HeadAgent
+from simple_playgrounds.agents.controllers import Random
+from simple_playgrounds.agents.parts import ForwardPlatform
+from simple_playgrounds.agents.sensors import Lidar, RgbCamera, SemanticRay, Touch
+from simple_playgrounds.playgrounds import SingleRoom
+from simple_playgrounds.playgrounds.scene_elements import Basic
+
+
+def create_entities(n_entities):
+    """
+    Creates scene elements of different shapes, and adds them to a playground.
+
+    Returns:
+        playground.
+
+    """
+
+    playground = SingleRoom(size=(400, 400), seed=0)
+
+    for index in range(n_entities):
+        shape = ['circle', 'square', 'pentagon'][index % 3]
+        playground.add_scene_element(Basic([200, 200, 0], default_config_key=shape, radius=8))
+
+    return playground
+
+
+def create_agents(n_agents):
+    """
+    Creates agents with a head and 4 sensors, and adds them to a playground.
+
+    Returns:
+        playground.
+
+    """
+
+    playground = SingleRoom(size=(400, 400), seed=0)
+
+    for _ in range(n_agents):
+
+        agent = HeadAgent(controller=Random(), platform=ForwardPlatform)
+
+        sensor_params = {'anchor': agent.base_platform, 'invisible_elements': agent.parts}
+        agent.add_sensor(Lidar(**sensor_params))
+        agent.add_sensor(RgbCamera(**sensor_params))
+        agent.add_sensor(SemanticRay(**sensor_params))
+        agent.add_sensor(Touch(**sensor_params))
+
+        playground.add_agent(agent)
+
+    return playground
+
+
+def measure(function, n_objects, n_top=0):
+    """
+    Measures the memory allocated by function, per object created.
+
+    Args:
+        function: function creating n_objects.
+        n_objects: number of objects.
+        n_top: number of allocation sites to print.
+
+    Returns:
+        Number of bytes per object.
+
+    """
+
+    # Warm-up, so that caches and imports are not counted
+    function(1)
+
+    gc.collect()
+    tracemalloc.start()
+    snapshot_start = tracemalloc.take_snapshot()
+    memory_start = tracemalloc.get_traced_memory()[0]
+
+    objects = function(n_objects)
+
+    gc.collect()
+    memory_end = tracemalloc.get_traced_memory()[0]
+
+    if n_top:
+        snapshot_end = tracemalloc.take_snapshot()
+        for stat in snapshot_end.compare_to(snapshot_start, 'lineno')[:n_top]:
+            print('    {}'.format(stat))
+
+    tracemalloc.stop()
+    del objects
+
+    return (memory_end - memory_start) / n_objects
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n-entities', type=int, default=500)
+    parser.add_argument('--n-agents', type=int, default=50)
+    parser.add_argument('--top', type=int, default=0)
+    args = parser.parse_args()
+
+    bytes_per_entity = measure(create_entities, args.n_entities, args.top)
+    print('{:.0f} bytes per entity'.format(bytes_per_entity))
+
+    bytes_per_agent = measure(create_agents, args.n_agents, args.top)
+    print('{:.0f} bytes per agent'.format(bytes_per_agent))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+""" Benchmark of ray sensors in cluttered rooms.
+
+Measures the time to update 360-ray sensors (Lidar, RgbCamera, SemanticRay, SemanticCones)
+in a room filled with a varying number of obstacles.
+
+Usage:
+    python benchmarks/benchmark_ray_sensors.py --n-obstacles 0 50 200 --n-steps 100
+
+Use --static-geometry to resolve hits on walls with the precomputed static geometry.
+"""
+
+import argparse
+import time
+
+from simple_playgrounds import Engine
+from simple_playgrounds.agents import BaseAgent
+from simple_playgrounds.agents.controllers import Random
+from simple_playgrounds.agents.parts import ForwardPlatform
+from simple_playgrounds.agents.sensors import Lidar, RgbCamera, SemanticRay, SemanticCones
+from simple_playgrounds.playgrounds import SingleRoom
+from simple_playgrounds.playgrounds.scene_elements import Basic
+from simple_playgrounds.utils.position_utils import PositionAreaSampler
+
+
+def build_cluttered_room(n_obstacles, size=(400, 400), seed=0, static_geometry=False):
+    """
+    Creates a room filled with randomly placed obstacles, and an agent with 360-ray sensors.
+
+    Args:
+        n_obstacles: number of obstacles.
+        size: size of the room.
+        seed: seed of the playground.
+        static_geometry: if True, sensors use the static geometry of the playground.
+
+    Returns:
+        playground, agent.
+
+    """
+
+    playground = SingleRoom(size=size, seed=seed)
+
+    area = PositionAreaSampler(center=(size[0] / 2, size[1] / 2), area_shape='rectangle',
+                               width_length=(size[0] - 20, size[1] - 20))
+
+    for index in range(n_obstacles):
+        shape = ['circle', 'square', 'pentagon'][index % 3]
+        playground.add_scene_element(Basic(area, default_config_key=shape, radius=8))
+
+    agent = BaseAgent(controller=Random(), platform=ForwardPlatform)
+
+    sensor_params = {'anchor': agent.base_platform, 'invisible_elements': agent.parts,
+                     'fov': 360, 'max_range': 300, 'static_geometry': static_geometry}
+
+    agent.add_sensor(Lidar(resolution=360, name='lidar', **sensor_params))
+    agent.add_sensor(RgbCamera(resolution=360, name='rgb', **sensor_params))
+    agent.add_sensor(SemanticRay(resolution=360, name='semantic_ray', **sensor_params))
+    agent.add_sensor(SemanticCones(n_cones=36, rays_per_cone=10, name='semantic_cones',
+                                   **sensor_params))
+
+    playground.add_agent(agent)
+
+    return playground, agent
+
+
+def run_benchmark(n_obstacles, n_steps, static_geometry=False):
+    """
+    Runs the agent randomly, and measures the time spent updating each sensor.
+
+    Returns:
+        Dictionary {sensor name: mean update time in ms}.
+
+    """
+
+    playground, agent = build_cluttered_room(n_obstacles, static_geometry=static_geometry)
+    engine = Engine(playground, time_limit=n_steps)
+
+    timings = {sensor.name: 0. for sensor in agent.sensors}
+
+    while engine.game_on:
+
+        engine.step(engine.get_actions())
+
+        for sensor in agent.sensors:
+            start = time.perf_counter()
+            sensor.update(playground=playground)
+            timings[sensor.name] += time.perf_counter() - start
+
+    return {name: 1000 * total / n_steps for name, total in timings.items()}
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n-obstacles', type=int, nargs='+', default=[0, 50, 200])
+    parser.add_argument('--n-steps', type=int, default=100)
+    parser.add_argument('--static-geometry', action='store_true')
+    args = parser.parse_args()
+
+    for n_obstacles in args.n_obstacles:
+        timings = run_benchmark(n_obstacles, args.n_steps, args.static_geometry)
+        results = ', '.join('{}: {:.2f} ms'.format(name, value) for name, value in timings.items())
+        print('{} obstacles - {}'.format(n_obstacles, results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+""" Benchmark of engines served over a local socket.
+
+Measures the number of engine steps per second, for engines stepped in the process of the learner,
+and for engines served by a local server, with blocking and with pipelined requests.
+A policy computation is simulated by a sleep between steps.
+
+Usage:
+    python benchmarks/benchmark_remote.py --n-engines 8 --n-steps 200 --policy-ms 5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from simple_playgrounds import Engine
+from simple_playgrounds.agents import BaseAgent
+from simple_playgrounds.agents.controllers import Random
+from simple_playgrounds.agents.parts import ForwardPlatform
+from simple_playgrounds.agents.sensors import Lidar, RgbCamera
+from simple_playgrounds.playgrounds import SingleRoom
+from simple_playgrounds.remote import RemoteEngines, launch_server
+
+
+def make_engine():
+    """
+    Creates an engine with an agent with a Lidar and a camera, which never terminates.
+    """
+
+    playground = SingleRoom(size=(300, 300))
+
+    agent = BaseAgent(controller=Random(), platform=ForwardPlatform)
+    agent.add_sensor(Lidar(anchor=agent.base_platform, invisible_elements=agent.parts, resolution=128))
+    agent.add_sensor(RgbCamera(anchor=agent.base_platform, invisible_elements=agent.parts, resolution=128))
+    playground.add_agent(agent)
+
+    return Engine(playground, time_limit=False)
+
+
+def run_local(n_engines, n_steps, policy_time):
+
+    engines = [make_engine() for _ in range(n_engines)]
+
+    start = time.perf_counter()
+
+    for _ in range(n_steps):
+
+        time.sleep(policy_time)
+
+        for engine in engines:
+            engine.step(engine.get_actions())
+            engine.update_observations()
+
+    return n_engines * n_steps / (time.perf_counter() - start)
+
+
+def run_remote(n_engines, n_steps, policy_time, pipelined, address):
+
+    process = launch_server(make_engine, n_engines, address)
+
+    with RemoteEngines(address) as engines:
+
+        start = time.perf_counter()
+
+        if pipelined:
+
+            # The policy for the next step is computed while the engines simulate
+            engines.step_async()
+            for _ in range(n_steps - 1):
+                time.sleep(policy_time)
+                engines.step_wait()
+                engines.step_async()
+            engines.step_wait()
+
+        else:
+
+            for _ in range(n_steps):
+                time.sleep(policy_time)
+                engines.step()
+
+        steps_per_second = n_engines * n_steps / (time.perf_counter() - start)
+
+    process.join()
+
+    return steps_per_second
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n-engines', type=int, default=8)
+    parser.add_argument('--n-steps', type=int, default=200)
+    parser.add_argument('--policy-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    policy_time = args.policy_ms / 1000
+
+    print('local: {:.0f} steps/s'.format(run_local(args.n_engines, args.n_steps, policy_time)))
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        for pipelined in [False, True]:
+            address = os.path.join(directory, 'engines_{}.sock'.format(pipelined))
+            steps_per_second = run_remote(args.n_engines, args.n_steps, policy_time, pipelined, address)
+            print('remote{}: {:.0f} steps/s'.format(' pipelined' if pipelined else '', steps_per_second))
+
+
+if __name__ == '__main__':
+    main()
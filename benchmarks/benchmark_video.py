@@ -0,0 +1,97 @@
+""" Benchmark of video recording.
+
+Measures the simulation throughput of an agent with a Lidar, without video,
+with frames generated and encoded in the simulation loop, and with the background video encoding of the Engine.
+
+Usage:
+    python benchmarks/benchmark_video.py --n-steps 1000 --size 400
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from simple_playgrounds import Engine
+from simple_playgrounds.agents import BaseAgent
+from simple_playgrounds.agents.controllers import Random
+from simple_playgrounds.agents.parts import ForwardPlatform
+from simple_playgrounds.agents.sensors import Lidar
+from simple_playgrounds.playgrounds import SingleRoom
+
+
+def run_benchmark(mode, n_steps, size, directory):
+    """
+    Runs the agent randomly, while recording a video.
+
+    Args:
+        mode: 'none', 'synchronous' or 'background'.
+        n_steps: number of steps.
+        size: size of the room.
+        directory: directory of the video files.
+
+    Returns:
+        Steps per second, and the VideoRecorder in background mode.
+
+    """
+
+    playground = SingleRoom(size=(size, size), seed=0)
+
+    agent = BaseAgent(controller=Random(), platform=ForwardPlatform)
+    agent.add_sensor(Lidar(anchor=agent.base_platform, invisible_elements=agent.parts))
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=n_steps)
+    path = os.path.join(directory, mode + '.mp4')
+
+    writer, video = None, None
+    if mode == 'synchronous':
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 30, (size, size))
+    elif mode == 'background':
+        video = engine.start_video(path)
+
+    start = time.perf_counter()
+
+    while engine.game_on:
+
+        engine.step(engine.get_actions())
+        engine.update_observations()
+
+        if writer is not None:
+            image = engine.generate_playground_image()
+            writer.write((image * 255).astype(np.uint8))
+
+    engine.stop_video()
+    duration = time.perf_counter() - start
+
+    if writer is not None:
+        writer.release()
+
+    return n_steps / duration, video
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n-steps', type=int, default=1000)
+    parser.add_argument('--size', type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        for mode in ['none', 'synchronous', 'background']:
+
+            steps_per_second, video = run_benchmark(mode, args.n_steps, args.size, directory)
+            result = '{}: {:.0f} steps/s'.format(mode, steps_per_second)
+
+            if video is not None:
+                result += ' ({} frames encoded, {} dropped)'.format(video.captured_frames, video.dropped_frames)
+
+            print(result)
+
+
+if __name__ == '__main__':
+    main()
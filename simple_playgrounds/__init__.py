@@ -1,4 +1,5 @@
 from simple_playgrounds.game_engine import Engine
+from simple_playgrounds.recording import EpisodeRecorder, EpisodeReplayer, VideoRecorder
 
 # import playgrounds into register
 import simple_playgrounds.playgrounds.collection
@@ -7,13 +7,16 @@ body parts, sensors and corresponding Keyboard commands.
 Examples can be found in simple_playgrounds/agents/agents.py
 """
 from abc import ABC
+import functools
 
-import random
 import numpy as np
 import cv2
 
 from simple_playgrounds.utils.definitions import ActionTypes
 from simple_playgrounds.utils.position_utils import PositionAreaSampler
+from simple_playgrounds.utils.rng_utils import default_rng, spawn_rng
+from simple_playgrounds.agents.sensors.noise import NoisePool
+from simple_playgrounds.agents.parts.part import Part
 
 # pylint: disable=too-many-instance-attributes
 # pylint: disable=no-member
@@ -76,6 +79,10 @@ class Agent(ABC):
         # Keep track of the actions for display
         self.current_actions = None
 
+        # Handlers of each actuator, and actuator ranges for action vectors, built when first needed
+        self._action_dispatch = None
+        self._action_ranges = None
+
         # Motor noise
         self._noise = False
         if noise_params is not None:
@@ -91,6 +98,13 @@ class Agent(ABC):
 
         self._controller = None
 
+        # Random streams, seeded by the playground
+        self._seed_sequence = None
+        self.rng = default_rng()
+
+        # Pool of random numbers shared by all sensors for their noise
+        self.sensor_noise_pool = NoisePool()
+
         # Reward
         self.reward = 0
 
@@ -113,11 +127,34 @@ class Agent(ABC):
 
         self._controller.controlled_actuators = self.get_all_actuators()
 
+        if self._seed_sequence is not None:
+            self._controller.rng = spawn_rng(self._seed_sequence)
+
         if self._controller.require_key_mapping:
             self._controller.discover_key_mapping()
 
         self.current_actions = controller.generate_null_actions()
 
+    # RANDOM STATE
+
+    def set_random_state(self, seed_sequence):
+        """
+        Seeds the agent with independent random streams,
+        for its motor noise, its controller, and the noise of its sensors.
+
+        Args:
+            seed_sequence: numpy SeedSequence, usually spawned by the playground.
+
+        """
+
+        self._seed_sequence = seed_sequence
+        self.rng = spawn_rng(self._seed_sequence)
+
+        if self._controller is not None:
+            self._controller.rng = spawn_rng(self._seed_sequence)
+
+        self.sensor_noise_pool.rng = spawn_rng(self._seed_sequence)
+
     # POSITION / VELOCITY
 
     @property
@@ -129,7 +166,7 @@ class Agent(ABC):
         if isinstance(self._initial_position, tuple):
             return self._initial_position
         if isinstance(self._initial_position, PositionAreaSampler):
-            return self._initial_position.sample()
+            return self._initial_position.sample(rng=self.rng)
 
         return self._initial_position
 
@@ -216,6 +253,8 @@ class Agent(ABC):
         """
         self.sensors.append(new_sensor)
 
+        new_sensor.noise_pool = self.sensor_noise_pool
+
     def generate_sensor_image(self, width_sensor=200, height_sensor=30, plt_mode=False):
         """
         Generate a full image containing all the sensor representations of an Agent.
@@ -259,6 +298,7 @@ class Agent(ABC):
 
         """
         self.parts.append(part)
+        self._action_dispatch = None
 
     def get_all_actuators(self):
         """
@@ -273,6 +313,35 @@ class Agent(ABC):
 
         return actuators
 
+    @property
+    def action_dispatch(self):
+        """
+        Dictionary {actuator: (body part, handlers)}, in the order of get_all_actuators.
+        Actions are dispatched directly to the handlers of their actuator, instead of being
+        offered to all the body parts.
+        """
+
+        if self._action_dispatch is None:
+
+            self._action_dispatch = {}
+
+            for part in self.parts:
+                for actuator in part.actuators:
+
+                    # Parts which override apply_action receive their actions through it
+                    if type(part).apply_action is Part.apply_action:
+                        handlers = part.action_handlers[actuator]
+                    else:
+                        handlers = (functools.partial(part.apply_action, actuator),)
+
+                    self._action_dispatch[actuator] = part, handlers
+
+            actuators = list(self._action_dispatch)
+            self._action_ranges = (np.array([actuator.min for actuator in actuators], dtype=np.float64),
+                                   np.array([actuator.max for actuator in actuators], dtype=np.float64))
+
+        return self._action_dispatch
+
     def apply_actions_to_body_parts(self, actions_dict):
         """
         Apply actions to each body part of the agent.
@@ -286,10 +355,96 @@ class Agent(ABC):
         else:
             self.current_actions = actions_dict
 
+        dispatch = self.action_dispatch
+        check_value = Part._check_value_actuator
+
         for actuator, value in self.current_actions.items():
 
-            for body_part in self.parts:
-                body_part.apply_action(actuator, value)
+            if actuator not in dispatch:
+                continue
+
+            value = check_value(actuator, value)
+            for handler in dispatch[actuator][1]:
+                handler(value)
+
+    def actions_from_vector(self, actions):
+        """
+        Converts a flat vector of actions to a dictionary of actions.
+
+        Args:
+            actions: array of the values of all the actuators, in the order of get_all_actuators.
+
+        Returns:
+            Dictionary {actuator: value}.
+
+        """
+
+        actions = np.asarray(actions, dtype=np.float64)
+
+        if actions.shape != (len(self.action_dispatch),):
+            raise ValueError('Action vector should have shape ({},)'.format(len(self.action_dispatch)))
+
+        return dict(zip(self.action_dispatch, actions.tolist()))
+
+    def apply_action_vector(self, actions):
+        """
+        Apply a flat vector of actions to the body parts, without building a dictionary of actions.
+        Values are clipped to the range of their actuator.
+
+        Args:
+            actions: array of the values of all the actuators, in the order of get_all_actuators.
+        """
+
+        if self._noise:
+            self.apply_actions_to_body_parts(self.actions_from_vector(actions))
+            return
+
+        dispatch = self.action_dispatch
+        actions = np.asarray(actions, dtype=np.float64)
+
+        if actions.shape != (len(dispatch),):
+            raise ValueError('Action vector should have shape ({},)'.format(len(dispatch)))
+
+        values = np.clip(actions, *self._action_ranges).tolist()
+
+        for (_, handlers), value in zip(dispatch.values(), values):
+            for handler in handlers:
+                handler(value)
+
+        self.current_actions = dict(zip(dispatch, values))
+
+    def resolve_actions(self, actions_dict):
+        """
+        Finds the body part of each actuator, so that the same actions can be applied repeatedly
+        (see apply_resolved_actions).
+
+        Args:
+            actions_dict: dictionary of actuator, value.
+
+        Returns:
+            List of (body part, actuator, value).
+
+        """
+
+        dispatch = self.action_dispatch
+
+        return [(dispatch[actuator][0], actuator, value) for actuator, value in actions_dict.items()]
+
+    def apply_resolved_actions(self, resolved_actions):
+        """
+        Apply actions resolved by resolve_actions to the body parts.
+        Motor noise is drawn at each call.
+
+        Args:
+            resolved_actions: list of (body part, actuator, value).
+        """
+
+        if self._noise:
+            self.apply_actions_to_body_parts({actuator: value for _, actuator, value in resolved_actions})
+            return
+
+        for part, actuator, value in resolved_actions:
+            part.apply_action(actuator, value)
 
     def _apply_noise(self, actions_dict):
 
@@ -298,7 +453,7 @@ class Agent(ABC):
         if self._noise_type == 'gaussian':
 
             for actuator, value in actions_dict.items():
-                additive_noise = random.gauss(self._noise_mean, self._noise_scale)
+                additive_noise = self.rng.normal(self._noise_mean, self._noise_scale)
                 new_value = additive_noise + value
                 new_value = new_value if new_value > actuator.min else actuator.min
                 new_value = new_value if new_value < actuator.max else actuator.max
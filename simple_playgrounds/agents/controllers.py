@@ -2,11 +2,11 @@
 Controllers are used to generate commands to control the actuators of an agent.
 """
 from abc import ABC, abstractmethod
-import random
 
 import pygame
 
 from simple_playgrounds.utils.definitions import ActionTypes, KeyTypes
+from simple_playgrounds.utils.rng_utils import default_rng
 
 
 class Controller(ABC):
@@ -18,6 +18,9 @@ class Controller(ABC):
         self.require_key_mapping = False
         self.controlled_actuators = []
 
+        # Random number generator, seeded by the agent when it enters a playground.
+        self.rng = default_rng()
+
     @abstractmethod
     def generate_actions(self):
         """ Generate actions for each actuator of an agent,
@@ -60,13 +63,13 @@ class Random(Controller):
         for actuator in self.controlled_actuators:
 
             if actuator.action_range == ActionTypes.CONTINUOUS_CENTERED:
-                act_value = random.uniform(actuator.min, actuator.max)
+                act_value = self.rng.uniform(actuator.min, actuator.max)
 
             elif actuator.action_range == ActionTypes.CONTINUOUS_NOT_CENTERED:
-                act_value = random.uniform(actuator.min, actuator.max)
+                act_value = self.rng.uniform(actuator.min, actuator.max)
 
             elif actuator.action_range == ActionTypes.DISCRETE:
-                act_value = random.choice([actuator.min, actuator.max])
+                act_value = (actuator.min, actuator.max)[self.rng.integers(2)]
 
             else:
                 raise ValueError
@@ -30,6 +30,10 @@ class Link(Part, ABC):
 
     # pylint: disable=too-many-instance-attributes
 
+    __slots__ = ('anchor', '_angle_offset', '_rotation_range', '_max_angular_velocity',
+                 'relative_position_of_anchor_on_anchor', 'relative_position_of_anchor_on_part',
+                 'joint', 'limit', 'motor', 'angular_velocity_actuator')
+
     def __init__(self, anchor, coord_anchor=(0, 0), coord_part=(0, 0), angle_offset=0, **kwargs):
 
         """
@@ -118,32 +122,31 @@ class Link(Part, ABC):
 
         self.pm_body.angle = self.anchor.pm_body.angle + self._angle_offset
 
-    def apply_action(self, actuator, value):
+    def _register_action_handlers(self, handlers):
 
-        super().apply_action(actuator, value)
-        value = self._check_value_actuator(actuator, value)
+        super()._register_action_handlers(handlers)
 
-        if actuator is self.angular_velocity_actuator:
+        handlers[self.angular_velocity_actuator].append(self._set_angular_velocity)
 
-            angular_velocity = value
+    def _set_angular_velocity(self, value):
 
-            self.motor.rate = angular_velocity * self._max_angular_velocity
+        angular_velocity = value
 
-            # Case when theta close to limit -> speed to zero
-            theta_part = self.position[2]
-            theta_anchor = self.anchor.position[2]
+        self.motor.rate = angular_velocity * self._max_angular_velocity
 
-            angle_centered = (theta_part - (theta_anchor + self._angle_offset)) % (2 * math.pi)
-            angle_centered = angle_centered - 2 * math.pi if angle_centered > math.pi else angle_centered
+        # Case when theta close to limit -> speed to zero
+        theta_part = self.position[2]
+        theta_anchor = self.anchor.position[2]
 
-            # Do not set the motor if the limb is close to limit
-            if angle_centered < - self._rotation_range/2 + math.pi/20 and angular_velocity > 0:
-                self.motor.rate = 0
+        angle_centered = (theta_part - (theta_anchor + self._angle_offset)) % (2 * math.pi)
+        angle_centered = angle_centered - 2 * math.pi if angle_centered > math.pi else angle_centered
 
-            elif angle_centered > self._rotation_range/2 - math.pi/20 and angular_velocity < 0:
-                self.motor.rate = 0
+        # Do not set the motor if the limb is close to limit
+        if angle_centered < - self._rotation_range/2 + math.pi/20 and angular_velocity > 0:
+            self.motor.rate = 0
 
-        return value
+        elif angle_centered > self._rotation_range/2 - math.pi/20 and angular_velocity < 0:
+            self.motor.rate = 0
 
 
 class Head(Link):
@@ -152,6 +155,8 @@ class Head(Link):
     Not colliding with any Entity or Part.
 
     """
+    __slots__ = ()
+
     entity_type = AgentPartTypes.HEAD
 
     def __init__(self, anchor, position_anchor=(0, 0), angle_offset=0, **kwargs):
@@ -168,6 +173,8 @@ class Eye(Link):
     Not colliding with any Entity or Part
 
     """
+    __slots__ = ()
+
     entity_type = AgentPartTypes.EYE
 
     def __init__(self, anchor, position_anchor, angle_offset=0, **kwargs):
@@ -184,6 +191,8 @@ class Hand(Link):
     Is colliding with other Entity or Part, except from anchor and other Parts attached to it.
 
     """
+    __slots__ = ()
+
     entity_type = AgentPartTypes.HAND
 
 
@@ -196,6 +205,8 @@ class Arm(Link):
         extremity_anchor_point: coordinates of the free extremity, used to attach other Parts.
 
     """
+    __slots__ = ('extremity_anchor_point',)
+
     entity_type = AgentPartTypes.ARM
 
     def __init__(self, anchor, position_anchor, angle_offset=0, **kwargs):
@@ -10,6 +10,7 @@ Examples can be found in simple_playgrounds/agents/agents.py
 """
 
 from abc import ABC
+from collections import defaultdict
 import numbers
 
 from simple_playgrounds.entity import Entity
@@ -27,6 +28,10 @@ class Part(Entity, ABC):
 
     # pylint: disable=too-many-instance-attributes
 
+    __slots__ = ('can_absorb', 'can_eat', 'can_activate', 'can_grasp',
+                 'is_eating', 'is_activating', 'is_grasping', 'is_holding',
+                 'actuators', '_action_handlers', 'grasp_actuator', 'activate_actuator', 'eat_actuator')
+
     entity_type = AgentPartTypes.PART
     part_type = None
     movable = True
@@ -60,7 +65,6 @@ class Part(Entity, ABC):
         self.can_eat = kwargs.get('can_eat', False)
         self.can_activate = kwargs.get('can_activate', False)
         self.can_grasp = kwargs.get('can_grasp', False)
-        self.grasped = []
 
         self.is_eating = False
         self.is_activating = False
@@ -68,6 +72,7 @@ class Part(Entity, ABC):
         self.is_holding = False
 
         self.actuators = []
+        self._action_handlers = None
 
         if self.can_grasp:
             self.grasp_actuator = Actuator(self.name, ActionTypes.GRASP, ActionTypes.DISCRETE, 0, 1)
@@ -81,6 +86,48 @@ class Part(Entity, ABC):
             self.eat_actuator = Actuator(self.name, ActionTypes.EAT, ActionTypes.DISCRETE, 0, 1)
             self.actuators.append(self.eat_actuator)
 
+    @property
+    def action_handlers(self):
+        """
+        Dictionary {actuator: tuple of handlers} of the actuators of the part, built at the first call.
+        Each handler is called with the value of its actuator, clipped to the range of the actuator.
+        """
+
+        if self._action_handlers is None:
+            handlers = defaultdict(list)
+            self._register_action_handlers(handlers)
+            self._action_handlers = {actuator: tuple(handlers[actuator]) for actuator in self.actuators}
+
+        return self._action_handlers
+
+    def _register_action_handlers(self, handlers):
+        """
+        Appends the handlers of the actuators of the part to the lists of handlers.
+        Parts with new actuators extend this method.
+        """
+
+        if self.can_grasp:
+            handlers[self.grasp_actuator].append(self._set_grasping)
+
+        if self.can_activate:
+            handlers[self.activate_actuator].append(self._set_activating)
+
+        if self.can_eat:
+            handlers[self.eat_actuator].append(self._set_eating)
+
+    def _set_grasping(self, value):
+
+        self.is_grasping = value
+
+        if self.is_holding and not self.is_grasping:
+            self.is_holding = False
+
+    def _set_activating(self, value):
+        self.is_activating = value
+
+    def _set_eating(self, value):
+        self.is_eating = value
+
     def apply_action(self, actuator, value):
         """
         Apply the action to the physical body part.
@@ -89,20 +136,16 @@ class Part(Entity, ABC):
             actuator (:obj: 'Actuator'): Actuator on which action is applied.
             value (float): value of the Actuator
 
+        Returns:
+            Value of the actuator, clipped to its range.
+
         """
         value = self._check_value_actuator(actuator, value)
 
-        if self.can_activate and actuator is self.activate_actuator:
-            self.is_activating = value
-
-        if self.can_eat and actuator is self.eat_actuator:
-            self.is_eating = value
+        for handler in self.action_handlers.get(actuator, ()):
+            handler(value)
 
-        if self.can_grasp and actuator is self.grasp_actuator:
-            self.is_grasping = value
-
-        if self.is_holding and not self.is_grasping:
-            self.is_holding = False
+        return value
 
     @staticmethod
     def _check_value_actuator(actuator, value):
@@ -123,7 +166,6 @@ class Part(Entity, ABC):
             self.is_eating = False
         if self.can_grasp:
             self.is_grasping = False
-            self.grasped = []
             self.is_holding = False
 
 
@@ -135,6 +177,8 @@ class Actuator:
     of parts of an agent.
     """
 
+    __slots__ = ('part_name', 'action', 'action_range', 'min', 'max', 'has_key_mapping', 'key_map')
+
     def __init__(self, part_name, action_type, action_range, min_value, max_value):
         """
 
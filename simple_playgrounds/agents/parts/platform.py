@@ -24,6 +24,8 @@ class Platform(Part, ABC):
 
     """
 
+    __slots__ = ('max_linear_force', 'max_angular_velocity')
+
     entity_type = AgentPartTypes.PLATFORM
 
     def __init__(self, **kwargs):
@@ -58,6 +60,8 @@ class FixedPlatform(Platform):
 
     """
 
+    __slots__ = ()
+
     movable = False
 
 
@@ -68,6 +72,8 @@ class ForwardPlatform(Platform):
 
     """
 
+    __slots__ = ('longitudinal_force_actuator', 'angular_velocity_actuator')
+
     def __init__(self, **kwargs):
 
         super().__init__(**kwargs)
@@ -80,18 +86,18 @@ class ForwardPlatform(Platform):
                                                   ActionTypes.CONTINUOUS_CENTERED, -1, 1)
         self.actuators.append(self.angular_velocity_actuator)
 
-    def apply_action(self, actuator, value):
+    def _register_action_handlers(self, handlers):
 
-        super().apply_action(actuator, value)
-        value = self._check_value_actuator(actuator, value)
+        super()._register_action_handlers(handlers)
 
-        if actuator is self.longitudinal_force_actuator:
-            self.pm_body.apply_force_at_local_point(pymunk.Vec2d(value, 0) * self.max_linear_force * 100, (0, 0))
+        handlers[self.longitudinal_force_actuator].append(self._apply_longitudinal_force)
+        handlers[self.angular_velocity_actuator].append(self._set_angular_velocity)
 
-        if actuator is self.angular_velocity_actuator:
-            self.pm_body.angular_velocity = - value * self.max_angular_velocity
+    def _apply_longitudinal_force(self, value):
+        self.pm_body.apply_force_at_local_point(pymunk.Vec2d(value, 0) * self.max_linear_force * 100, (0, 0))
 
-        return value
+    def _set_angular_velocity(self, value):
+        self.pm_body.angular_velocity = - value * self.max_angular_velocity
 
 
 class ForwardBackwardPlatform(ForwardPlatform):
@@ -101,6 +107,8 @@ class ForwardBackwardPlatform(ForwardPlatform):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
 
         super().__init__(**kwargs)
@@ -110,18 +118,13 @@ class ForwardBackwardPlatform(ForwardPlatform):
         self.longitudinal_force_actuator = Actuator(self.name, ActionTypes.LONGITUDINAL_FORCE, ActionTypes.CONTINUOUS_CENTERED, -1, 1)
         self.actuators.append(self.longitudinal_force_actuator)
 
-    def apply_action(self, actuator, value):
+    def _register_action_handlers(self, handlers):
 
-        super().apply_action(actuator, value)
-        value = self._check_value_actuator(actuator, value)
+        super()._register_action_handlers(handlers)
 
-        if actuator is self.longitudinal_force_actuator:
-            self.pm_body.apply_force_at_local_point(pymunk.Vec2d(value, 0) * self.max_linear_force * 100, (0, 0))
-
-        if actuator is self.angular_velocity_actuator:
-            self.pm_body.angular_velocity = - value * self.max_angular_velocity
-
-        return value
+        # The longitudinal actuator replaces the one of ForwardPlatform, which also applies its force.
+        # The force is applied twice, as it has always been for this platform.
+        handlers[self.longitudinal_force_actuator].append(self._apply_longitudinal_force)
 
 
 class HolonomicPlatform(ForwardBackwardPlatform):
@@ -130,18 +133,19 @@ class HolonomicPlatform(ForwardBackwardPlatform):
     Refer to the base class Platform.
     """
 
+    __slots__ = ('lateral_force_actuator',)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
         self.lateral_force_actuator = Actuator(self.name, ActionTypes.LATERAL_FORCE, ActionTypes.CONTINUOUS_CENTERED, -1, 1)
         self.actuators.append(self.lateral_force_actuator)
 
-    def apply_action(self, actuator, value):
+    def _register_action_handlers(self, handlers):
 
-        super().apply_action(actuator, value)
-        value = self._check_value_actuator(actuator, value)
+        super()._register_action_handlers(handlers)
 
-        if actuator is self.lateral_force_actuator:
-            self.pm_body.apply_force_at_local_point(pymunk.Vec2d(0, -value) * self.max_linear_force * 100, (0, 0))
+        handlers[self.lateral_force_actuator].append(self._apply_lateral_force)
 
-        return value
+    def _apply_lateral_force(self, value):
+        self.pm_body.apply_force_at_local_point(pymunk.Vec2d(0, -value) * self.max_linear_force * 100, (0, 0))
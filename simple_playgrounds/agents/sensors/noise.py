@@ -0,0 +1,109 @@
+""" Module implementing the pool of random numbers used for sensor noise.
+
+Drawing noise separately for each sensor at each timestep is slow for small sensors,
+as each call to the random generator has a fixed cost.
+NoisePool prefetches large blocks of random numbers, and serves them as views
+to all the sensors of an agent, which apply them in place on their values.
+
+Typical Usage:
+    pool = NoisePool(rng=np.random.default_rng(42))
+    noise = pool.standard_normal(sensor_values.shape)
+"""
+
+import numpy as np
+
+from simple_playgrounds.utils.rng_utils import default_rng
+
+_DEFAULT_BLOCK_SIZE = 2**16
+
+
+class NoisePool:
+    """
+    Block-prefetched pool of gaussian and uniform random numbers.
+
+    Attributes:
+        rng: numpy Generator used to fill the blocks.
+            Setting a new Generator discards the prefetched numbers.
+
+    Note:
+        Views returned by the pool are only valid until the next draw of the same kind.
+    """
+
+    def __init__(self, rng=None, block_size=_DEFAULT_BLOCK_SIZE, dtype=np.float32):
+        """
+        Args:
+            rng: numpy Generator. If None, an unseeded Generator is created.
+            block_size: number of random numbers generated at once for each kind of noise.
+            dtype: float32 or float64.
+        """
+
+        self._block_size = block_size
+        self._dtype = np.dtype(dtype)
+
+        self._blocks = {}
+        self._positions = {}
+
+        self._rng = None
+        self.rng = rng if rng is not None else default_rng()
+
+    @property
+    def rng(self):
+        """ Generator used to fill the blocks. """
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng):
+        self._rng = rng
+        self._blocks = {'normal': np.empty(0, dtype=self._dtype),
+                        'uniform': np.empty(0, dtype=self._dtype)}
+        self._positions = {'normal': 0, 'uniform': 0}
+
+    def _draw(self, kind, shape):
+
+        size = int(np.prod(shape))
+
+        block = self._blocks[kind]
+        position = self._positions[kind]
+
+        if position + size > block.size:
+
+            block = np.empty(max(self._block_size, size), dtype=self._dtype)
+
+            if kind == 'normal':
+                self._rng.standard_normal(out=block, dtype=self._dtype)
+            else:
+                self._rng.random(out=block, dtype=self._dtype)
+
+            block.flags.writeable = False
+            self._blocks[kind] = block
+            position = 0
+
+        self._positions[kind] = position + size
+
+        return block[position:position + size].reshape(shape)
+
+    def standard_normal(self, shape):
+        """
+        Draws standard gaussian noise.
+
+        Args:
+            shape: shape of the noise array.
+
+        Returns:
+            Read-only view on the pool, of the requested shape.
+
+        """
+        return self._draw('normal', shape)
+
+    def uniform(self, shape):
+        """
+        Draws uniform noise in [0, 1).
+
+        Args:
+            shape: shape of the noise array.
+
+        Returns:
+            Read-only view on the pool, of the requested shape.
+
+        """
+        return self._draw('uniform', shape)
@@ -10,9 +10,11 @@ from operator import attrgetter
 
 import numpy as np
 import cv2
+import pymunk
 
 from simple_playgrounds.agents.sensors.sensor import RayCollisionSensor
 from simple_playgrounds.utils.definitions import SensorTypes
+from simple_playgrounds.utils.static_geometry import StaticGeometry
 
 # pylint: disable=no-member
 
@@ -22,6 +24,8 @@ class RgbCamera(RayCollisionSensor):
     Provides a 1D image (line of RGB pixels) from the point of view of the anchor.
     """
 
+    __slots__ = ()
+
     sensor_type = SensorTypes.RGB
 
     def __init__(self, anchor,
@@ -37,42 +41,66 @@ class RgbCamera(RayCollisionSensor):
 
         self._sensor_max_value = 255
 
+        self._allocate_buffers()
+
     def _compute_raw_sensor(self, playground, *_):
 
+        self._compute_pixels(playground, self.sensor_values)
+
+    def _compute_pixels(self, playground, pixels):
+        """
+        Computes the color of each ray, and writes them in place.
+        Rays are ordered from left to right, and colors are in BGR order.
+
+        Args:
+            playground: Playground.
+            pixels: array of shape (resolution, 3).
+
+        """
+
         collision_points = self._compute_points(playground)
 
-        pixels = np.zeros((self._resolution, 3))
+        pixels.fill(0)
+
+        # Group the closest hit of each ray by shape, to gather the texels of each entity at once
+        hits_by_shape = {}
 
-        for angle_index, ray_angle in enumerate(self._ray_angles):
+        for angle_index, ray_angle in enumerate(self._ray_angles.tolist()):
 
             collisions = collision_points[ray_angle]
 
             if collisions:
-
                 col = min(collisions, key=attrgetter('alpha'))
 
-                elem_colliding = playground.get_entity_from_shape(pm_shape=col.shape)
+                # Hit points lie on the border of texels: the texture is sampled half a texel inside
+                hits_by_shape.setdefault(col.shape, []).append(
+                    (self._resolution - 1 - angle_index,
+                     col.point.x - col.normal.x / 2, col.point.y - col.normal.y / 2))
+
+        for pm_shape, hits in hits_by_shape.items():
 
-                angle_element = elem_colliding.position[2]
-                pos_element = elem_colliding.position[0:2]
+            elem_colliding = playground.get_entity_from_shape(pm_shape=pm_shape)
 
-                col_x, col_y = playground.size[0] - col.point.y, col.point.x
-                rel_x, rel_y = col_x - pos_element[0], col_y - pos_element[1]
+            hits = np.asarray(hits)
+            pixel_indices = hits[:, 0].astype(int)
 
-                rel_pos_point = (rel_x*math.cos(angle_element) + rel_y*math.sin(angle_element),
-                                 - rel_x*math.sin(angle_element) + rel_y*math.cos(angle_element))
+            pos_x, pos_y, angle_element = elem_colliding.position
+            rel_x = playground.size[0] - hits[:, 2] - pos_x
+            rel_y = hits[:, 1] - pos_y
 
-                coord = (int(rel_pos_point[1]+(elem_colliding.texture_surface.get_size()[1]-1)/2),
-                         int(rel_pos_point[0]+(elem_colliding.texture_surface.get_size()[0]-1)/2)
-                         )
+            cos_angle, sin_angle = math.cos(angle_element), math.sin(angle_element)
 
-                rgb = elem_colliding.texture_surface.get_at(coord)[:3]
+            texture = elem_colliding.texture_array
+            width, height = texture.shape[:2]
 
-                pixels[angle_index] = rgb
+            coord_x = (- rel_x * sin_angle + rel_y * cos_angle + (height - 1) / 2).astype(int)
+            coord_y = (rel_x * cos_angle + rel_y * sin_angle + (width - 1) / 2).astype(int)
 
-        pixels = pixels[::-1, ::-1]
+            np.clip(coord_x, 0, width - 1, out=coord_x)
+            np.clip(coord_y, 0, height - 1, out=coord_y)
 
-        self.sensor_values = pixels
+            # texels are RGB, pixels are BGR
+            pixels[pixel_indices] = texture[coord_x, coord_y, ::-1]
 
     def _apply_normalization(self):
         self.sensor_values /= 255.
@@ -96,7 +124,7 @@ class RgbCamera(RayCollisionSensor):
         img = np.expand_dims(self.sensor_values, 0)
         img = cv2.resize(img, (width, height), interpolation=cv2.INTER_NEAREST)
         if not self._normalize:
-            img /= 255.
+            img = img / 255.
 
         return img
 
@@ -106,11 +134,21 @@ class GreyCamera(RgbCamera):
     Provides a 1D image (line of Grey-level pixels) from the point of view of the anchor.
     """
 
+    __slots__ = ('_pixels_buffer',)
+
     sensor_type = SensorTypes.GREY
 
+    _grey_weights = np.array([0.114, 0.299, 0.587])
+
+    def _allocate_buffers(self):
+
+        super()._allocate_buffers()
+        self._pixels_buffer = np.zeros((self._resolution, 3))
+
     def _compute_raw_sensor(self, playground, *_):
-        super()._compute_raw_sensor(playground)
-        self.sensor_values = np.dot(self.sensor_values[..., :3], [0.114, 0.299, 0.587])
+
+        self._compute_pixels(playground, self._pixels_buffer)
+        np.matmul(self._pixels_buffer, self._grey_weights, out=self.sensor_values, casting='unsafe')
 
     @property
     def shape(self):
@@ -126,7 +164,7 @@ class GreyCamera(RgbCamera):
         img = cv2.resize(img, (width, height), interpolation=cv2.INTER_NEAREST)
 
         if not self._normalize:
-            img /= 255.
+            img = img / 255.
 
         return img
 
@@ -136,6 +174,8 @@ class Lidar(RayCollisionSensor):
     Lidar are Sensors that measure distances by projecting rays.
     """
 
+    __slots__ = ()
+
     sensor_type = SensorTypes.LIDAR
 
     def __init__(self,
@@ -152,21 +192,22 @@ class Lidar(RayCollisionSensor):
 
         self._sensor_max_value = self._range
 
+        self._allocate_buffers()
+
     def _compute_raw_sensor(self, playground, *_):
 
         collision_points = self._compute_points(playground)
 
-        pixels = np.ones(self._resolution) * self._range
+        pixels = self.sensor_values
+        pixels.fill(self._range)
 
-        for angle_index, ray_angle in enumerate(self._ray_angles):
+        for angle_index, ray_angle in enumerate(self._ray_angles.tolist()):
 
             collisions = collision_points[ray_angle]
 
             if collisions:
-                col = collisions[0]
-                pixels[angle_index] = col.alpha*self._range
-
-        self.sensor_values = pixels[::-1].astype(float)
+                col = min(collisions, key=attrgetter('alpha'))
+                pixels[self._resolution - 1 - angle_index] = col.alpha*self._range
 
     @property
     def shape(self):
@@ -185,7 +226,7 @@ class Lidar(RayCollisionSensor):
         img = cv2.resize(img, (width, height), interpolation=cv2.INTER_NEAREST)
 
         if not self._normalize:
-            img /= self._sensor_max_value
+            img = img / self._sensor_max_value
 
         return img
 
@@ -196,8 +237,14 @@ class Touch(Lidar):
     It emulates artificial skin, at the condition that the shape of the anchor is round.
 
     The range parameter is used to describe the thickness of the artificial skin.
+
+    Instead of casting rays through the whole space, the sensor finds the shapes within
+    reach of the skin with a single nearest-point query, and intersects the rays with
+    these shapes analytically.
     """
 
+    __slots__ = ()
+
     sensor_type = SensorTypes.TOUCH
 
     def __init__(self,
@@ -211,13 +258,44 @@ class Touch(Lidar):
                          normalize=normalize, noise_params=noise_params,
                          **sensor_params)
 
+        if not np.issubdtype(self._dtype, np.floating):
+            raise ValueError('Touch sensor requires a floating point dtype')
+
         self._sensor_max_value = self._range
         self._range = self.anchor.radius + self._range  # pylint: disable=access-member-before-definition
 
+    def _get_touched_shapes(self, playground):
+
+        # Rays have a radius of 1, so shapes within range + 1 of the center can be hit.
+        nearby = playground.space.point_query(self.anchor.pm_body.position, self._range + 1,
+                                              pymunk.ShapeFilter())
+
+        return [info.shape for info in nearby
+                if info.shape not in self._invisible_shapes
+                and isinstance(info.shape, (pymunk.Poly, pymunk.Circle))
+                and (not info.shape.sensor or self._is_visible_shape(playground, info.shape))]
+
     def _compute_raw_sensor(self, playground, *_):
 
-        super()._compute_raw_sensor(playground)
+        pixels = self.sensor_values
+        pixels.fill(self._range)
+
+        touched_shapes = self._get_touched_shapes(playground)
+
+        if touched_shapes:
+
+            start = self.anchor.pm_body.position
+            angles = self.anchor.pm_body.angle + self._ray_angles
+            directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+            # Unlike pymunk space queries, grazing hits are detected
+            geometry = StaticGeometry(touched_shapes, match_space_queries=False)
+            distances = geometry.distances(start, directions, self._range, radius=1)
+
+            # Rays are stored in reverse order, as in Lidar
+            np.minimum(pixels, distances[::-1], out=pixels)
 
-        distance_to_anchor = self.sensor_values - self.anchor.radius
-        distance_to_anchor[distance_to_anchor < 0] = 0
-        self.sensor_values = self._sensor_max_value - distance_to_anchor
+        # Distance to anchor, converted in place to skin deformation
+        pixels -= self.anchor.radius
+        np.clip(pixels, 0, None, out=pixels)
+        np.subtract(self._sensor_max_value, pixels, out=pixels)
@@ -3,18 +3,34 @@ This Module provides semantic sensors.
 These artificial sensors return semantic information about the detected entities.
 They return the actual instance of the entity detected, which allow to access their attributes.
 E.g. position, velocity, mass, shape can be accessed.
+
+Alternatively, semantic sensors can write their detections in a fixed-capacity
+numpy structured array (see DETECTION_DTYPE), which can be stacked, stored or
+transferred between processes.
 """
 
 import math
-from operator import attrgetter
 
 import numpy as np
 import cv2
 
 from simple_playgrounds.agents.sensors.sensor import RayCollisionSensor
+from simple_playgrounds.agents.parts.part import Part
 from simple_playgrounds.utils.definitions import Detection, SensorTypes
 from simple_playgrounds.utils.parser import parse_configuration
 
+# Detections of semantic sensors in structured mode.
+# Relative position and velocity are expressed in the frame of the anchor of the sensor.
+# Unused rows have an entity_id of -1.
+DETECTION_DTYPE = np.dtype([('entity_id', np.int32),
+                            ('entity_type', np.int16),
+                            ('agent_part', np.bool_),
+                            ('distance', np.float32),
+                            ('angle', np.float32),
+                            ('relative_position', np.float32, (2,)),
+                            ('relative_velocity', np.float32, (2,)),
+                            ])
+
 
 class SemanticRay(RayCollisionSensor):
     """
@@ -23,11 +39,30 @@ class SemanticRay(RayCollisionSensor):
     All the attributes (position, physical properties, ...) of the returned
     entity can be accessed.
     """
+    __slots__ = ('n_detections', '_structured', '_max_detections')
+
     sensor_type = SensorTypes.SEMANTIC_RAY
     sensor_modality = SensorTypes.SEMANTIC
 
     def __init__(self, anchor, invisible_elements=None, normalize=True, noise_params=None,
-                 remove_duplicates=True, remove_occluded=True, **sensor_params):
+                 remove_duplicates=True, remove_occluded=True,
+                 structured=False, max_detections=None, **sensor_params):
+        """
+        Refer to Sensor Class.
+
+        Args:
+            anchor: Entity on which the sensor is attached.
+            invisible_elements: Elements which are invisible to the Sensor.
+            normalize: if true, distances are normalized between 0 and 1.
+            remove_duplicates: Keep only the closest detection of each Entity.
+            remove_occluded: Keep only the closest detection of each ray.
+            structured: If True, sensor values are a numpy structured array of
+                dtype DETECTION_DTYPE, and the number of valid rows is n_detections.
+                If False, sensor values are a list of Detection. Default: False.
+            max_detections: capacity of the structured array.
+                Additional detections are dropped. Default: one per ray.
+            **sensor_params: Additional Parameters.
+        """
 
         super().__init__(anchor=anchor, invisible_elements=invisible_elements,
                          normalize=normalize, noise_params=noise_params,
@@ -36,48 +71,106 @@ class SemanticRay(RayCollisionSensor):
 
         self._sensor_max_value = self._range
 
+        self._structured = structured
+        self.n_detections = 0
+
+        if self._structured:
+            self._max_detections = max_detections if max_detections is not None else self._resolution
+            self.sensor_values = np.zeros(self._max_detections, dtype=DETECTION_DTYPE)
+            self.sensor_values['entity_id'] = -1
+
     def _compute_raw_sensor(self, playground, *_):
 
         collision_points = self._compute_points(playground)
 
-        collision_points = {k: v for k, v in collision_points.items() if v != []}
+        entities, distances, angles = self._collisions_to_arrays(playground, collision_points)
 
-        self.sensor_values = self._collisions_to_detections(playground, collision_points)
-        # class Point just for modifying alpha and replace by distance
+        self._set_detections(entities, distances, angles)
 
-    def _collisions_to_detections(self, playground, collision_points):
+    def _collisions_to_arrays(self, playground, collision_points):
 
         """
-        Transforms pymunk collisions into simpler data structures.
+        Transforms pymunk collisions into detected entities, distances and angles.
 
         Args:
             playground (:obj: :Playground:): playground where the sensor is.
             collision_points: dictionary of collision points
 
         Returns:
-            list of detections
+            list of entities, array of distances, array of angles.
 
         """
 
-        detections = []
+        entities = []
+        distances = []
+        angles = []
 
         for sensor_angle, collisions in collision_points.items():
 
             for collision in collisions:
 
-                element_colliding = playground.get_entity_from_shape(pm_shape=collision.shape)
-                distance = collision.alpha * self._range
+                entities.append(playground.get_entity_from_shape(pm_shape=collision.shape))
+                distances.append(collision.alpha)
+                angles.append(sensor_angle)
+
+        distances = np.array(distances) * self._range
+
+        return entities, distances, np.array(angles)
+
+    def _set_detections(self, entities, distances, angles):
+        """
+        Writes the detections in the sensor values, as a list of Detection
+        or in the structured array.
+
+        Args:
+            entities: list of detected entities.
+            distances: array of distances.
+            angles: array of angles.
+
+        """
+
+        if not self._structured:
+            self.sensor_values = [Detection(entity=entity, distance=distance, angle=angle)
+                                  for entity, distance, angle in zip(entities, distances, angles)]
+            return
+
+        n_detections = min(len(entities), self._max_detections)
+        entities = entities[:n_detections]
+
+        values = self.sensor_values
+        values[n_detections:] = 0
+        values['entity_id'][n_detections:] = -1
+
+        self.n_detections = n_detections
+
+        if n_detections == 0:
+            return
 
-                detection = Detection(entity=element_colliding,
-                                      distance=distance,
-                                      angle=sensor_angle)
+        values['entity_id'][:n_detections] = [entity.entity_id for entity in entities]
+        values['entity_type'][:n_detections] = [entity.entity_type for entity in entities]
+        values['agent_part'][:n_detections] = [isinstance(entity, Part) for entity in entities]
+        values['distance'][:n_detections] = distances[:n_detections]
+        values['angle'][:n_detections] = angles[:n_detections]
 
-                detections.append(detection)
+        # Positions and velocities in the frame of the anchor
+        anchor_x, anchor_y, anchor_angle = self.anchor.position
+        anchor_vx, anchor_vy, _ = self.anchor.velocity
 
-        return detections
+        cos_angle, sin_angle = math.cos(anchor_angle), math.sin(anchor_angle)
+        rotation = np.array([[cos_angle, -sin_angle], [sin_angle, cos_angle]])
+
+        positions = np.array([entity.position[:2] for entity in entities])
+        velocities = np.array([entity.velocity[:2] for entity in entities])
+
+        values['relative_position'][:n_detections] = (positions - (anchor_x, anchor_y)) @ rotation
+        values['relative_velocity'][:n_detections] = (velocities - (anchor_vx, anchor_vy)) @ rotation
 
     def _apply_normalization(self):
 
+        if self._structured:
+            self.sensor_values['distance'][:self.n_detections] /= self._sensor_max_value
+            return
+
         for index, detection in enumerate(self.sensor_values):
 
             new_detection = Detection(entity=detection.entity,
@@ -85,6 +178,14 @@ class SemanticRay(RayCollisionSensor):
                                       angle=detection.angle)
             self.sensor_values[index] = new_detection
 
+    def _get_distances_angles(self):
+
+        if self._structured:
+            valid_values = self.sensor_values[:self.n_detections]
+            return zip(valid_values['distance'], valid_values['angle'])
+
+        return ((detection.distance, detection.angle) for detection in self.sensor_values)
+
     def _apply_noise(self):
 
         raise ValueError('Noise not implemented for Semantic sensors')
@@ -93,16 +194,15 @@ class SemanticRay(RayCollisionSensor):
 
         img = np.zeros((width, width, 3))
 
-        for detection in self.sensor_values:
+        for distance, angle in self._get_distances_angles():
 
-            distance = detection.distance
             if self._normalize:
                 distance *= self._range
 
             distance *= width / (2 * self._range)
 
-            pos_x = int(width / 2 - distance * math.cos(detection.angle))
-            pos_y = int(width / 2 - distance * math.sin(detection.angle))
+            pos_x = int(width / 2 - distance * math.cos(angle))
+            pos_y = int(width / 2 - distance * math.sin(angle))
 
             # pylint: disable=no-member
             cv2.line(img, (int(width / 2), int(width / 2)),
@@ -118,6 +218,8 @@ class SemanticCones(SemanticRay):
     maximum angle of cones should be
     """
 
+    __slots__ = ('number_cones', 'angles_cone_center', '_angles_cone_center')
+
     sensor_type = SensorTypes.SEMANTIC_CONE
 
     def __init__(self, anchor, invisible_elements=None,
@@ -130,6 +232,7 @@ class SemanticCones(SemanticRay):
             allow_duplicates: remove duplicates across cones.
                 Keep the closest detection for each detected Entity.
             **sensor_params: Additional Parameters.
+                Refer to SemanticRay for the structured output mode.
 
         Keyword Args:
             n_cones: number of cones evenly spaced across the field of view.
@@ -152,6 +255,9 @@ class SemanticCones(SemanticRay):
         sensor_params['resolution'] = n_rays
         sensor_params['n_rays'] = n_rays
 
+        if remove_occluded and sensor_params.get('max_detections') is None:
+            sensor_params['max_detections'] = self.number_cones
+
         super().__init__(anchor, invisible_elements=invisible_elements,
                          number_rays=n_rays,
                          remove_occluded=remove_occluded, remove_duplicates=remove_duplicates,
@@ -164,69 +270,81 @@ class SemanticCones(SemanticRay):
             self.angles_cone_center = [n * angle / (self.number_cones - 1) - angle / 2
                                        for n in range(self.number_cones)]
 
+        self._angles_cone_center = np.array(self.angles_cone_center)
+
     def _compute_raw_sensor(self, playground, *_):
 
-        super()._compute_raw_sensor(playground)
+        collision_points = self._compute_points(playground)
 
-        detections_per_cone = {}
-        for cone_angle in self.angles_cone_center:
-            detections_per_cone[cone_angle] = []
+        entities, distances, angles = self._collisions_to_arrays(playground, collision_points)
 
-        for detection in self.sensor_values:
-            # pylint: disable=all
-            cone_angle = min(self.angles_cone_center, key=lambda x: (x - detection.angle) ** 2)
-            detections_per_cone[cone_angle].append(detection)
+        cone_indices = self._bin_cones(angles)
 
-        # filter for occlusion and duplicates
+        # Detections are ordered by cone, then by ray
         if self._remove_occluded:
-            for cone_angle, detections in detections_per_cone.items():
-                detections = self._remove_cone_occlusions(detections)
-                detections_per_cone[cone_angle] = detections
+            selected = self._closest_per_cone(cone_indices, distances)
+        else:
+            selected = np.argsort(cone_indices, kind='stable')
 
-        detections_per_cone = {k: v for k, v in detections_per_cone.items() if v != []}
+        self._set_detections([entities[index] for index in selected],
+                             distances[selected],
+                             self._angles_cone_center[cone_indices[selected]])
 
-        self.sensor_values = []
+    def _bin_cones(self, angles):
+        """
+        Assigns each ray angle to the cone with the closest center.
 
-        for cone_angle, detections in detections_per_cone.items():
+        Args:
+            angles: array of ray angles.
+
+        Returns:
+            Array of cone indices.
 
-            for index, detection in enumerate(detections):
+        """
 
-                new_detection = Detection(entity=detection.entity,
-                                          distance=detection.distance,
-                                          angle=cone_angle)
+        angle_differences = angles[:, np.newaxis] - self._angles_cone_center[np.newaxis, :]
 
-                detections[index] = new_detection
+        return np.argmin(angle_differences**2, axis=1)
 
     @staticmethod
-    def _remove_cone_occlusions(detections):
+    def _closest_per_cone(cone_indices, distances):
+        """
+        Selects the closest detection of each cone.
+
+        Args:
+            cone_indices: array of cone index of each detection.
+            distances: array of distance of each detection.
+
+        Returns:
+            Indices of the selected detections, ordered by cone.
+
+        """
 
-        if not detections:
-            return detections
+        order = np.lexsort((distances, cone_indices))
+        _, first_per_cone = np.unique(cone_indices[order], return_index=True)
 
-        min_distance_detection = min(detections, key=attrgetter('distance'))
-        return [min_distance_detection]
+        return order[first_per_cone]
 
     def draw(self, width, *_):
 
         img = np.zeros((width, width, 3))
 
-        for detection in self.sensor_values:
+        for distance, angle in self._get_distances_angles():
 
-            distance = detection.distance
             if self._normalize:
                 distance *= self._range
 
             distance *= width / (2 * self._range)
 
             pos_x_1 = int(width / 2
-                          - distance * math.cos(detection.angle - self._fov/self.number_cones/2))
+                          - distance * math.cos(angle - self._fov/self.number_cones/2))
             pos_y_1 = int(width / 2
-                          - distance * math.sin(detection.angle - self._fov/self.number_cones/2))
+                          - distance * math.sin(angle - self._fov/self.number_cones/2))
 
             pos_x_2 = int(width / 2
-                          - distance * math.cos(detection.angle + self._fov/self.number_cones/2))
+                          - distance * math.cos(angle + self._fov/self.number_cones/2))
             pos_y_2 = int(width / 2
-                          - distance * math.sin(detection.angle + self._fov/self.number_cones/2))
+                          - distance * math.sin(angle + self._fov/self.number_cones/2))
 
             # pylint: disable=no-member
             cv2.line(img, (int(width / 2), int(width / 2)),
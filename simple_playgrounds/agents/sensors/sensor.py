@@ -19,6 +19,8 @@ import numpy as np
 from simple_playgrounds.utils.definitions import SensorTypes
 from simple_playgrounds.entity import Entity
 from simple_playgrounds.utils.parser import parse_configuration
+from simple_playgrounds.agents.sensors.noise import NoisePool
+from simple_playgrounds.utils.static_geometry import DYNAMIC_SHAPES_FILTER, rays_near_shapes
 
 
 class Sensor(ABC):
@@ -28,22 +30,34 @@ class Sensor(ABC):
         anchor: body Part to which the sensor is attached.
             Sensor is attached to the center of the Anchor.
         sensor_values: current values of the sensor.
+            For array sensors, it is a preallocated buffer which is updated in place.
+            Copy it if the values need to be kept after the next update.
         name: Name of the sensor.
+        noise_pool: NoisePool from which the noise is drawn. Shared by all the sensors of an agent.
+        last_update: timestep at which sensor_values were last computed. None if never computed.
 
     Class Attributes:
         sensor_type: string that represents the type of sensor (e.g. 'rgb' or 'lidar').
 
     Note:
         The anchor is always invisible to the sensor.
+        Sensors use __slots__, to keep the memory of agents with many sensors low.
+        Subclasses declare the attributes they add in their own __slots__.
 
     """
 
+    __slots__ = ('name', 'anchor', 'sensor_values', 'noise_pool', 'last_update',
+                 '_invisible_elements', '_normalize', '_dtype',
+                 '_noise', '_noise_type', '_noise_mean', '_noise_scale', '_noise_probability', '_noise_buffer',
+                 '_range', '_fov', '_resolution', '_sensor_max_value', '_update_period', '_update_phase')
+
     _index_sensor = 0
     sensor_type = SensorTypes.SENSOR
     sensor_modality = SensorTypes.SENSOR
 
     def __init__(self, anchor, fov, resolution, max_range,
-                 invisible_elements, normalize, noise_params, name=None, **_kwargs):
+                 invisible_elements, normalize, noise_params, name=None, dtype=None,
+                 update_period=1, update_phase=0, **_kwargs):
         """
         Sensors are attached to an anchor. They detect every visible Agent Part or Scene Element.
         If the entity is in invisible elements, it is not detected.
@@ -58,6 +72,12 @@ class Sensor(ABC):
             noise_params: Dictionary of noise parameters.
                 Noise is applied to the raw sensor, before normalization.
             name: name of the sensor. If not provided, a name will be chosen by default.
+            dtype: numpy dtype of the sensor values (e.g. 'uint8' for images, 'float32' for ranges).
+                Integer dtypes require normalize to be False. Default: float64.
+            update_period: number of timesteps between two computations of the sensor values.
+                In between, the sensor keeps its last values. Default: 1 (every timestep).
+            update_phase: timestep offset of the computations, between 0 and update_period - 1.
+                Allows to spread expensive sensors over different timesteps. Default: 0.
 
         Noise Parameters:
             type: 'gaussian', 'salt_pepper'
@@ -86,6 +106,13 @@ class Sensor(ABC):
 
         self._normalize = normalize
 
+        self._dtype = np.dtype(float if dtype is None else dtype)
+        if normalize and not np.issubdtype(self._dtype, np.floating):
+            raise ValueError('normalized sensors require a floating point dtype')
+
+        # Created when noise is first applied, unless the agent shares its own pool
+        self.noise_pool = None
+
         self._noise = False
         if noise_params is not None:
             self._noise = True
@@ -115,13 +142,36 @@ class Sensor(ABC):
         # Sensor max value is used for noise and normalization calculation
         self._sensor_max_value = 0
 
+        # Scratch buffer for gaussian noise, allocated with the sensor buffer
+        self._noise_buffer = None
+
+        if not update_period >= 1:
+            raise ValueError('update period must be at least 1')
+        if not 0 <= update_phase < update_period:
+            raise ValueError('update phase must be between 0 and update period - 1')
+
+        self._update_period = int(update_period)
+        self._update_phase = int(update_phase)
+        self.last_update = None
+
+    def _allocate_buffers(self):
+        """
+        Allocates the sensor values and noise buffers, once the shape of the sensor is known.
+        """
+
+        self.sensor_values = np.zeros(self.shape, dtype=self._dtype)
+
+        if self._noise and self._noise_type == 'gaussian':
+            noise_dtype = self._dtype if np.issubdtype(self._dtype, np.floating) else np.float32
+            self._noise_buffer = np.zeros(self.shape, dtype=noise_dtype)
+
     def update(self, **kwargs):
         """
         Updates the attribute sensor_values.
         Applies normalization and noise if necessary.
 
         Args:
-            **kwargs: either playground, or playground
+            **kwargs: playground, and frame of the scene (SceneFrame) for visual sensors.
 
         Returns:
 
@@ -134,17 +184,78 @@ class Sensor(ABC):
         if self._normalize:
             self._apply_normalization()
 
+    def is_due(self, timestep):
+        """
+        Checks if the sensor values should be computed at this timestep.
+        A sensor that was never computed, or computed in the future (e.g. before a reset),
+        is always due.
+
+        Args:
+            timestep: current timestep of the engine.
+
+        Returns:
+            True if the sensor should be updated.
+
+        """
+
+        if self.last_update is None or self.last_update > timestep:
+            return True
+
+        return (timestep - self._update_phase) % self._update_period == 0
+
+    def staleness(self, timestep):
+        """
+        Number of timesteps since the sensor values were computed.
+
+        Args:
+            timestep: current timestep of the engine.
+
+        Returns:
+            Staleness of the sensor values, None if they were never computed.
+
+        """
+
+        if self.last_update is None:
+            return None
+
+        return timestep - self.last_update
+
     @abstractmethod
-    def _compute_raw_sensor(self, playground, sensor_surface):
+    def _compute_raw_sensor(self, playground, frame):
         pass
 
     @abstractmethod
     def _apply_normalization(self):
         pass
 
-    @abstractmethod
     def _apply_noise(self):
-        pass
+        """
+        Applies noise in place on the sensor values, using random numbers from the noise pool.
+        Values are clipped between 0 and the sensor max value.
+        """
+
+        if self.noise_pool is None:
+            self.noise_pool = NoisePool()
+
+        if self._noise_type == 'gaussian':
+
+            noise = self._noise_buffer
+            np.multiply(self.noise_pool.standard_normal(self.shape), self._noise_scale, out=noise)
+            noise += self._noise_mean
+            noise += self.sensor_values
+            np.clip(noise, 0, self._sensor_max_value, out=noise)
+
+            np.copyto(self.sensor_values, noise, casting='unsafe')
+
+        elif self._noise_type == 'salt_pepper':
+
+            # A single uniform draw decides if a pixel is turned off, turned to max, or unchanged
+            uniform = self.noise_pool.uniform(self.shape)
+            self.sensor_values[uniform < self._noise_probability / 2] = 0
+            self.sensor_values[uniform > 1 - self._noise_probability / 2] = self._sensor_max_value
+
+        else:
+            raise ValueError
 
     @property
     def shape(self):
@@ -175,14 +286,21 @@ class RayCollisionSensor(Sensor, ABC):
     Robotic sensors and Semantic sensors inherit from this class.
 
     """
+    __slots__ = ('_remove_occluded', '_remove_duplicates', '_use_static_geometry', '_ray_angles', '_invisible_shapes',
+                 '_dynamic_shapes')
+
     sensor_modality = SensorTypes.ROBOTIC
 
-    def __init__(self, remove_occluded, remove_duplicates, **sensor_params):
+    def __init__(self, remove_occluded, remove_duplicates, static_geometry=False, **sensor_params):
         """
         Args:
             remove_occluded (bool): If True, only keeps the closest visible detection.
             remove_duplicates: If True, removes detections of the same objects on multiple rays.
                 Keeps the closest detection.
+            static_geometry: If True, hits on static occluders (walls, doors, ...) are computed
+                for all rays at once using the StaticGeometry of the playground,
+                and pymunk is only queried for dynamic shapes, up to the closest static hit.
+                Detections behind static occluders are never reported. Default: False.
             **sensor_params: Additional sensor params.
         """
 
@@ -193,25 +311,26 @@ class RayCollisionSensor(Sensor, ABC):
 
         self._remove_occluded = remove_occluded
         self._remove_duplicates = remove_duplicates
+        self._use_static_geometry = static_geometry
 
         # Need to remove occluded before removing duplicates
         if remove_duplicates:
             self._remove_occluded = True
 
-        # Field of View of the Sensor
+        # Field of View of the Sensor, as an array of ray angles
         if self._resolution == 1:
-            self._ray_angles = [0]
+            self._ray_angles = np.zeros(1)
         else:
-            self._ray_angles = [n * self._fov / (self._resolution - 1) - self._fov / 2
-                                for n in range(self._resolution)]
+            self._ray_angles = np.arange(self._resolution) * self._fov / (self._resolution - 1) - self._fov / 2
 
-        self._invisible_shapes = []
+        self._invisible_shapes = set()
 
         for entity in self._invisible_elements:
-            self._invisible_shapes += [entity.pm_visible_shape, entity.pm_interaction_shape]
-        self._invisible_shapes = list(set(self._invisible_shapes))
-        if None in self._invisible_shapes:
-            self._invisible_shapes.remove(None)
+            self._invisible_shapes.update([entity.pm_visible_shape, entity.pm_interaction_shape])
+        self._invisible_shapes.discard(None)
+
+        # Dynamic shapes of the playground, and the ones visible by the sensor
+        self._dynamic_shapes = None, []
 
     @staticmethod
     def _remove_occlusions(collisions):
@@ -224,51 +343,79 @@ class RayCollisionSensor(Sensor, ABC):
 
     @staticmethod
     def _remove_duplicate_collisions(collisions_by_angle):
+        """
+        Keeps, for each shape, only the closest of its detections across all rays.
+        Requires occlusions to be removed, so that each ray has at most one collision.
+        Single pass over the rays, keyed by shape.
+        """
 
-        all_shapes = list(set(col[0].shape
-                              for angle, col in collisions_by_angle.items()
-                              if col))
+        closest_by_shape = {}
 
-        all_collisions = []
         for angle, cols in collisions_by_angle.items():
-            all_collisions += cols
 
-        all_min_collisions = []
-        for shape in all_shapes:
-            min_col = min([col for col in all_collisions if col.shape is shape],
-                          key=attrgetter('alpha'))
-            all_min_collisions.append(min_col)
+            if not cols:
+                continue
+
+            col = cols[0]
+            closest = closest_by_shape.get(col.shape)
+
+            if closest is None or col.alpha < closest[1].alpha:
+                closest_by_shape[col.shape] = (angle, col)
 
-        # Filter out noon-min collisions
-        for angle, col in collisions_by_angle.items():
-            if col != [] and col[0] not in all_min_collisions:
+        kept_angles = {angle for angle, _ in closest_by_shape.values()}
+
+        for angle in collisions_by_angle:
+            if angle not in kept_angles:
                 collisions_by_angle[angle] = []
 
         return collisions_by_angle
 
-    def _compute_collisions(self, playground, sensor_angle):
+    def _compute_collisions(self, playground, sensor_angle, static_hit=None):
+        """
+        Computes the collisions of a single ray.
+
+        Args:
+            playground: Playground.
+            sensor_angle: angle of the ray, relative to the anchor.
+            static_hit: If the sensor uses the static geometry,
+                closest hit of the ray on static occluders (None if there is none).
+
+        Returns:
+            List of pymunk SegmentQueryInfo.
+
+        """
 
         position = self.anchor.pm_body.position
         angle = self.anchor.pm_body.angle + sensor_angle
 
-        position_end = (position[0] + self._range * math.cos(angle),
-                        position[1] + self._range * math.sin(angle)
+        if not self._use_static_geometry:
+            max_alpha = 1
+            shape_filter = pymunk.ShapeFilter()
+        elif static_hit is None:
+            max_alpha = 1
+            shape_filter = DYNAMIC_SHAPES_FILTER
+        else:
+            max_alpha = static_hit.alpha
+            shape_filter = DYNAMIC_SHAPES_FILTER
+
+        position_end = (position[0] + max_alpha * self._range * math.cos(angle),
+                        position[1] + max_alpha * self._range * math.sin(angle)
                         )
 
-        collisions = playground.space.segment_query(position, position_end, 1, pymunk.ShapeFilter())
+        collisions = playground.space.segment_query(position, position_end, 1, shape_filter)
 
-        # remove invisible entities
-        collisions_visible = [col for col in collisions
-                      if col.shape not in self._invisible_shapes and col.shape.sensor is not True
-                      if col.alpha != 0.0]
+        if max_alpha != 1:
+            collisions = [col._replace(alpha=col.alpha * max_alpha) for col in collisions]
 
-        collisions_traversable = [col for col in collisions if col.alpha != 0.0
-                  and col.shape not in self._invisible_shapes
-                  and playground.get_entity_from_shape(col.shape).pm_visible_shape is not None
-                  and playground.get_entity_from_shape(col.shape).pm_visible_shape == col.shape
-                  ]
+        if static_hit is not None:
+            collisions.append(static_hit)
 
-        collisions = collisions_visible + collisions_traversable
+        # Keep solid shapes, and visible shapes of traversable entities.
+        # Each shape is kept at most once.
+        collisions = [col for col in collisions
+                      if col.alpha != 0.0
+                      and col.shape not in self._invisible_shapes
+                      and (not col.shape.sensor or self._is_visible_shape(playground, col.shape))]
 
         # filter occlusions
         if self._remove_occluded:
@@ -276,37 +423,60 @@ class RayCollisionSensor(Sensor, ABC):
 
         return collisions
 
-    def _compute_points(self, playground):
+    @staticmethod
+    def _is_visible_shape(playground, pm_shape):
 
-        points = {}
+        entity = playground.get_entity_from_shape(pm_shape)
 
-        for sensor_angle in self._ray_angles:
+        return entity is not None and entity.pm_visible_shape is pm_shape
 
-            collisions = self._compute_collisions(playground, sensor_angle)
-            points[sensor_angle] = collisions
+    def _visible_dynamic_shapes(self, playground):
+        """
+        Dynamic shapes of the playground which are not invisible to the sensor.
+        Filtered again only when the dynamic shapes of the playground change.
+        """
 
-        if self._remove_duplicates:
-            points = self._remove_duplicate_collisions(points)
+        dynamic_shapes = playground.dynamic_shapes
 
-        return points
+        if self._dynamic_shapes[0] is not dynamic_shapes:
+            self._dynamic_shapes = dynamic_shapes, [shape for shape in dynamic_shapes
+                                                    if shape not in self._invisible_shapes]
 
-    def _apply_noise(self):
+        return self._dynamic_shapes[1]
 
-        if self._noise_type == 'gaussian':
+    def _compute_points(self, playground):
 
-            additive_noise = np.random.normal(self._noise_mean, self._noise_scale, size=self.shape)
+        points = {}
 
-        elif self._noise_type == 'salt_pepper':
+        if self._use_static_geometry:
 
-            prob = [self._noise_probability/2, 1-self._noise_probability, self._noise_probability/2]
-            additive_noise = np.random.choice([-self._sensor_max_value, 0, self._sensor_max_value],
-                                              p=prob,
-                                              size=self.shape)
+            start = self.anchor.pm_body.position
+            angles = self.anchor.pm_body.angle + self._ray_angles
+            directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+            static_hits = playground.static_geometry.query(start, directions, self._range, radius=1,
+                                                           excluded_shapes=self._invisible_shapes)
+
+            # Pymunk is only queried for rays that can hit a dynamic shape before a static one
+            lengths = [self._range * (1 if hit is None else hit.alpha) for hit in static_hits]
+            require_query = rays_near_shapes(start, directions, lengths, self._visible_dynamic_shapes(playground),
+                                             radius=1)
+
+            for sensor_angle, static_hit, query in zip(self._ray_angles.tolist(), static_hits, require_query):
+
+                if query:
+                    points[sensor_angle] = self._compute_collisions(playground, sensor_angle, static_hit)
+                else:
+                    points[sensor_angle] = [static_hit] if static_hit is not None else []
 
         else:
-            raise ValueError
 
-        self.sensor_values += additive_noise
+            for sensor_angle in self._ray_angles.tolist():
 
-        self.sensor_values[self.sensor_values < 0] = 0
-        self.sensor_values[self.sensor_values > self._sensor_max_value] = self._sensor_max_value
+                collisions = self._compute_collisions(playground, sensor_angle)
+                points[sensor_angle] = collisions
+
+        if self._remove_duplicates:
+            points = self._remove_duplicate_collisions(points)
+
+        return points
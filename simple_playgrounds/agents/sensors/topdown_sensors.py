@@ -3,6 +3,7 @@ Module that defines TopDown Sensors.
 Topdown sensors are based computed using the image provided by the environment.
 """
 import math
+import sys
 import numpy as np
 
 import cv2
@@ -14,12 +15,52 @@ from simple_playgrounds.utils.parser import parse_configuration
 
 # pylint: disable=no-member
 
+_CONTACT_MARGIN = 10
+
+
+def _surface_pixels(surface):
+    """
+    Pixels of a surface, with rows along the y axis.
+
+    32-bit surfaces with byte-aligned color channels are read from their raw buffer, without copy.
+    Other layouts (e.g. 24-bit surfaces) fall back to a copy of the RGB pixels.
+
+    Args:
+        surface: Pygame Surface.
+
+    Returns:
+        Array of shape (height, width, n_channels), and the indices of the B, G, R channels.
+
+    """
+
+    shifts = surface.get_shifts()[:3]
+
+    if surface.get_bytesize() == 4 and all(shift % 8 == 0 for shift in shifts):
+
+        # Position of each channel in the bytes of a pixel depends on the endianness of the host
+        if sys.byteorder == 'little':
+            channels = tuple(shift // 8 for shift in shifts[::-1])
+        else:
+            channels = tuple(3 - shift // 8 for shift in shifts[::-1])
+
+        surface_width, surface_height = surface.get_size()
+        pixels = np.frombuffer(surface.get_buffer(), dtype=np.uint8)
+        pixels = pixels.reshape(surface_height, -1, 4)[:, :surface_width]
+
+        return pixels, channels
+
+    pixels = np.ascontiguousarray(pygame.surfarray.array3d(surface).swapaxes(0, 1))
+
+    return pixels, (2, 1, 0)
+
 
 class TopdownSensor(Sensor):
     """
     TopdownSensor provides an image from bird's eye view, centered and oriented on the anchor.
     The anchor is, by default, visible to the agent.
     """
+    __slots__ = ('only_front', 'mask_total_fov', '_center', '_outside_fov', '_flip', '_sampled_img')
+
     sensor_type = SensorTypes.TOP_DOWN
     sensor_modality = SensorTypes.VISUAL
 
@@ -52,100 +93,128 @@ class TopdownSensor(Sensor):
 
         self._center = (int(self._resolution / 2) - 1, int(self._resolution / 2) - 1)
 
-        mask_total_fov = np.zeros((self._resolution, self._resolution, 3))
+        mask_total_fov = np.zeros((self._resolution, self._resolution), dtype=np.uint8)
 
         self.mask_total_fov = cv2.ellipse(mask_total_fov, self._center, axes=self._center, angle=0,
                                           startAngle=(-math.pi/2 - self._fov/2) * 180 / math.pi,
                                           endAngle=(-math.pi/2 + self._fov/2) * 180 / math.pi,
-                                          color=(1, 1, 1), thickness=-1)
+                                          color=1, thickness=-1)
 
         self._sensor_max_value = 255
 
-    def get_local_sensor_image(self, playground, sensor_surface):
+        height = self.shape[0]
 
-        all_agent_parts = []
-        for agent in playground.agents:
-            all_agent_parts += agent.parts
+        # Pixels of the sensor image that are outside of the field of view, as flat indices.
+        self._outside_fov = np.flatnonzero(self.mask_total_fov[:height, ::-1] == 0)
 
-        # take all elems and body parts which are close to sensor
-        sc_elems = [elem for elem in playground.scene_elements if
-                    self._check_elem(elem)]
-        sc_elems += [elem for elem in all_agent_parts if
-                     self._check_elem(elem)]
+        # Sensor image is flipped horizontally, compared to the rotated image.
+        self._flip = np.array([[-1, 0, self._resolution - 1],
+                               [0, 1, 0],
+                               [0, 0, 1]])
 
-        # filter invisible
-        visible_sc_elems = [elem for elem in sc_elems if elem not in self._invisible_elements]
+        # Raw image sampled from the playground surface, one channel per byte of a pixel
+        self._sampled_img = np.zeros((height, self._resolution, 4), dtype=np.uint8)
 
-        # Draw elements that are not invisible to this agent
-        for element in visible_sc_elems:
-            element.draw(sensor_surface)
+        self._allocate_buffers()
 
-        cropped = pygame.Surface((2 * self._range + 1, 2 * self._range + 1))
+    def _get_visible_surface(self, frame):
+        """
+        Masks the elements that are invisible to the sensor,
+        and the elements in contact with the anchor.
 
-        pos_x = self.anchor.position[0] + self._range - playground.width
-        pos_y = - self.anchor.position[1] + self._range
-        cropped.blit(sensor_surface, (pos_x, pos_y))
+        Args:
+            frame: SceneFrame.
 
-        img_cropped = pygame.surfarray.pixels3d(cropped).astype(float)
+        Returns:
+            Pygame Surface.
 
-        return img_cropped
+        """
 
-    def _check_elem(self, elem):
+        pm_x, pm_y = self.anchor.pm_body.position
 
-        vis_shape = elem.pm_visible_shape
+        anchor_rect = frame.get_rect(self.anchor)
+        if anchor_rect is None:
+            anchor_rect = pygame.Rect(0, 0, 2 * self.anchor.radius + 2, 2 * self.anchor.radius + 2)
+            anchor_rect.center = pm_y, pm_x
 
-        if vis_shape is not None:
-            contact_points = vis_shape.shapes_collide(self.anchor.pm_visible_shape).points
-            return (not elem.background) and len(contact_points) == 0
+        # Masks are rasterized, so rectangles of touching elements might not overlap
+        anchor_rect = anchor_rect.inflate(_CONTACT_MARGIN, _CONTACT_MARGIN)
 
-        return not elem.background
+        hidden_elements = set(self._invisible_elements)
+        hidden_elements.update(elem for elem, _, rect in frame.layers
+                               if rect.colliderect(anchor_rect) and not self._check_elem(elem))
+
+        # Region of the surface that can be seen by the sensor, whatever its orientation
+        view_size = int(2 * math.sqrt(2) * self._range) + 2
+        view_rect = pygame.Rect(0, 0, view_size, view_size)
+        view_rect.center = pm_y, pm_x
 
-    def _compute_raw_sensor(self, playground, sensor_surface):
+        return frame.get_masked_surface(hidden_elements, area=view_rect)
 
-        cropped_img = self.get_local_sensor_image(playground, sensor_surface)
+    def _get_sampling_matrix(self):
+        """
+        Computes the affine transform that maps each pixel (column, row) of the sensor image
+        to a pixel (x, y) of the playground surface.
+        It composes the horizontal flip, the rotation to the frame of the anchor,
+        the scaling to the sensor resolution and the crop around the anchor.
+
+        Returns:
+            Array of shape (2, 3).
 
-        small_img = cv2.resize(cropped_img,
-                               (self._resolution, self._resolution),
-                               interpolation=cv2.INTER_NEAREST)
+        """
 
         rot_mat = cv2.getRotationMatrix2D(self._center,
                                           self.anchor.pm_body.angle * 180 / math.pi + 90, 1.0)
-        rotated_img = cv2.warpAffine(small_img,
-                                     rot_mat, small_img.shape[1::-1],
-                                     flags=cv2.INTER_NEAREST)
+        inv_rot_mat = np.vstack([cv2.invertAffineTransform(rot_mat), [0, 0, 1]])
 
-        masked_img = self.mask_total_fov * rotated_img
+        # Columns of the resized image are along the y axis of the surface, and rows along x.
+        pm_x, pm_y = self.anchor.pm_body.position
+        scale = (2 * self._range + 1) / self._resolution
+        crop_mat = np.array([[0, scale, pm_y - self._range],
+                             [scale, 0, pm_x - self._range]])
 
-        if self.only_front:
-            masked_img = masked_img[:int(self._resolution / 2), ...]
+        return crop_mat @ inv_rot_mat @ self._flip
 
-        self.sensor_values = masked_img[:, ::-1, ::-1]
+    def _check_elem(self, elem):
 
-    def _apply_normalization(self):
-        self.sensor_values /= self._sensor_max_value
+        vis_shape = elem.pm_visible_shape
+
+        if vis_shape is not None:
+            contact_points = vis_shape.shapes_collide(self.anchor.pm_visible_shape).points
+            return (not elem.background) and len(contact_points) == 0
 
-    def _apply_noise(self):
+        return not elem.background
 
-        if self._noise_type == 'gaussian':
+    def _compute_raw_sensor(self, playground, frame):
 
-            additive_noise = np.random.normal(self._noise_mean, self._noise_scale, size=self.shape)
+        sensor_surface = self._get_visible_surface(frame)
 
-        elif self._noise_type == 'salt_pepper':
+        # View on the pixels of the surface, without copy when the layout allows it
+        raw_pixels, channels = _surface_pixels(sensor_surface)
 
-            proba = [self._noise_probability/2,
-                     1-self._noise_probability,
-                     self._noise_probability/2]
-            additive_noise = np.random.choice([-self._sensor_max_value, 0, self._sensor_max_value],
-                                              p=proba,
-                                              size=self.shape)
+        n_channels = raw_pixels.shape[2]
+        if self._sampled_img.shape[2] != n_channels:
+            self._sampled_img = np.zeros(self._sampled_img.shape[:2] + (n_channels,), dtype=np.uint8)
 
-        else:
-            raise ValueError
+        # Single sampling of the surface for crop, resize, rotation and flip
+        cv2.warpAffine(raw_pixels, self._get_sampling_matrix(), self._sampled_img.shape[1::-1],
+                       dst=self._sampled_img,
+                       flags=cv2.INTER_NEAREST | cv2.WARP_INVERSE_MAP,
+                       borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+
+        # Release the lock on the surface
+        del raw_pixels
+
+        self._sampled_img.reshape(-1, n_channels)[self._outside_fov] = 0
 
-        self.sensor_values += additive_noise
+        # Sensor values are in BGR order
+        for index_channel, channel in enumerate(channels):
+            np.copyto(self.sensor_values[..., index_channel],
+                      self._sampled_img[..., channel],
+                      casting='unsafe')
 
-        self.sensor_values[self.sensor_values < 0] = 0
-        self.sensor_values[self.sensor_values > self._sensor_max_value] = self._sensor_max_value
+    def _apply_normalization(self):
+        self.sensor_values /= self._sensor_max_value
 
     @property
     def shape(self):
@@ -161,8 +230,8 @@ class TopdownSensor(Sensor):
         image = cv2.resize(self.sensor_values, (width, height_display),
                         interpolation=cv2.INTER_NEAREST)
 
-        if not self._apply_normalization:
-            image /= 255.
+        if not self._normalize:
+            image = image / 255.
 
         return image
 
@@ -172,6 +241,8 @@ class FullPlaygroundSensor(Sensor):
     FullPlaygroundSensor provides an image from bird's eye view of the full playground.
     There is no anchor.
     """
+    __slots__ = ('_scale', '_resized_img')
+
     sensor_type = SensorTypes.FULL_PLAYGROUND
     sensor_modality = SensorTypes.VISUAL
 
@@ -202,57 +273,45 @@ class FullPlaygroundSensor(Sensor):
 
         self._sensor_max_value = 255
 
-    def get_sensor_image(self, playground, sensor_surface):
+        self._resized_img = np.zeros(self.shape, dtype=np.uint8)
 
-        all_agent_parts = []
-        for agent in playground.agents:
-            all_agent_parts += agent.parts
+        self._allocate_buffers()
 
-        # take all elems and body parts which are close to sensor
-        sc_elems = playground.scene_elements + all_agent_parts
+    def get_sensor_image(self, frame):
+        """
+        Image of the scene, without the elements that are invisible to the sensor.
 
-        # filter invisible
-        visible_sc_elems = [elem for elem in sc_elems if elem not in self._invisible_elements]
+        Args:
+            frame: SceneFrame.
+
+        Returns:
+            Array view on the pixels of the frame, in BGR order.
+
+        """
 
-        # Draw elements that are not invisible to this agent
-        for element in visible_sc_elems:
-            element.draw(sensor_surface)
+        sensor_surface = frame.get_masked_surface(set(self._invisible_elements))
 
-        img = pygame.surfarray.pixels3d(sensor_surface).astype(float)
+        # View on the pixels of the surface, without copy
+        img = pygame.surfarray.pixels3d(sensor_surface)
         np_image = np.rot90(img, 1, (1, 0))
         np_image = np_image[::-1, :, ::-1]
 
         return np_image
 
-    def _compute_raw_sensor(self, playground, sensor_surface):
+    def _compute_raw_sensor(self, playground, frame):
 
-        full_image = self.get_sensor_image(playground, sensor_surface)
-
-        self.sensor_values = cv2.resize(full_image, (self._scale[0], self._scale[1]), interpolation=cv2.INTER_NEAREST)
-
-    def _apply_normalization(self):
-        self.sensor_values /= self._sensor_max_value
+        full_image = self.get_sensor_image(frame)
 
-    def _apply_noise(self):
+        cv2.resize(full_image, (self._scale[0], self._scale[1]),
+                   dst=self._resized_img, interpolation=cv2.INTER_NEAREST)
 
-        if self._noise_type == 'gaussian':
+        # Release the lock on the surface
+        del full_image
 
-            additive_noise = np.random.normal(self._noise_mean, self._noise_scale, size=self.shape)
+        self.sensor_values[...] = self._resized_img
 
-        elif self._noise_type == 'salt_pepper':
-
-            additive_noise = np.random.choice([-self._sensor_max_value, 0, self._sensor_max_value],
-                                              p=[self._noise_probability / 2, 1 - self._noise_probability,
-                                                 self._noise_probability / 2],
-                                              size=self.shape)
-
-        else:
-            raise ValueError
-
-        self.sensor_values += additive_noise
-
-        self.sensor_values[self.sensor_values < 0] = 0
-        self.sensor_values[self.sensor_values > self._sensor_max_value] = self._sensor_max_value
+    def _apply_normalization(self):
+        self.sensor_values /= self._sensor_max_value
 
     @property
     def shape(self):
@@ -266,7 +325,7 @@ class FullPlaygroundSensor(Sensor):
         image = cv2.resize(self.sensor_values, (width, height_display),
                            interpolation=cv2.INTER_NEAREST)
 
-        if not self._apply_normalization:
-            image /= 255.
+        if not self._normalize:
+            image = image / 255.
 
         return image
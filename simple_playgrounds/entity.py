@@ -27,8 +27,22 @@ from simple_playgrounds.utils.definitions import geometric_shapes, CollisionType
 class Entity(ABC):
     """
     Entity creates a physical object, and deals with interactive properties and visual appearance
+
+    Note:
+        Entities use __slots__, to keep the memory of playgrounds with many entities low.
+        Interactive properties (visible, movable, graspable, ...) stay class attributes,
+        so that subclasses can override them.
+        Subclasses declare the attributes they add in their own __slots__,
+        or keep an instance dictionary if they override these properties per instance.
     """
 
+    __slots__ = ('entity_id', 'name', 'interaction_range', 'physical_shape', 'mass',
+                 'length', 'width', 'radius', 'interaction_length', 'interaction_width', 'interaction_radius',
+                 'pm_body', 'pm_elements', 'pm_visible_shape', 'pm_interaction_shape', 'pm_grasp_shape',
+                 'visible_mask', 'interaction_mask', 'grasp_mask', 'size_playground', 'rng',
+                 '_texture_surface', '_texture_array', '_initial_position', 'trajectory', 'follows_waypoints',
+                 'is_temporary_entity', 'prev_angle', 'allow_overlapping', 'drawn')
+
     visible = True
     traversable = False
     interactive = False
@@ -39,7 +53,6 @@ class Entity(ABC):
     entity_type = None
 
     background = True
-    drawn = False
 
     def __init__(self, initial_position=None, **entity_params):
         """ Base class for entities.
@@ -63,9 +76,12 @@ class Entity(ABC):
             width_length: tuple of width, length to be set for rectangle shapes.
             radius (:obj: 'float'): radius for non-rectangle shapes.
             mass (:obj: 'float'): mass of the entity.
+            rng: numpy Generator used to generate random textures.
+                Replaced by the Generator of the playground when the entity is added to a playground.
         """
 
         # Internal counter to assign identity number and name to each entity
+        self.entity_id = Entity.index_entity
         self.name = entity_params.get('name', self.entity_type.name.lower() + '_' + str(Entity.index_entity))
         Entity.index_entity += 1
 
@@ -79,11 +95,16 @@ class Entity(ABC):
         self.pm_body = self._create_pm_body()
         self.pm_elements = [self.pm_body]
 
+        self.drawn = False
+
         # To be set when entity is added to playground. Used to calculate correct coordinates
         self.size_playground = [0, 0]
         self.velocity = [0, 0, 0]
         self.position = [0, 0, 0]
 
+        # Random number generator, set when entity is added to playground.
+        self.rng = entity_params.get('rng', None)
+
         self.texture_surface = self._create_texture(entity_params['texture'])
 
         self.pm_visible_shape = None
@@ -263,13 +284,41 @@ class Entity(ABC):
             if isinstance(texture_params, (list, tuple)):
                 texture_params = {'texture_type': 'color', 'color': texture_params}
 
-            texture_params['radius'] = self.radius
+            texture_params = {**texture_params, 'radius': self.radius}
+            if self.rng is not None:
+                texture_params['rng'] = self.rng
+
             texture = TextureGenerator.create(texture_params)
 
         texture_surface = texture.generate()
 
         return texture_surface
 
+    @property
+    def texture_surface(self):
+        """
+        Pygame Surface of the texture of the Entity.
+        """
+        return self._texture_surface
+
+    @texture_surface.setter
+    def texture_surface(self, surface):
+        self._texture_surface = surface
+        self._texture_array = None
+
+    @property
+    def texture_array(self):
+        """
+        Texture of the Entity as a numpy array of shape (width, height, 3), in RGB.
+        Indexed like the Surface: texture_array[x, y] is texture_surface.get_at((x, y)).
+        Computed once and cached until the texture surface changes.
+        """
+
+        if self._texture_array is None:
+            self._texture_array = pygame.surfarray.array3d(self._texture_surface)
+
+        return self._texture_array
+
     def _create_mask(self, is_interactive=False):
 
         # pylint: disable-all
@@ -334,7 +383,7 @@ class Entity(ABC):
             return self._initial_position
 
         if isinstance(self._initial_position, PositionAreaSampler):
-            return self._initial_position.sample()
+            return self._initial_position.sample(rng=self.rng)
 
         raise ValueError
 
@@ -466,6 +515,9 @@ class Entity(ABC):
             surface: Pygame Surface.
             draw_interaction: If True and Entity is interactive, draws the interactive area.
             force_recompute_mask: If True, the visual appearance is re-calculated.
+
+        Returns:
+            Pygame Rect where the entity was drawn, None if the entity is not visible.
         """
 
         if self.prev_angle != self.pm_body.angle or force_recompute_mask:
@@ -486,6 +538,8 @@ class Entity(ABC):
             mask_rect.center = self.pm_body.position[1], self.pm_body.position[0]
             surface.blit(self.interaction_mask, mask_rect, None)
 
+        mask_rect = None
+
         if self.visible:
 
             mask_rect = self.visible_mask.get_rect()
@@ -493,3 +547,5 @@ class Entity(ABC):
             surface.blit(self.visible_mask, mask_rect, None)
 
         self.drawn = True
+
+        return mask_rect
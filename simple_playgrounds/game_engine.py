@@ -13,8 +13,16 @@ Typical Usage:
         engine.update_observations()
 
     engine.terminate()
+
+    Engines can also be stepped from asyncio coroutines, so that one event loop interleaves many engines:
+
+    while engine.game_on:
+        actions = await policy(engine)
+        await engine.astep(actions)
 """
 
+import asyncio
+
 import numpy as np
 
 import pygame
@@ -23,7 +31,9 @@ import pygame.color
 
 import cv2
 
-from simple_playgrounds.utils.definitions import SensorTypes, SIMULATION_STEPS, ActionTypes
+from simple_playgrounds.recording import VideoRecorder
+from simple_playgrounds.utils.definitions import SensorTypes, ActionTypes
+from simple_playgrounds.utils.scene_frame import SceneFrame, surface_to_image
 
 _BORDER_IMAGE = 5
 _PYGAME_WAIT_DISPLAY = 25
@@ -45,7 +55,7 @@ class Engine:
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=line-too-long
 
-    def __init__(self, playground, time_limit=None, screen=False):
+    def __init__(self, playground, time_limit=None, screen=False, seed=None, recorder=None):
         """
         Args:
             playground (:obj: 'Playground'): Playground where the agents will be placed.
@@ -53,6 +63,10 @@ class Engine:
                                       Can also be defined in playground.
             screen: If True, a pygame screen is created for display.
                 Default: False
+            seed: If not None, re-seeds all the random streams of the playground and its agents.
+                Can be int or numpy SeedSequence. Default: None
+            recorder: If not None, EpisodeRecorder which records the steps, resets and observations
+                of the engine. Default: None
 
         Notes:
             A pygame screen is created by default if one agent is controlled by Keyboard.
@@ -67,6 +81,9 @@ class Engine:
         self.playground = playground
         self.agents = self.playground.agents
 
+        if seed is not None:
+            self.playground.seed(seed)
+
         if time_limit is not None:
             self._time_limit = time_limit
 
@@ -81,9 +98,9 @@ class Engine:
             self._screen.set_alpha(None)
             self.quit_key_ready = True
 
-        # Pygame Surfaces to display the environment
+        # Pygame Surface of the background, and frame of the scene shared by visual sensors and display
         self._surface_background = pygame.Surface((self.playground.width, self.playground.length))
-        self._surface_buffer = pygame.Surface((self.playground.width, self.playground.length))
+        self._frame = SceneFrame((self.playground.width, self.playground.length))
 
         self._surface_background.fill(pygame.Color(0, 0, 0, 0))
 
@@ -94,6 +111,12 @@ class Engine:
         self.game_on = True
         self.elapsed_time = 0
 
+        self._recorder = recorder
+        if self._recorder is not None:
+            self._recorder.start(self.playground, self.elapsed_time)
+
+        self._video = None
+
     # STEP
 
     def multiple_steps(self, actions, n_steps=1):
@@ -104,9 +127,12 @@ class Engine:
 
         Args:
             actions: Dictionary containing the actions for each agent.
+                     Actions of an agent can be a flat array, see step.
             n_steps: Number of consecutive steps where the same actions will be applied
 
         """
+        actions = self._actions_as_dicts(actions)
+
         hold_actions = {}
         last_action = {}
 
@@ -153,13 +179,19 @@ class Engine:
             for agent in self.agents:
                 agent.reward += self.playground.time_limit_reached_reward
 
+        if self._recorder is not None:
+            self._recorder.record_step(actions, self.elapsed_time)
+
+        self._capture_video_frame()
+
     def step(self, actions):
         """
         Runs a single step of the game, with the same actions for the agents.
 
         Args:
             actions: Dictionary containing the actions for each agent. keys are agents,
-                     values are dictionary of actions.
+                     values are dictionary of actions, or flat arrays of the values of all the actuators
+                     of the agent in the order of agent.get_all_actuators().
 
         """
 
@@ -170,15 +202,166 @@ class Engine:
             for agent in self.agents:
                 agent.reward += self.playground.time_limit_reached_reward
 
+        if self._recorder is not None:
+            self._recorder.record_step(self._actions_as_dicts(actions), self.elapsed_time)
+
+        self._capture_video_frame()
+
+    def frame_skip(self, actions, n_repeats, update_observations=True):
+        """
+        Fast path for action repeat (frame-skip), with the semantics of multiple_steps.
+        Actions are resolved to the body parts once, and re-applied at each repeat, as pymunk
+        clears forces after each physics step. The interactive actions (eat and activate)
+        are only performed at the last repeat.
+        Rewards are accumulated in an array, the keyboard is only checked after the last repeat,
+        and observations are only computed once.
+
+        Args:
+            actions: Dictionary containing the actions for each agent.
+                     Actions of an agent can be a flat array, see step.
+            n_repeats: Number of consecutive steps where the same actions will be applied.
+            update_observations: If True, observations are updated after the last repeat. Default: True
+
+        Returns:
+            Observations (dictionary {agent: {sensor name: sensor values}}, None if not updated),
+            array of the rewards of each agent (in the order of engine.agents) accumulated over the repeats,
+            and game_on.
+
+        """
+
+        actions = self._actions_as_dicts(actions)
+        agents = list(self.agents)
+
+        held_actions, last_actions = [], []
+
+        for agent in agents:
+
+            agent_actions = actions.get(agent, {})
+
+            last_actions.append(agent.resolve_actions(agent_actions))
+            held_actions.append(agent.resolve_actions(
+                {actuator: 0 if actuator.action in (ActionTypes.ACTIVATE, ActionTypes.EAT) else value
+                 for actuator, value in agent_actions.items()}))
+
+        rewards = np.zeros(len(agents))
+
+        for repeat in range(n_repeats):
+
+            resolved_actions = last_actions if repeat == n_repeats - 1 else held_actions
+
+            for agent, agent_actions in zip(agents, resolved_actions):
+                agent.apply_resolved_actions(agent_actions)
+
+            self.playground.update()
+            self.elapsed_time += 1
+
+            for index, agent in enumerate(agents):
+                rewards[index] += agent.reward
+
+            if self.playground.done or self._reached_time_limit():
+                break
+
+        if self._reached_time_limit() and self.playground.time_limit_reached_reward is not None:
+            rewards += self.playground.time_limit_reached_reward
+
+        for agent, reward in zip(agents, rewards.tolist()):
+            agent.reward = reward
+            agent.current_actions = actions.get(agent, {})
+
+        self._has_terminated()
+
+        if self._recorder is not None:
+            self._recorder.record_step(actions, self.elapsed_time)
+
+        self._capture_video_frame()
+
+        observations = None
+        if update_observations:
+            self.update_observations()
+            observations = {agent: {sensor.name: sensor.sensor_values for sensor in agent.sensors}
+                            for agent in agents}
+
+        return observations, rewards, self.game_on
+
+    @staticmethod
+    def _actions_as_dicts(actions):
+        """ Converts the flat action arrays of the agents to dictionaries of actions. """
+
+        return {agent: agent.actions_from_vector(agent_actions) if isinstance(agent_actions, np.ndarray)
+                else agent_actions for agent, agent_actions in actions.items()}
+
     def _engine_step(self, actions):
 
-        for agent in actions:
-            agent.apply_actions_to_body_parts(actions[agent])
+        for agent, agent_actions in actions.items():
+            if isinstance(agent_actions, np.ndarray):
+                agent.apply_action_vector(agent_actions)
+            else:
+                agent.apply_actions_to_body_parts(agent_actions)
 
-        self.playground.update(SIMULATION_STEPS)
+        self.playground.update()
 
         self.elapsed_time += 1
 
+    # ASYNCIO STEP
+
+    def _check_async(self):
+
+        if self._screen is not None:
+            raise ValueError('Engines with a screen must be stepped from the main thread')
+
+    def _step_and_observe(self, actions, n_steps, update_observations):
+
+        if n_steps == 1:
+            self.step(actions)
+        else:
+            self.multiple_steps(actions, n_steps)
+
+        if update_observations:
+            self.update_observations()
+
+    async def astep(self, actions, update_observations=True, executor=None):
+        """
+        Coroutine running a single step of the game, and updating the observations, in an executor.
+        The event loop can run other coroutines (other engines, policies) in the meantime.
+
+        Args:
+            actions: Dictionary containing the actions for each agent.
+            update_observations: If True, the observations are updated after the step. Default: True
+            executor: concurrent.futures Executor. If None, the default executor of the event loop is used.
+
+        Note:
+            A step of an engine should be awaited before the next call to the same engine.
+
+        """
+
+        self._check_async()
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self._step_and_observe, actions, 1, update_observations)
+
+    async def amultiple_steps(self, actions, n_steps=1, update_observations=True, executor=None):
+        """
+        Coroutine running multiple steps of the game in an executor (see multiple_steps and astep).
+        """
+
+        self._check_async()
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self._step_and_observe, actions, n_steps, update_observations)
+
+    async def areset(self, update_observations=True, executor=None):
+        """
+        Coroutine resetting the game in an executor (see reset and astep).
+        """
+
+        self._check_async()
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self.reset)
+
+        if update_observations:
+            await loop.run_in_executor(executor, self.update_observations)
+
     # TERMINATION CONDITIONS
 
     def _has_terminated(self):
@@ -239,20 +422,12 @@ class Engine:
 
     def _generate_surface_environment(self, with_interactions=False):
         """
-        Draw all agents and entities on the surface environment.
+        Draw all agents and entities on the frame.
         Additionally, draws the interaction areas.
 
         """
         self._update_surface_background()
-        self._surface_buffer.blit(self._surface_background, (0, 0))
-
-        for entity in self.playground.scene_elements:
-
-            if not entity.background or entity.graspable or entity.interactive:
-                entity.draw(self._surface_buffer, draw_interaction=with_interactions)
-
-        for agent in self.agents:
-            agent.draw(self._surface_buffer)
+        self._frame.render(self._surface_background, self.playground, with_interactions=with_interactions)
 
     def update_screen(self):
         """
@@ -262,7 +437,7 @@ class Engine:
         if self._screen is not None:
 
             self._generate_surface_environment(with_interactions=True)
-            rot_surface = pygame.transform.rotate(self._surface_buffer, 180)
+            rot_surface = pygame.transform.rotate(self._frame.surface, 180)
             self._screen.blit(rot_surface, (0, 0), None)
 
             pygame.display.flip()
@@ -283,9 +458,7 @@ class Engine:
 
         self._generate_surface_environment(with_interactions=True)
 
-        np_image = pygame.surfarray.pixels3d(self._surface_buffer.copy()) / 255.
-        np_image = np.rot90(np_image, 1, (1, 0))
-        np_image = np_image[::-1, :, ::-1]
+        np_image = surface_to_image(self._frame.surface)
 
         if max_size is not None:
 
@@ -297,6 +470,52 @@ class Engine:
 
         return np_image
 
+    # VIDEO
+
+    def start_video(self, path, **video_params):
+        """
+        Starts encoding a video of the playground, on a background thread.
+        A frame is captured after each step (see VideoRecorder for decimation and dropped frames).
+
+        Args:
+            path: path of the video file.
+            **video_params: parameters of the VideoRecorder
+                (fps, fourcc, queue_size, decimation, adaptive, max_decimation).
+
+        Returns:
+            VideoRecorder.
+
+        """
+
+        if self._video is not None:
+            raise ValueError('Video already started')
+
+        self._video = VideoRecorder(path, (self.playground.width, self.playground.length), **video_params)
+
+        return self._video
+
+    def stop_video(self):
+        """
+        Encodes the remaining frames and closes the video file.
+
+        Returns:
+            VideoRecorder, with the number of captured and dropped frames.
+
+        """
+
+        video, self._video = self._video, None
+
+        if video is not None:
+            video.close()
+
+        return video
+
+    def _capture_video_frame(self):
+
+        if self._video is not None and self._video.is_due(self.elapsed_time):
+            self._generate_surface_environment(with_interactions=True)
+            self._video.capture(self._frame.surface)
+
     # AGENTS
 
     def get_actions(self):
@@ -307,19 +526,28 @@ class Engine:
 
     def update_observations(self):
         """
-        Updates observations of each agent
+        Updates observations of each agent.
+        Sensors that are not due at this timestep (see update_period) keep their last values.
+        The scene is drawn once, and the frame is shared by all visual sensors.
 
         """
 
+        frame_rendered = False
+
         for agent in self.agents:
 
             for sensor in agent.sensors:
 
+                if not sensor.is_due(self.elapsed_time):
+                    continue
+
                 if sensor.sensor_modality is SensorTypes.VISUAL:
 
-                    self._update_surface_background()
-                    self._surface_buffer.blit(self._surface_background, (0, 0))
-                    sensor.update(playground=self.playground, sensor_surface=self._surface_buffer)
+                    if not frame_rendered:
+                        self._generate_surface_environment()
+                        frame_rendered = True
+
+                    sensor.update(playground=self.playground, frame=self._frame)
 
                 elif sensor.sensor_modality is SensorTypes.ROBOTIC \
                         or sensor.sensor_modality is SensorTypes.SEMANTIC:
@@ -328,6 +556,24 @@ class Engine:
                 else:
                     raise ValueError("Sensor Modality not recognized")
 
+                sensor.last_update = self.elapsed_time
+
+        if self._recorder is not None:
+            self._recorder.record_observations()
+
+    def get_observations_staleness(self):
+        """
+        Number of timesteps since the values of each sensor were computed.
+
+        Returns:
+            Dictionary with agents as keys, and dictionaries {sensor name: staleness} as values.
+            Staleness is None for sensors that were never computed.
+
+        """
+
+        return {agent: {sensor.name: sensor.staleness(self.elapsed_time) for sensor in agent.sensors}
+                for agent in self.agents}
+
     def generate_agent_image(self, agent,
                              with_pg=True,
                              max_size_pg=200,
@@ -450,6 +696,13 @@ class Engine:
         self.elapsed_time = 0
         self.game_on = True
 
+        for agent in self.agents:
+            for sensor in agent.sensors:
+                sensor.last_update = None
+
+        if self._recorder is not None:
+            self._recorder.record_reset(self.elapsed_time)
+
         # Redraw everything
         self._surface_background.fill(pygame.Color(0, 0, 0, 0))
 
@@ -10,19 +10,76 @@ Examples can be found in :
     - simple_playgrounds/playgrounds/collection
 """
 
+import math
 import os
+import sys
 from abc import ABC
+from collections import Counter, defaultdict
 import yaml
 import pymunk
 
 
 from simple_playgrounds.utils.position_utils import PositionAreaSampler
-from simple_playgrounds.utils.definitions import SPACE_DAMPING, CollisionTypes, SceneElementTypes
+from simple_playgrounds.utils.definitions import SPACE_DAMPING, SIMULATION_STEPS, SPATIAL_HASH_DEFAULT_CELL, \
+    SPATIAL_HASH_CELL_SCALE, CollisionTypes, SceneElementTypes
+from simple_playgrounds.utils.rng_utils import as_seed_sequence, spawn_rng
+from simple_playgrounds.utils.indexed_collection import IndexedCollection
+from simple_playgrounds.utils.static_geometry import StaticGeometry, is_static_occluder, STATIC_OCCLUDER_CATEGORY
 
 # pylint: disable=unused-argument
 # pylint: disable=line-too-long
 
 
+def _shape_half_size(shape):
+    """ Half of the thickness of a pymunk shape, i.e. the smallest distance from its center to its boundary. """
+
+    if isinstance(shape, pymunk.Circle):
+        return shape.radius
+
+    if isinstance(shape, pymunk.Segment):
+        return shape.radius
+
+    vertices = shape.get_vertices()
+    center = sum(vertices, pymunk.Vec2d(0, 0)) / len(vertices)
+
+    distances = []
+    for vertex, next_vertex in zip(vertices, vertices[1:] + vertices[:1]):
+        edge = next_vertex - vertex
+        if edge.length > 0:
+            distances.append(abs(edge.cross(center - vertex)) / edge.length)
+
+    return min(distances, default=0) + shape.radius
+
+
+def _is_sleeping(pm_body):
+    """ True if a pymunk body is dynamic and sleeping. Static bodies never sleep. """
+
+    return pm_body.body_type == pymunk.Body.DYNAMIC and pm_body.is_sleeping
+
+
+def _median_shape_size(shapes):
+    """ Median of the largest dimension of the bounding boxes of pymunk shapes, None if there are no shapes. """
+
+    sizes = sorted(max(shape.bb.right - shape.bb.left, shape.bb.top - shape.bb.bottom) for shape in shapes)
+
+    if not sizes:
+        return None
+
+    return max(sizes[len(sizes) // 2], 1)
+
+
+def _shape_extent(shape):
+    """ Largest distance from the center of the body of a pymunk shape to its boundary. """
+
+    if isinstance(shape, pymunk.Circle):
+        return shape.offset.length + shape.radius
+
+    if isinstance(shape, pymunk.Segment):
+        return max(shape.a.length, shape.b.length) + shape.radius
+
+    return max(vertex.length for vertex in shape.get_vertices()) + shape.radius
+
+
 class Playground(ABC):
     """ Playground is a Base Class that manages the physical simulation.
 
@@ -30,12 +87,19 @@ class Playground(ABC):
 
     Attributes:
         size: size of the scene (width, length).
-        scene_elements: list of SceneElements present in the Playground.
-        fields: list of fields producing SceneElements in the Playground.
-        agents: list of Agents present in the Playground.
+        scene_elements: IndexedCollection of SceneElements present in the Playground.
+        fields: IndexedCollection of fields producing SceneElements in the Playground.
+        agents: IndexedCollection of Agents present in the Playground.
         initial_agent_position: position or PositionAreaSampler,
             Starting position of an agent (single agent).
         done: bool, True if the playground reached termination.
+        rng: numpy Generator used for all random events of the playground.
+        physics_threads: number of threads of the pymunk solver.
+        substeps: number of physics substeps of the last update.
+        substep_counts: Counter of the number of substeps chosen at each update.
+        sleeping_elements: list of the movable SceneElements which are currently sleeping.
+        broadphase: 'tree' or 'spatial_hash', collision broadphase of the pymunk space.
+        broadphase_params: (cell size, cell count) of the spatial hash, None for the tree.
 
     Notes:
           In the case of multi-agent setting, individual initial positions can be defined when
@@ -48,24 +112,73 @@ class Playground(ABC):
     _scene_entities = []
     time_limit_reached_reward = None
 
-    def __init__(self, size):
+    def __init__(self, size, seed=None, physics_threads=1):
+        """
+        Args:
+            size: size of the scene (width, length).
+            seed: None, int or numpy SeedSequence.
+                All the random streams of the playground (scene elements, agents, controllers, sensors)
+                are derived from this seed. Use utils.rng_utils.spawn_seeds to seed parallel workers.
+            physics_threads: number of threads of the pymunk solver (1 or 2).
+                With 2 threads, the threaded solver of pymunk is used. It only pays off for crowded
+                playgrounds, and is not available on Windows.
+                See benchmarks/benchmark_physics_threads.py.
+        """
 
         # Generate Scene
         self.size = size
         self._width, self._length = self.size
 
         # Initialization of the pymunk space, modelling all the physics
-        self.space = self._initialize_space()
+        self.physics_threads = physics_threads
+        self.space = self._initialize_space(physics_threads)
+
+        # Physics substeps of each update, fixed unless adaptive substepping is configured
+        self.substeps = SIMULATION_STEPS
+        self.substep_counts = Counter()
+        self._substeps_params = None
+        self._min_shape_size = None
+        self._body_radii = None
+
+        # Pymunk bounding box tree, unless a spatial hash is configured
+        self.broadphase = 'tree'
+        self.broadphase_params = None
+
+        # Movable elements at rest can be put to sleep, see configure_sleeping
+        self._sleeping_enabled = False
+        self._entities_to_wake = set()
 
         # Public attributes for entities in the playground
-        self.scene_elements = []
-        self.fields = []
-        self.agents = []
+        self.scene_elements = IndexedCollection()
+        self.fields = IndexedCollection()
+        self.agents = IndexedCollection()
+
+        # Indexes of entities and agents by pymunk shape
+        self._shape_to_entity = {}
+        self._shape_to_agent = {}
+
+        # Random streams, derived from a single seed
+        self._seed_sequence = None
+        self.rng = None
+        self.seed(seed)
 
         # Private attributes for managing interactions in playground
-        self._disappeared_scene_elements = []
-        self._grasped_scene_elements = {}
-        self._teleported = []
+        self._disappeared_scene_elements = IndexedCollection()
+        self._teleported = set()
+
+        # Number of interaction areas of each scene element overlapped by each agent, updated by collision callbacks.
+        # Indexed by agent, and by scene element, so that removals only visit the affected entries.
+        self._overlaps = {}
+        self._overlapping_agents = {}
+
+        # Scene element held by each grasping part, and grasp constraints reused across grasps, indexed by element
+        self._held_elements = {}
+        self._grasp_constraints = {}
+
+        # Geometry of static occluders, and other shapes, rebuilt lazily when they change
+        self._static_occluders = IndexedCollection()
+        self._static_geometry = None
+        self._dynamic_shapes = None
 
         # Add entities declared in the scene
         for scene_entity in self._scene_entities:
@@ -76,6 +189,317 @@ class Playground(ABC):
 
         self._handle_interactions()
 
+    def seed(self, seed=None):
+        """ Seeds all random streams of the playground.
+
+        The playground Generator is re-created, and agents present in the playground
+        receive new independent streams spawned from the same seed.
+
+        Args:
+            seed: None, int or numpy SeedSequence.
+
+        """
+
+        self._seed_sequence = as_seed_sequence(seed)
+        self.rng = spawn_rng(self._seed_sequence)
+
+        for scene_element in self.scene_elements:
+            scene_element.rng = self.rng
+
+        for field in self.fields:
+            field.rng = self.rng
+
+        for agent in self.agents:
+            agent.set_random_state(self._seed_sequence.spawn(1)[0])
+
+    @property
+    def static_geometry(self):
+        """
+        StaticGeometry of the static occluders (walls, doors, ...) of the playground.
+        Rebuilt when a static occluder is added or removed.
+        """
+
+        if self._static_geometry is None:
+            self._static_geometry = StaticGeometry([elem.pm_visible_shape for elem in self._static_occluders])
+
+        return self._static_geometry
+
+    @property
+    def dynamic_shapes(self):
+        """
+        Shapes of the playground which are not static occluders, queried with pymunk by sensors
+        using the StaticGeometry. Updated when entities are added or removed.
+        """
+
+        if self._dynamic_shapes is None:
+            self._dynamic_shapes = [shape for shape in self.space.shapes
+                                    if shape.filter.categories != STATIC_OCCLUDER_CATEGORY]
+
+        return self._dynamic_shapes
+
+    @property
+    def held_elements(self):
+        """ Dictionary with grasping parts as keys, and the scene elements they hold as values. """
+        return dict(self._held_elements)
+
+    def invalidate_static_geometry(self):
+        """
+        Forces the StaticGeometry to be rebuilt.
+        Required if a static scene element is moved without being removed from the playground.
+        """
+
+        self._static_geometry = None
+
+    def configure_substeps(self, adaptive=False, substeps=SIMULATION_STEPS,
+                           min_substeps=1, max_substeps=2 * SIMULATION_STEPS, max_displacement=0.5):
+        """ Configures the number of physics substeps of each update.
+
+        In adaptive mode, the number of substeps is chosen at each update so that no body moves
+        by more than max_displacement times the half-size of the smallest shape during a substep.
+        Slow scenes are simulated with few substeps, and fast ones with more substeps to remain stable.
+        The chosen counts are recorded in substep_counts.
+
+        Forces applied by the actions only act during the first substep, as pymunk clears them after each step.
+        In adaptive mode, they are scaled so that each action transmits the same impulse
+        as with a fixed number of substeps, and agents follow the same trajectories in both modes.
+
+        Args:
+            adaptive: if True, the number of substeps is chosen from the velocities of the bodies.
+            substeps: number of substeps when adaptive is False,
+                and reference number of substeps used to scale the forces in adaptive mode.
+            min_substeps: minimum number of substeps in adaptive mode.
+            max_substeps: maximum number of substeps in adaptive mode.
+            max_displacement: maximum displacement during a substep, relative to the half-size of the smallest shape.
+
+        """
+
+        if adaptive:
+
+            if not 1 <= min_substeps <= max_substeps:
+                raise ValueError('Substep bounds should satisfy 1 <= min_substeps <= max_substeps')
+
+            if max_displacement <= 0:
+                raise ValueError('max_displacement should be positive')
+
+            if substeps < 1:
+                raise ValueError('The number of substeps should be at least 1')
+
+            self._substeps_params = (min_substeps, max_substeps, max_displacement, substeps)
+
+        else:
+
+            if substeps < 1:
+                raise ValueError('The number of substeps should be at least 1')
+
+            self._substeps_params = None
+            self.substeps = substeps
+
+    def configure_sleeping(self, enabled=True, idle_speed=0.1, sleep_time=10):
+        """ Configures the sleeping of movable bodies at rest.
+
+        Bodies which move slower than idle_speed for sleep_time are put to sleep by pymunk:
+        they are not integrated nor collided until they are woken up.
+        Sleeping elements are woken up by contacts with awake bodies (including agents teleported onto them),
+        and by the playground when they are grasped, activated or eaten, or when a waypoint-following element
+        moves onto them.
+        The per-step work of sleeping elements (pre_step) is skipped.
+
+        Args:
+            enabled: if False, bodies never sleep (default pymunk behavior).
+            idle_speed: speed under which a body is considered at rest, in pixels per step.
+            sleep_time: duration of rest after which a body falls asleep, in steps.
+
+        """
+
+        if enabled:
+
+            if idle_speed <= 0 or sleep_time <= 0:
+                raise ValueError('idle_speed and sleep_time should be positive')
+
+            self.space.idle_speed_threshold = idle_speed
+            self.space.sleep_time_threshold = sleep_time
+
+        else:
+
+            self.space.sleep_time_threshold = float('inf')
+
+            for elem in self.sleeping_elements:
+                elem.pm_body.activate()
+
+        self._sleeping_enabled = enabled
+
+    @property
+    def sleeping_elements(self):
+        """ Movable scene elements which are currently sleeping. """
+
+        return [elem for elem in self.scene_elements if _is_sleeping(elem.pm_body)]
+
+    def _wake(self, entity):
+        """
+        Wakes up the body of an entity after the current physics step.
+        Pymunk corrupts its contact graph if a body is woken up from a collision callback.
+        """
+
+        if _is_sleeping(entity.pm_body):
+            self._entities_to_wake.add(entity)
+
+    def _wake_entities(self):
+
+        for entity in self._entities_to_wake:
+            if _is_sleeping(entity.pm_body):
+                entity.pm_body.activate()
+
+        self._entities_to_wake.clear()
+
+    def _wake_overlapping(self, entity):
+        """
+        Wakes up the sleeping bodies overlapping an entity moved by the playground.
+        Pymunk doesn't collide sleeping bodies with static bodies, so they would not be woken by contact.
+        """
+
+        for pm_shape in entity.pm_elements:
+
+            if not isinstance(pm_shape, pymunk.Shape) or pm_shape.sensor:
+                continue
+
+            for shape in self.space.bb_query(pm_shape.bb, pymunk.ShapeFilter()):
+                if _is_sleeping(shape.body):
+                    shape.body.activate()
+
+    def configure_broadphase(self, broadphase='spatial_hash', cell_size=None, count=None):
+        """ Configures the collision broadphase of the pymunk space.
+
+        By default, pymunk indexes shapes with a bounding box tree.
+        A spatial hash can be faster for scenes with many objects of similar sizes.
+        Its parameters are tuned from the current scene, so this method should be called once
+        the scene elements and agents are added:
+            - the cell size is twice the median size of the movable shapes (or of all shapes in static scenes),
+            - the number of cells covers the playground, and is at least 10 times the number of shapes.
+
+        The bounding box tree remains the default, even for large scenes.
+        It doesn't depend on the sizes of the shapes, which are not known when the playground is created,
+        and pymunk can't revert to it once a spatial hash is used.
+        The spatial hash also indexes the static shapes, and long walls cover many cells:
+        on large sparse scenes with many movable elements, the tree is faster.
+        See benchmarks/benchmark_broadphase.py to compare both broadphases on a scene.
+
+        Args:
+            broadphase: 'tree' or 'spatial_hash'.
+            cell_size: size of the cells of the spatial hash. Tuned from the shapes if None.
+            count: number of cells of the spatial hash. Tuned from the playground size if None.
+
+        Returns:
+            (cell size, count) of the spatial hash, None for the tree.
+
+        """
+
+        if broadphase == 'tree':
+
+            # Pymunk can't revert to the bounding box tree
+            if self.broadphase != 'tree':
+                raise ValueError('The broadphase of the space is already a spatial hash')
+
+            return None
+
+        if broadphase != 'spatial_hash':
+            raise ValueError('Broadphase should be tree or spatial_hash, got {}'.format(broadphase))
+
+        shapes = [shape for shape in self.space.shapes if not shape.sensor]
+
+        if cell_size is None:
+            cell_size = _median_shape_size(shape for shape in shapes if shape.body.body_type != pymunk.Body.STATIC)
+        if cell_size is None:
+            cell_size = _median_shape_size(shapes)
+        if cell_size is None:
+            cell_size = SPATIAL_HASH_DEFAULT_CELL
+        else:
+            cell_size *= SPATIAL_HASH_CELL_SCALE
+
+        if count is None:
+            n_cells = math.ceil(self._width / cell_size) * math.ceil(self._length / cell_size)
+            count = max(n_cells, 10 * len(self.space.shapes))
+
+        self.space.use_spatial_hash(cell_size, count)
+
+        self.broadphase = 'spatial_hash'
+        self.broadphase_params = cell_size, count
+
+        return self.broadphase_params
+
+    @property
+    def min_shape_size(self):
+        """ Half-size of the smallest colliding shape of the playground. """
+
+        if self._min_shape_size is None:
+            self._measure_shapes()
+
+        return self._min_shape_size
+
+    def _measure_shapes(self):
+        """ Measures the smallest colliding shape, and the radius of each body around its center of rotation. """
+
+        sizes = []
+        self._body_radii = defaultdict(float)
+
+        for shape in self.space.shapes:
+
+            if not shape.sensor:
+                sizes.append(_shape_half_size(shape))
+
+            self._body_radii[shape.body] = max(self._body_radii[shape.body], _shape_extent(shape))
+
+        self._min_shape_size = max(min(sizes, default=1), 1)
+
+    def _choose_substeps(self):
+        """ Computes the number of substeps of the next update, in adaptive mode.
+
+        The speed of each body at the end of the update is bounded by its current speed,
+        the speed due to its rotation, and the velocity change due to the forces applied by the actions.
+        """
+
+        min_substeps, max_substeps, max_displacement, reference_substeps = self._substeps_params
+        min_shape_size = self.min_shape_size
+
+        max_speed = 0
+        for body in self.space.bodies:
+
+            if body.body_type == pymunk.Body.STATIC or body.is_sleeping:
+                continue
+
+            speed = body.velocity.length + abs(body.angular_velocity) * self._body_radii[body]
+            if body.body_type == pymunk.Body.DYNAMIC:
+                speed += body.force.length / (body.mass * reference_substeps)
+
+            max_speed = max(max_speed, speed)
+
+        substeps = math.ceil(max_speed / (max_displacement * min_shape_size))
+
+        return min(max(substeps, min_substeps), max_substeps)
+
+    def _scale_action_forces(self):
+        """ Scales the forces applied by the actions to the number of substeps of the next update.
+
+        The forces act during the first substep only, so they are scaled by the ratio between
+        the number of substeps and the reference number of substeps to transmit the same impulse.
+        """
+
+        reference_substeps = self._substeps_params[3]
+        if self.substeps == reference_substeps:
+            return
+
+        ratio = self.substeps / reference_substeps
+
+        for body in self.space.bodies:
+
+            if body.body_type != pymunk.Body.DYNAMIC or body.is_sleeping:
+                continue
+
+            # Setting the force of a body wakes it up, so only bodies pushed by actions are modified
+            if body.force != (0, 0):
+                body.force = body.force * ratio
+            if body.torque != 0:
+                body.torque = body.torque * ratio
+
     @staticmethod
     def parse_configuration(key):
         """ Private method that parses yaml configuration files.
@@ -97,40 +521,72 @@ class Playground(ABC):
         return default_config[key]
 
     @staticmethod
-    def _initialize_space():
+    def _initialize_space(threads=1):
         """ Method to initialize Pymunk empty space for 2D physics.
 
+        Args:
+            threads: number of threads of the solver. Pymunk supports at most 2 threads.
+
         Returns: Pymunk Space
 
         """
 
-        space = pymunk.Space()
+        if threads not in (1, 2):
+            raise ValueError('Pymunk physics can only run on 1 or 2 threads, got {}'.format(threads))
+
+        if threads > 1:
+            if sys.platform == 'win32':
+                raise ValueError('Threaded physics is not supported by pymunk on Windows')
+
+            space = pymunk.Space(threaded=True)
+            space.threads = threads
+
+        else:
+            space = pymunk.Space()
+
         space.gravity = pymunk.Vec2d(0., 0.)
         space.damping = SPACE_DAMPING
 
         return space
 
-    def update(self, steps):
+    def update(self, steps=None):
         """ Update the Playground
 
         Update all SceneElements, Fields, Timers and Grasps
         Runs the Physics engine for n steps.
 
         Args:
-            steps: Number of steps
+            steps: Number of steps. If None, the number of substeps configured with configure_substeps is used.
 
         """
 
         for agent in self.agents:
             agent.pre_step()
 
+        if steps is None:
+            if self._substeps_params is not None:
+                self.substeps = self._choose_substeps()
+                self._scale_action_forces()
+            steps = self.substeps
+
+        self.substep_counts[steps] += 1
+
         for _ in range(steps):
             self.space.step(1. / steps)
 
+            if self._entities_to_wake:
+                self._wake_entities()
+
         for elem in self.scene_elements:
-            elem.pre_step()
+
             if elem.follows_waypoints:
+                elem.pre_step()
                 self.space.reindex_shapes_for_body(elem.pm_body)
+                if self._sleeping_enabled:
+                    self._wake_overlapping(elem)
+
+            elif not (self._sleeping_enabled and elem.pm_body.is_sleeping):
+                elem.pre_step()
 
         self._fields_produce()
         self._check_timers()
@@ -190,6 +646,9 @@ class Playground(ABC):
         # Inform agent of the playground size
         agent.size_playground = self.size
 
+        # Independent random streams for the agent, its controller and its sensors
+        agent.set_random_state(self._seed_sequence.spawn(1)[0])
+
         # Set initial position
         if agent.initial_position is not None:
             pass
@@ -240,6 +699,11 @@ class Playground(ABC):
 
         for body_part in agent.parts:
             self.space.add(*body_part.pm_elements)
+            self._shape_to_entity[body_part.pm_visible_shape] = body_part
+            self._shape_to_agent[body_part.pm_visible_shape] = agent
+
+        self._min_shape_size = None
+        self._dynamic_shapes = None
 
     def _agent_colliding(self, agent):
 
@@ -287,6 +751,7 @@ class Playground(ABC):
             if scene_element in self.fields:
                 raise ValueError('Field already in Playground')
 
+            scene_element.rng = self.rng
             self.fields.append(scene_element)
 
         else:
@@ -295,6 +760,7 @@ class Playground(ABC):
 
             # Else
             scene_element.size_playground = self.size
+            scene_element.rng = self.rng
 
             if scene_element.background or allow_overlapping:
                 self._add_scene_element(scene_element, keep_position)
@@ -332,8 +798,17 @@ class Playground(ABC):
 
         self.space.add(*new_scene_element.pm_elements)
         self.scene_elements.append(new_scene_element)
-        if new_scene_element in self._disappeared_scene_elements:
-            self._disappeared_scene_elements.remove(new_scene_element)
+        self._min_shape_size = None
+        self._dynamic_shapes = None
+
+        for pm_element in new_scene_element.pm_elements:
+            self._shape_to_entity[pm_element] = new_scene_element
+
+        if is_static_occluder(new_scene_element):
+            new_scene_element.pm_visible_shape.filter = pymunk.ShapeFilter(categories=STATIC_OCCLUDER_CATEGORY)
+            self._static_occluders.append(new_scene_element)
+            self._static_geometry = None
+        self._disappeared_scene_elements.discard(new_scene_element)
 
     def _entity_colliding(self, entity):
 
@@ -367,13 +842,23 @@ class Playground(ABC):
             return False
 
         for part in agent.parts:
+            self._release_grasp(part)
             self.space.remove(*part.pm_elements)
             part.velocity = [0, 0, 0]
-            part.grasped = []
+
+            self._shape_to_entity.pop(part.pm_visible_shape, None)
+            self._shape_to_agent.pop(part.pm_visible_shape, None)
+
+        for element in self._overlaps.pop(agent, {}):
+            self._discard_overlapping_agent(agent, element)
+
+        self._teleported = {pair for pair in self._teleported if pair[0] is not agent}
 
         agent.initial_position = None
 
         self.agents.remove(agent)
+        self._min_shape_size = None
+        self._dynamic_shapes = None
 
         return True
 
@@ -391,22 +876,35 @@ class Playground(ABC):
 
         self.space.remove(*scene_element.pm_elements)
         self.scene_elements.remove(scene_element)
+        self._min_shape_size = None
+        self._dynamic_shapes = None
+
+        for pm_element in scene_element.pm_elements:
+            self._shape_to_entity.pop(pm_element, None)
+
+        if scene_element in self._static_occluders:
+            self._static_occluders.remove(scene_element)
+            self._static_geometry = None
 
         if not scene_element.is_temporary_entity:
             self._disappeared_scene_elements.append(scene_element)
 
-        for elem in self.scene_elements:
-            if elem.entity_type == SceneElementTypes.DISPENSER and scene_element in elem.produced_entities:
-                elem.produced_entities.remove(scene_element)
+        if scene_element.produced_by is not None:
+            scene_element.produced_by.produced_entities.discard(scene_element)
 
-        for field in self.fields:
-            if scene_element in field.produced_entities:
-                field.produced_entities.remove(scene_element)
+        # Parts holding the element have grasp constraints with it
+        for part in list(self._grasp_constraints.get(scene_element, ())):
+            if self._held_elements.get(part) is scene_element:
+                self._release_grasp(part)
 
-        if scene_element in self._grasped_scene_elements.keys():
-            body_part = self._grasped_scene_elements[scene_element]
-            self.space.remove(*body_part.grasped)
-            body_part.grasped = []
+        for agent in self._overlapping_agents.pop(scene_element, ()):
+            del self._overlaps[agent][scene_element]
+            if not self._overlaps[agent]:
+                del self._overlaps[agent]
+
+        # Temporary elements never come back, so their grasp constraints can't be reused
+        if scene_element.is_temporary_entity:
+            self._grasp_constraints.pop(scene_element, None)
 
         return True
 
@@ -434,61 +932,127 @@ class Playground(ABC):
 
     def _release_grasps(self):
 
-        for agent in self.agents:
+        for part in list(self._held_elements):
+            if not part.is_holding:
+                self._release_grasp(part)
+
+    def _release_grasp(self, part):
+        """
+        Removes the grasp constraints of a part from the space. They are kept for the next grasp.
+        """
+
+        element_held = self._held_elements.pop(part, None)
+
+        if element_held is not None:
+            self.space.remove(*self._grasp_constraints[element_held][part])
 
-            for part in agent.parts:
-                if not part.is_holding and part.can_grasp:
+    def _get_grasp_constraints(self, part, element):
+        """
+        Constraints holding an element in a part, created at the first grasp.
+        Pymunk constraints can't change bodies, so they are created once per part and element.
+        When they are reused, pin joints are reset to the current distance between the bodies.
+        """
 
-                    for joint in part.grasped:
-                        self.space.remove(joint)
-                    part.grasped = []
+        constraints_by_part = self._grasp_constraints.setdefault(element, {})
+        constraints = constraints_by_part.get(part)
 
-        for element_grasped, part in self._grasped_scene_elements.copy().items():
-            if not part.grasped:
-                self._grasped_scene_elements.pop(element_grasped)
+        if constraints is None:
+            j_1 = pymunk.PinJoint(part.pm_body, element.pm_body, (0, 5), (0, 0))
+            j_2 = pymunk.PinJoint(part.pm_body, element.pm_body, (0, -5), (0, 0))
+            motor = pymunk.SimpleMotor(part.pm_body, element.pm_body, 0)
+
+            constraints = constraints_by_part[part] = (j_1, j_2, motor)
+
+        else:
+            for joint in constraints[:2]:
+                anchor_a = joint.a.local_to_world(joint.anchor_a)
+                anchor_b = joint.b.local_to_world(joint.anchor_b)
+                joint.distance = anchor_a.get_distance(anchor_b)
+
+        return constraints
 
     def _check_teleports(self):
 
-        for agent, teleport in self._teleported:
+        # Agents can be teleported again once they left their arrival element
+        self._teleported = {(agent, target) for agent, target in self._teleported
+                            if agent.is_teleporting or self._agent_overlaps_with_element(agent, target)}
 
-            overlaps = self._agent_overlaps_with_element(agent, teleport)
+    def _agent_overlaps_with_element(self, agent, element):
 
-            if not overlaps and not agent.is_teleporting:
-                self._teleported.remove((agent, teleport))
+        return element in self._overlaps.get(agent, ())
 
-    @staticmethod
-    def _agent_overlaps_with_element(agent, element):
+    def _agent_begins_overlap(self, arbiter, space, data):
 
-        overlaps = False
+        agent = self._get_agent_from_shape(arbiter.shapes[0])
+        element = self._get_element_from_interaction_shape(arbiter.shapes[1])
 
-        for part in agent.parts:
+        if agent is not None and element is not None:
+            overlaps = self._overlaps.setdefault(agent, {})
+            overlaps[element] = overlaps.get(element, 0) + 1
+            self._overlapping_agents.setdefault(element, set()).add(agent)
+
+        return True
+
+    def _agent_ends_overlap(self, arbiter, space, data):
+
+        agent = self._get_agent_from_shape(arbiter.shapes[0])
+        element = self._get_element_from_interaction_shape(arbiter.shapes[1])
 
-            if element.pm_visible_shape is not None:
-                overlaps = overlaps or part.pm_visible_shape.shapes_collide(element.pm_visible_shape).points
+        if agent is None or element is None:
+            return
 
-            if element.pm_interaction_shape is not None:
-                overlaps = overlaps or part.pm_visible_shape.shapes_collide(element.pm_interaction_shape).points
+        overlaps = self._overlaps.get(agent)
 
-        return overlaps
+        if overlaps is None or element not in overlaps:
+            return
+
+        overlaps[element] -= 1
+
+        if overlaps[element] == 0:
+            del overlaps[element]
+            if not overlaps:
+                del self._overlaps[agent]
+            self._discard_overlapping_agent(agent, element)
+
+    def _discard_overlapping_agent(self, agent, element):
+
+        agents = self._overlapping_agents[element]
+        agents.discard(agent)
+
+        if not agents:
+            del self._overlapping_agents[element]
+
+    def _get_element_from_interaction_shape(self, pm_shape):
+        """
+        Returns: Returns the Scene Element if the pymunk shape is its interaction or grasp area,
+            None otherwise (e.g. for the shape of its body).
+
+        """
+        element = self._get_scene_element_from_shape(pm_shape)
+
+        if element is not None and pm_shape in (element.pm_interaction_shape, element.pm_grasp_shape):
+            return element
+
+        return None
 
     def _get_scene_element_from_shape(self, pm_shape):
         """
         Returns: Returns the Scene Element associated with the pymunk shape.
 
         """
-        entity = next(iter([e for e in self.scene_elements if pm_shape in e.pm_elements]), None)
-        return entity
+        entity = self._shape_to_entity.get(pm_shape)
+
+        if entity in self.scene_elements:
+            return entity
+
+        return None
 
     def _get_agent_from_shape(self, pm_shape):
         """
         Returns: Returns the Agent associated with the pymunk shape.
 
         """
-        for agent in self.agents:
-            if agent.owns_shape(pm_shape):
-                return agent
-
-        return None
+        return self._shape_to_agent.get(pm_shape)
 
     def get_entity_from_shape(self, pm_shape):
         """
@@ -502,17 +1066,7 @@ class Playground(ABC):
 
         """
 
-        scene_element = self._get_scene_element_from_shape(pm_shape)
-        if scene_element is not None:
-            return scene_element
-
-        for agent in self.agents:
-
-            part = agent.get_bodypart_from_shape(pm_shape)
-            if part is not None:
-                return part
-
-        return None
+        return self._shape_to_entity.get(pm_shape)
 
     def _get_closest_agent(self, ent):
 
@@ -530,6 +1084,7 @@ class Playground(ABC):
         if touched_entity is None:
             return True
 
+        self._wake(touched_entity)
         agent.reward += touched_entity.reward
 
         list_remove, list_add = touched_entity.activate()
@@ -556,6 +1111,7 @@ class Playground(ABC):
 
         if body_part.is_activating:
 
+            self._wake(interacting_entity)
             agent.reward += interacting_entity.reward
 
             list_remove, list_add = interacting_entity.activate(body_part)
@@ -586,14 +1142,10 @@ class Playground(ABC):
 
             body_part.is_holding = True
 
-            j_1 = pymunk.PinJoint(body_part.pm_body, interacting_entity.pm_body, (0, 5), (0, 0))
-            j_2 = pymunk.PinJoint(body_part.pm_body, interacting_entity.pm_body, (0, -5), (0, 0))
-            motor = pymunk.SimpleMotor(body_part.pm_body, interacting_entity.pm_body, 0)
-
-            self.space.add(j_1, j_2, motor)
-            body_part.grasped = [j_1, j_2, motor]
-
-            self._grasped_scene_elements[interacting_entity] = body_part
+            self._wake(interacting_entity)
+            self._release_grasp(body_part)
+            self.space.add(*self._get_grasp_constraints(body_part, interacting_entity))
+            self._held_elements[body_part] = interacting_entity
 
         return True
 
@@ -620,6 +1172,9 @@ class Playground(ABC):
         if interacting_entity is None or gem is None:
             return True
 
+        self._wake(gem)
+        self._wake(interacting_entity)
+
         agent = self._get_closest_agent(gem)
         agent.reward += interacting_entity.reward
 
@@ -647,6 +1202,7 @@ class Playground(ABC):
 
         if body_part.is_eating:
 
+            self._wake(edible_entity)
             agent.reward += edible_entity.get_reward()
 
             self.remove_scene_element(edible_entity)
@@ -696,10 +1252,9 @@ class Playground(ABC):
                     excl_radius=radius,
                 )
 
-            agent.position = sampler.sample()
+            agent.position = sampler.sample(rng=self.rng)
 
-        if (agent, teleport.target) not in self._teleported:
-            self._teleported.append((agent, teleport.target))
+        self._teleported.add((agent, teleport.target))
 
         agent.is_teleporting = True
 
@@ -717,6 +1272,11 @@ class Playground(ABC):
         self.add_interaction(CollisionTypes.GEM, CollisionTypes.ACTIVATED_BY_GEM, self._gem_interacts)
         self.add_interaction(CollisionTypes.AGENT, CollisionTypes.TELEPORT, self._agent_teleports)
 
+        # Track overlaps of agents with the interaction areas of scene elements
+        handler = self.space.add_wildcard_collision_handler(CollisionTypes.AGENT)
+        handler.begin = self._agent_begins_overlap
+        handler.separate = self._agent_ends_overlap
+
     def add_interaction(self, collision_type_1, collision_type_2, interaction_function):
         """
 
@@ -1,8 +1,6 @@
 """
 Module containing classical RL environments.
 """
-import random
-
 from simple_playgrounds.playground import PlaygroundRegister
 from simple_playgrounds.playgrounds.empty import SingleRoom, ConnectedRooms2D
 from simple_playgrounds.playgrounds.scene_elements \
@@ -18,9 +16,9 @@ class EndgoalRoomCue(SingleRoom):
     a center object.
     """
 
-    def __init__(self):
+    def __init__(self, seed=None):
 
-        super().__init__(size=(200, 200))
+        super().__init__(size=(200, 200), seed=seed)
 
         # Starting area of the agent
         area_center, _ = self.area_rooms[(0, 0)]
@@ -58,7 +56,7 @@ class EndgoalRoomCue(SingleRoom):
 
     def _set_goal(self):
 
-        index_goal = random.randint(0, 3)
+        index_goal = int(self.rng.integers(0, 4))
         loc = self.goal_locations[index_goal]
         col = self.cue_colors[index_goal]
 
@@ -91,9 +89,9 @@ class Endgoal9Rooms(ConnectedRooms2D):
     The agent must reach the invisible goal in the left-down corner.
     Each wall has a different color.
     """
-    def __init__(self):
+    def __init__(self, seed=None):
 
-        super().__init__(size=(600, 600), room_layout=(3, 3), wall_type='colorful')
+        super().__init__(size=(600, 600), room_layout=(3, 3), wall_type='colorful', seed=seed)
 
         # Starting area of the agent
         area_start = PositionAreaSampler(center=(300, 300),
@@ -115,9 +113,9 @@ class DispenserEnv(ConnectedRooms2D):
         then collect the rewards.
     """
 
-    def __init__(self):
+    def __init__(self, seed=None):
 
-        super().__init__(size=(300, 200), room_layout=(3, 2))
+        super().__init__(size=(300, 200), room_layout=(3, 2), seed=seed)
 
         self.agent_starting_area, self.area_prod, self.area_dispenser = self._assign_areas()
 
@@ -128,7 +126,7 @@ class DispenserEnv(ConnectedRooms2D):
 
     def _assign_areas(self):
         list_room_coordinates = [room_coord for room_coord, _ in self.area_rooms.items()]
-        random.shuffle(list_room_coordinates)
+        self.rng.shuffle(list_room_coordinates)
 
         # Starting area of the agent
         area_start_center, area_start_shape = self.area_rooms[list_room_coordinates.pop()]
@@ -172,9 +170,9 @@ class CoinMaster(SingleRoom):
     The agent should collect the coins, grasp them,
     and bring them to the vending machine to collect rewards.
     """
-    def __init__(self):
+    def __init__(self, seed=None):
 
-        super().__init__(size=(200, 200), wall_type='dark')
+        super().__init__(size=(200, 200), wall_type='dark', seed=seed)
 
         self.agent_starting_area, self.area_prod, self.area_vending = self._assign_areas()
 
@@ -190,7 +188,7 @@ class CoinMaster(SingleRoom):
     def _assign_areas(self):
 
         list_coord = [(50, 50), (50, 150), (150, 150), (150, 50)]
-        random.shuffle(list_coord)
+        self.rng.shuffle(list_coord)
 
         # Starting area of the agent
         area_start_center = list_coord.pop()
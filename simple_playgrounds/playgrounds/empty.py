@@ -4,7 +4,6 @@ Empty Playgrounds with built-in walls and rooms
 """
 
 import math
-import random
 
 from simple_playgrounds.playground import Playground
 from simple_playgrounds.playgrounds.scene_elements import Basic, Door
@@ -16,10 +15,14 @@ class ConnectedRooms2D(Playground):
     Multiple rooms with a grid layout
     """
 
-    def __init__(self, size=(400, 200), room_layout=(3, 2), wall_type='classic', **kwargs):
+    def __init__(self, size=(400, 200), room_layout=(3, 2), wall_type='classic', seed=None,
+                 physics_threads=1, **kwargs):
 
         self.width, self.length = size
 
+        # Random streams are needed to place doorsteps and generate wall textures
+        super().__init__(size=size, seed=seed, physics_threads=physics_threads)
+
         default_config = self.parse_configuration('connected-rooms-2d')
         playground_params = {**default_config, **kwargs}
 
@@ -47,9 +50,8 @@ class ConnectedRooms2D(Playground):
         all_walls = self._generate_doorstep_wall_entities() \
                     + self._generate_external_wall_entities(wall_lengths_and_positions)
 
-        self._scene_entities = self._scene_entities + all_walls
-
-        super().__init__(size=size)
+        for wall in all_walls:
+            self.add_scene_element(wall)
 
         # By default, an agent starts in a random position of the first room
         center, shape = self.area_rooms[(0, 0)]
@@ -107,13 +109,13 @@ class ConnectedRooms2D(Playground):
 
                     left = center_room_1[0] - self._width_room / 2.0 + self._doorstep_size / 2
                     right = center_room_1[0] + self._width_room / 2.0 - self._doorstep_size / 2
-                    x_doorstep = random.uniform(left, right)
+                    x_doorstep = self.rng.uniform(left, right)
 
                 else:
 
                     down = center_room_1[1] - self._length_room / 2.0 + self._doorstep_size / 2
                     up = center_room_1[1] + self._length_room / 2.0 - self._doorstep_size / 2
-                    y_doorstep = random.uniform(down, up)
+                    y_doorstep = self.rng.uniform(down, up)
 
             elif self._doorstep_type == 'middle':
                 pass
@@ -148,10 +150,10 @@ class ConnectedRooms2D(Playground):
 
                 lower_wall = Basic(initial_position=lower_wall_position,
                                    width_length=[self._wall_depth, lower_wall_length],
-                                   **self._wall_params)
+                                   rng=self.rng, **self._wall_params)
                 upper_wall = Basic(initial_position=upper_wall_position,
                                    width_length=[self._wall_depth, upper_wall_length],
-                                   **self._wall_params)
+                                   rng=self.rng, **self._wall_params)
 
                 walls.append(lower_wall)
                 walls.append(upper_wall)
@@ -171,10 +173,10 @@ class ConnectedRooms2D(Playground):
 
                 left_wall = Basic(initial_position=left_wall_position,
                                   width_length=[self._wall_depth, left_wall_length],
-                                  **self._wall_params)
+                                  rng=self.rng, **self._wall_params)
                 right_wall = Basic(initial_position=right_wall_position,
                                    width_length=[self._wall_depth, right_wall_length],
-                                   **self._wall_params)
+                                   rng=self.rng, **self._wall_params)
 
                 walls.append(left_wall)
                 walls.append(right_wall)
@@ -208,7 +210,7 @@ class ConnectedRooms2D(Playground):
             wall_params = self._wall_params.copy()
             wall_params['width_length'] = [self._wall_depth * 2, length]
 
-            wall = Basic(initial_position=position, **wall_params)
+            wall = Basic(initial_position=position, rng=self.rng, **wall_params)
             wall_entities.append(wall)
 
         return wall_entities
@@ -275,12 +277,12 @@ class ConnectedRooms2D(Playground):
 
             if wall_location in ['up', 'down']:
 
-                pos_x = random.uniform(area_center[0] - area_size[0] / 2,
+                pos_x = self.rng.uniform(area_center[0] - area_size[0] / 2,
                                        area_center[0] + area_size[0] / 2)
 
             elif wall_location in ['left', 'right']:
 
-                pos_y = random.uniform(area_center[1] - area_size[1] / 2,
+                pos_y = self.rng.uniform(area_center[1] - area_size[1] / 2,
                                        area_center[1] + area_size[1] / 2)
 
             else:
@@ -344,9 +346,9 @@ class SingleRoom(ConnectedRooms2D):
     Playground composed of a single room
     """
 
-    def __init__(self, size=(200, 200), wall_type='classic', **kwargs):
+    def __init__(self, size=(200, 200), wall_type='classic', seed=None, **kwargs):
 
-        super().__init__(size=size, room_layout=(1, 1), wall_type=wall_type, **kwargs)
+        super().__init__(size=size, room_layout=(1, 1), wall_type=wall_type, seed=seed, **kwargs)
 
 
 class LinearRooms(ConnectedRooms2D):
@@ -354,6 +356,6 @@ class LinearRooms(ConnectedRooms2D):
     Playground composed of connected rooms organized as a line
     """
 
-    def __init__(self, size=(200, 200), room_layout=3, wall_type='classic', **kwargs):
+    def __init__(self, size=(200, 200), room_layout=3, wall_type='classic', seed=None, **kwargs):
 
-        super().__init__(size=size, room_layout=(room_layout, 1), wall_type=wall_type, **kwargs)
+        super().__init__(size=size, room_layout=(room_layout, 1), wall_type=wall_type, seed=seed, **kwargs)
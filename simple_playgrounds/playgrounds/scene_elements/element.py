@@ -18,13 +18,17 @@ class SceneElement(Entity, ABC):
         graspable: Can be grasped by an agent.
         timed: Behavior depends on timer.
         terminate_upon_contact: Terminates the episode upon contact with an Agent.
+        produced_by: Dispenser or Field which produced the element, None otherwise.
+
+    Note:
+        Scene elements keep an instance dictionary: movable, graspable, interactive and background
+        can be set per instance, and subclasses override them as class attributes.
     """
 
     absorbable = False
     edible = False
 
     movable = False
-    follows_waypoints = False
     graspable = False
 
     timed = False
@@ -44,3 +48,5 @@ class SceneElement(Entity, ABC):
             self.background = False
 
         Entity.__init__(self, initial_position=initial_position, **kwargs)
+
+        self.produced_by = None
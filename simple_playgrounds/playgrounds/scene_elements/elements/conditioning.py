@@ -91,10 +91,12 @@ class ColorChanging(SceneElement):
 
     def draw(self, surface, draw_interaction=False, force_recompute_mask=False):
 
-        super().draw(surface, draw_interaction=draw_interaction,
-                     force_recompute_mask=self.force_redraw)
+        mask_rect = super().draw(surface, draw_interaction=draw_interaction,
+                                 force_recompute_mask=self.force_redraw)
         self.force_redraw = False
 
+        return mask_rect
+
     def reset(self):
 
         super().reset()
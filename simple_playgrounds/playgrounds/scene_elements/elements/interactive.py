@@ -9,6 +9,7 @@ from simple_playgrounds.playgrounds.scene_elements.element import SceneElement
 from simple_playgrounds.utils.definitions import CollisionTypes, SceneElementTypes
 from simple_playgrounds.utils.position_utils import PositionAreaSampler
 from simple_playgrounds.utils.parser import parse_configuration
+from simple_playgrounds.utils.indexed_collection import IndexedCollection
 
 
 # pylint: disable=line-too-long
@@ -145,7 +146,7 @@ class Dispenser(InteractiveSceneElement):
             self.location_sampler = production_area
 
         self.production_limit = entity_params['production_limit']
-        self.produced_entities = []
+        self.produced_entities = IndexedCollection()
 
     @property
     def reward(self):
@@ -159,13 +160,15 @@ class Dispenser(InteractiveSceneElement):
         if len(self.produced_entities) < self.production_limit and self.activated is False:
 
             if self.local_dispenser:
-                initial_position = self.location_sampler.sample([self.position[0], self.position[1]])
+                initial_position = self.location_sampler.sample([self.position[0], self.position[1]],
+                                                                rng=self.rng)
             else:
-                initial_position = self.location_sampler.sample()
+                initial_position = self.location_sampler.sample(rng=self.rng)
 
             obj = self.entity_produced(initial_position=initial_position, is_temporary_entity=True,
                                        **self.entity_produced_params)
 
+            obj.produced_by = self
             self.produced_entities.append(obj)
             list_add = [obj]
 
@@ -175,7 +178,7 @@ class Dispenser(InteractiveSceneElement):
 
     def reset(self):
 
-        self.produced_entities = []
+        self.produced_entities.clear()
         super().reset()
 
 
@@ -253,7 +256,7 @@ class VendingMachine(InteractiveSceneElement):
 
         self.reward = entity_params.get('reward')
 
-        self.accepted_coins = []
+        self.accepted_coins = IndexedCollection()
 
     @property
     def reward(self):
@@ -268,7 +271,7 @@ class VendingMachine(InteractiveSceneElement):
         list_add = []
         list_remove = []
 
-        if activating_entity in self.accepted_coins.copy() and self.activated is False:
+        if activating_entity in self.accepted_coins and self.activated is False:
             list_remove = [activating_entity]
             self.accepted_coins.remove(activating_entity)
             self.activated = True
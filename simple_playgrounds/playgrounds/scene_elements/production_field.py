@@ -1,9 +1,9 @@
 """
 Module for Field
 """
-import random
-
 from simple_playgrounds.utils.definitions import SceneElementTypes
+from simple_playgrounds.utils.rng_utils import default_rng
+from simple_playgrounds.utils.indexed_collection import IndexedCollection
 
 
 # pylint: disable=too-many-instance-attributes
@@ -46,7 +46,10 @@ class Field:
         self.limit = limit
         self.total_limit = total_limit
         self.total_produced = 0
-        self.produced_entities = []
+        self.produced_entities = IndexedCollection()
+
+        # Random number generator, set when field is added to playground.
+        self.rng = default_rng()
 
         # Internal counter to assign identity number to each entity
         self.name = 'field_' + str(Field.id_number)
@@ -64,7 +67,7 @@ class Field:
 
         return len(self.produced_entities) < self.limit \
                and self.total_produced < self.total_limit\
-               and random.random() < self.probability
+               and self.rng.random() < self.probability
 
     def produce(self):
         """
@@ -76,6 +79,7 @@ class Field:
         obj = self.entity_produced(initial_position=self.location_sampler,
                                    **self.entity_produced_params)
         obj.is_temporary_entity = True
+        obj.produced_by = self
 
         self.total_produced += 1
         self.produced_entities.append(obj)
@@ -87,5 +91,5 @@ class Field:
         Reset the field by resetting the total count of SceneElements produced.
         """
 
-        self.produced_entities = []
+        self.produced_entities.clear()
         self.total_produced = 0
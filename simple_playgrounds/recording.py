@@ -0,0 +1,647 @@
+""" Module implementing the recording and replay of episodes.
+
+Reproducing an episode by running the Engine again is slow, and requires the same random streams.
+EpisodeRecorder streams, at each step of an Engine, the actions, rewards, poses of the bodies
+and sensor values into memory-mapped numpy files.
+Each stream is split in chunks of a fixed number of steps, so that recordings can be arbitrarily long
+and are readable up to the last completed chunk, even if the recording was interrupted.
+
+EpisodeReplayer gives random access to the recorded steps.
+It can restore the recorded poses in a playground built in the same way as the recorded one,
+and draw the scene, without stepping the physics.
+
+VideoRecorder encodes frames of the scene into a video file on a background thread,
+so that the simulation is not blocked by the encoding.
+
+Row 0 of a recording is the state when the recorder is attached to an Engine.
+Each call to Engine.step (or multiple_steps) adds a row, and each call to Engine.reset starts a new episode
+with a new row. Observations computed by Engine.update_observations are stored in the current row.
+
+Typical Usage:
+    recorder = EpisodeRecorder('logs/episode')
+    engine = Engine(playground, time_limit=1000, recorder=recorder)
+    engine.run()
+    recorder.close()
+
+    replayer = EpisodeReplayer('logs/episode')
+    step = replayer[500]
+    image = replayer.generate_frame(500, playground)
+
+    engine.start_video('logs/episode.mp4', fps=30)
+    engine.run()
+    engine.stop_video()
+"""
+
+import json
+import os
+import queue
+import threading
+import weakref
+
+import cv2
+import numpy as np
+import pygame
+
+from simple_playgrounds.utils.scene_frame import pixels_to_image, surface_to_image
+
+_METADATA_FILE = 'metadata.json'
+_DEFAULT_CHUNK_SIZE = 1024
+
+
+def _tracked_entities(playground):
+    """
+    Entities whose pose is recorded: scene elements, then the parts of each agent.
+    """
+
+    entities = list(playground.scene_elements)
+
+    for agent in playground.agents:
+        entities += agent.parts
+
+    return entities
+
+
+def _remove_agent_keeping_position(playground, agent):
+    """
+    Removes an agent from a playground, so that it can be added back at its initial position.
+    """
+
+    initial_position = agent.initial_position
+    playground.remove_agent(agent)
+    agent.initial_position = initial_position
+
+
+class _ChunkedStream:
+    """
+    Array of rows of fixed shape and dtype, stored in memory-mapped .npy files of chunk_size rows.
+    """
+
+    def __init__(self, directory, name, shape, dtype, chunk_size, writable):
+
+        self._directory = directory
+        self._name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._chunk_size = chunk_size
+        self._writable = writable
+
+        self._chunks = {}
+
+    def _get_chunk(self, index_chunk):
+
+        chunk = self._chunks.get(index_chunk)
+
+        if chunk is None:
+
+            path = os.path.join(self._directory, '{}_{:05d}.npy'.format(self._name, index_chunk))
+
+            if self._writable:
+                chunk = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype,
+                                                  shape=(self._chunk_size,) + self.shape)
+            else:
+                chunk = np.load(path, mmap_mode='r')
+
+            self._chunks[index_chunk] = chunk
+
+        return chunk
+
+    def __getitem__(self, index):
+        return self._get_chunk(index // self._chunk_size)[index % self._chunk_size]
+
+    def __setitem__(self, index, value):
+        self._get_chunk(index // self._chunk_size)[index % self._chunk_size] = value
+
+    def read(self, start, stop):
+        """
+        Concatenates the rows between start and stop.
+        """
+
+        rows = [self._get_chunk(index_chunk)[max(start - index_chunk * self._chunk_size, 0):
+                                             stop - index_chunk * self._chunk_size]
+                for index_chunk in range(start // self._chunk_size, (stop - 1) // self._chunk_size + 1)]
+
+        if not rows:
+            return np.empty((0,) + self.shape, dtype=self.dtype)
+
+        return np.concatenate(rows)
+
+    def close(self, keep_chunk=None):
+        """
+        Flushes and releases the memory maps, except the one of chunk keep_chunk.
+        """
+
+        for index_chunk in list(self._chunks):
+
+            if index_chunk == keep_chunk:
+                continue
+
+            chunk = self._chunks.pop(index_chunk)
+            if self._writable:
+                chunk.flush()
+
+
+class EpisodeRecorder:
+    """
+    Records the steps of an Engine into chunked memory-mapped files.
+
+    Streams:
+        timestep: elapsed time of the engine.
+        episode: index of the episode, incremented when the engine is reset.
+        actions: value of each actuator of each agent, 0 if the actuator was not in the actions.
+        rewards: reward of each agent.
+        poses: pymunk position (x, y) and angle of the body of each tracked entity, NaN if it is not
+            in the playground.
+        observed: True if the observations were updated at this step.
+        sensor_<index>: values of each sensor whose values are a numpy array.
+
+    Note:
+        Tracked entities are the scene elements and agent parts present when the recorder is attached.
+        Entities produced during the episode (e.g. by dispensers) are not recorded.
+    """
+
+    def __init__(self, path, chunk_size=_DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            path: directory where the recording is written. Created if it doesn't exist.
+            chunk_size: number of steps per file.
+        """
+
+        self.path = path
+        self._chunk_size = chunk_size
+
+        self._playground = None
+        self._entities = []
+        self._part_agents = {}
+        self._actuators = []
+        self._sensors = []
+        self._streams = {}
+
+        self._n_rows = 0
+        self._episode = 0
+        self._closed = False
+
+    def start(self, playground, timestep=0):
+        """
+        Starts the recording of a playground, and records its current state as row 0.
+        Called by the Engine when the recorder is attached.
+
+        Args:
+            playground: Playground.
+            timestep: current elapsed time of the engine.
+
+        """
+
+        if self._playground is not None:
+            raise ValueError('Recorder already started')
+
+        os.makedirs(self.path, exist_ok=True)
+
+        self._playground = playground
+        self._entities = _tracked_entities(playground)
+        self._part_agents = {part: agent for agent in playground.agents for part in agent.parts}
+        self._actuators = [(agent, actuator) for agent in playground.agents
+                           for actuator in agent.get_all_actuators()]
+        self._sensors = [(agent, sensor) for agent in playground.agents for sensor in agent.sensors
+                         if isinstance(sensor.sensor_values, np.ndarray)]
+
+        shapes = {'timestep': ((), np.int64),
+                  'episode': ((), np.int32),
+                  'actions': ((len(self._actuators),), np.float64),
+                  'rewards': ((len(playground.agents),), np.float64),
+                  'poses': ((len(self._entities), 3), np.float64),
+                  'observed': ((), np.bool_)}
+
+        for index, (_, sensor) in enumerate(self._sensors):
+            shapes['sensor_{}'.format(index)] = (sensor.sensor_values.shape, sensor.sensor_values.dtype)
+
+        self._streams = {name: _ChunkedStream(self.path, name, shape, dtype, self._chunk_size, writable=True)
+                         for name, (shape, dtype) in shapes.items()}
+
+        self._new_row(timestep)
+
+    def _new_row(self, timestep, actions=None):
+
+        if self._closed:
+            raise ValueError('Recorder is closed')
+
+        index = self._n_rows
+
+        # Keep metadata and files consistent each time a chunk is completed
+        if index > 0 and index % self._chunk_size == 0:
+            for stream in self._streams.values():
+                stream.close(keep_chunk=index // self._chunk_size)
+            self._write_metadata()
+
+        self._streams['timestep'][index] = timestep
+        self._streams['episode'][index] = self._episode
+
+        action_values = self._streams['actions'][index]
+        action_values[:] = 0
+        if actions is not None:
+            for index_actuator, (agent, actuator) in enumerate(self._actuators):
+                action_values[index_actuator] = actions.get(agent, {}).get(actuator, 0)
+
+        self._streams['rewards'][index] = [agent.reward for agent in self._playground.agents]
+
+        poses = self._streams['poses'][index]
+        agents = self._playground.agents
+        scene_elements = self._playground.scene_elements
+
+        for index_entity, entity in enumerate(self._entities):
+
+            if entity in scene_elements or self._part_agents.get(entity) in agents:
+                body = entity.pm_body
+                poses[index_entity] = body.position.x, body.position.y, body.angle
+            else:
+                poses[index_entity] = np.nan
+
+        self._streams['observed'][index] = False
+
+        self._n_rows += 1
+
+    def record_step(self, actions, timestep):
+        """
+        Records the actions, rewards and poses after a step of the engine.
+
+        Args:
+            actions: Dictionary containing the actions for each agent.
+            timestep: elapsed time of the engine after the step.
+
+        """
+        self._new_row(timestep, actions)
+
+    def record_reset(self, timestep=0):
+        """
+        Starts a new episode, after the engine is reset.
+        """
+        self._episode += 1
+        self._new_row(timestep)
+
+    def record_observations(self):
+        """
+        Records the current sensor values in the current row.
+        """
+
+        index = self._n_rows - 1
+
+        for index_sensor, (_, sensor) in enumerate(self._sensors):
+            self._streams['sensor_{}'.format(index_sensor)][index] = sensor.sensor_values
+
+        self._streams['observed'][index] = True
+
+    def _write_metadata(self):
+
+        metadata = {'chunk_size': self._chunk_size,
+                    'n_rows': self._n_rows,
+                    'size_playground': list(self._playground.size),
+                    'agents': [agent.name for agent in self._playground.agents],
+                    'entities': [entity.entity_type.name for entity in self._entities],
+                    'actuators': [[agent.name, actuator.part_name, actuator.action.name]
+                                  for agent, actuator in self._actuators],
+                    'sensors': [[agent.name, sensor.name] for agent, sensor in self._sensors],
+                    'streams': {name: {'shape': list(stream.shape),
+                                       'dtype': np.lib.format.dtype_to_descr(stream.dtype)}
+                                for name, stream in self._streams.items()}}
+
+        with open(os.path.join(self.path, _METADATA_FILE), 'w') as metadata_file:
+            json.dump(metadata, metadata_file)
+
+    def close(self):
+        """
+        Flushes the files and writes the metadata of the recording.
+        """
+
+        if self._closed or self._playground is None:
+            return
+
+        for stream in self._streams.values():
+            stream.close()
+
+        self._write_metadata()
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+
+class EpisodeReplayer:
+    """
+    Random access to the steps of a recording.
+
+    Attributes:
+        agents: names of the recorded agents.
+        actuators: (agent name, part name, action type name) of each recorded actuator.
+        sensors: (agent name, sensor name) of each recorded sensor.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: directory of the recording.
+        """
+
+        with open(os.path.join(path, _METADATA_FILE)) as metadata_file:
+            metadata = json.load(metadata_file)
+
+        self._n_rows = metadata['n_rows']
+        self._entity_types = metadata['entities']
+
+        self.agents = metadata['agents']
+        self.actuators = [tuple(actuator) for actuator in metadata['actuators']]
+        self.sensors = [tuple(sensor) for sensor in metadata['sensors']]
+
+        self._streams = {name: _ChunkedStream(path, name, stream['shape'],
+                                              np.lib.format.descr_to_dtype(stream['dtype']),
+                                              metadata['chunk_size'], writable=False)
+                         for name, stream in metadata['streams'].items()}
+
+        # Tracked entities of each playground, in the recorded order, even after they are removed and added back
+        self._playground_entities = weakref.WeakKeyDictionary()
+
+    def __len__(self):
+        return self._n_rows
+
+    def _check_index(self, index):
+
+        if index < 0:
+            index += self._n_rows
+
+        if not 0 <= index < self._n_rows:
+            raise IndexError('Step index out of range')
+
+        return index
+
+    def read(self, stream, start=0, stop=None):
+        """
+        Reads consecutive rows of a stream.
+
+        Args:
+            stream: name of the stream (see EpisodeRecorder).
+            start: first row.
+            stop: last row (excluded). If None, reads until the end of the recording.
+
+        Returns:
+            Numpy array.
+
+        """
+
+        stop = self._n_rows if stop is None else min(stop, self._n_rows)
+
+        return self._streams[stream].read(start, stop)
+
+    def __getitem__(self, index):
+        """
+        Returns:
+            Dictionary with timestep, episode, actions {agent name: {(part name, action type name): value}},
+            rewards {agent name: reward}, and observations {agent name: {sensor name: values}}
+            (None if the observations were not updated at this step).
+        """
+
+        index = self._check_index(index)
+
+        actions = {agent_name: {} for agent_name in self.agents}
+        for (agent_name, part_name, action_name), value in zip(self.actuators, self._streams['actions'][index]):
+            actions[agent_name][part_name, action_name] = value
+
+        observations = None
+        if self._streams['observed'][index]:
+            observations = {agent_name: {} for agent_name in self.agents}
+            for index_sensor, (agent_name, sensor_name) in enumerate(self.sensors):
+                observations[agent_name][sensor_name] = self._streams['sensor_{}'.format(index_sensor)][index]
+
+        return {'timestep': int(self._streams['timestep'][index]),
+                'episode': int(self._streams['episode'][index]),
+                'actions': actions,
+                'rewards': dict(zip(self.agents, self._streams['rewards'][index].tolist())),
+                'observations': observations}
+
+    def restore(self, index, playground):
+        """
+        Sets the bodies of a playground to their recorded poses, without stepping the physics.
+        Entities absent at this step (e.g. eaten or removed) are removed from the playground,
+        and entities present are added back, so that sensors can then be recomputed from the restored scene.
+
+        Args:
+            index: step index.
+            playground: Playground built in the same way as the recorded one,
+                with the same scene elements and agents, in the same order.
+
+        Returns:
+            List of the entities present at this step.
+
+        """
+
+        index = self._check_index(index)
+
+        if playground not in self._playground_entities:
+
+            entities = _tracked_entities(playground)
+            if [entity.entity_type.name for entity in entities] != self._entity_types:
+                raise ValueError('Playground does not match the recorded playground')
+
+            part_agents = {part: agent for agent in playground.agents for part in agent.parts}
+            self._playground_entities[playground] = entities, part_agents
+
+        entities, part_agents = self._playground_entities[playground]
+
+        present = []
+
+        for entity, (pos_x, pos_y, angle) in zip(entities, self._streams['poses'][index].tolist()):
+
+            agent = part_agents.get(entity)
+
+            if np.isnan(pos_x):
+                if agent is None:
+                    playground.remove_scene_element(entity)
+                elif agent in playground.agents:
+                    _remove_agent_keeping_position(playground, agent)
+                continue
+
+            if agent is None:
+                if entity not in playground.scene_elements:
+                    playground.add_scene_element(entity, keep_position=True)
+            elif agent not in playground.agents:
+                playground.add_agent(agent, keep_position=True)
+
+            entity.pm_body.position = pos_x, pos_y
+            entity.pm_body.angle = angle
+            playground.space.reindex_shapes_for_body(entity.pm_body)
+
+            present.append(entity)
+
+        return present
+
+    def generate_frame(self, index, playground):
+        """
+        Draws the scene at a recorded step, without stepping the physics.
+
+        Args:
+            index: step index.
+            playground: Playground built in the same way as the recorded one.
+
+        Returns:
+            Image of the playground, with the color code of Engine.generate_playground_image.
+
+        Note:
+            Textures are the ones of the given playground. Random textures are not recorded.
+
+        """
+
+        present = self.restore(index, playground)
+
+        surface = pygame.Surface((playground.width, playground.length))
+
+        for entity in present:
+            if entity.background:
+                entity.draw(surface)
+
+        for entity in present:
+            if not entity.background:
+                entity.draw(surface)
+
+        return surface_to_image(surface)
+
+
+class VideoRecorder:
+    """
+    Encodes frames into a video file with cv2.VideoWriter, on a background thread.
+
+    Frames are captured as copies of the surface of the scene, and put in a bounded queue.
+    Conversion to images and encoding are done by the background thread.
+    When the queue is full, the frame is dropped instead of blocking the simulation.
+    If adaptive, the decimation is doubled when a frame is dropped, so that fewer frames are captured,
+    at most once until a frame is accepted again and up to max_decimation.
+    It is halved, down to its initial value, each time a frame is captured while the queue is empty.
+
+    Attributes:
+        decimation: a frame is captured every decimation timesteps.
+        captured_frames: number of frames put in the queue.
+        dropped_frames: number of frames dropped because the queue was full.
+
+    Note:
+        The video is played at a constant fps: after an adaptive decimation, the video plays faster.
+    """
+
+    def __init__(self, path, frame_size, fps=30, fourcc='mp4v', queue_size=32, decimation=1, adaptive=True,
+                 max_decimation=16):
+        """
+        Args:
+            path: path of the video file.
+            frame_size: (width, length) of the playground.
+            fps: frames per second of the video.
+            fourcc: four character code of the codec (e.g. 'mp4v' for .mp4, 'MJPG' for .avi).
+            queue_size: maximum number of frames waiting to be encoded.
+            decimation: initial number of timesteps between two captured frames.
+            adaptive: If True, the decimation adapts to the frames dropped.
+            max_decimation: maximum decimation in adaptive mode.
+        """
+
+        if not decimation >= 1:
+            raise ValueError('decimation must be at least 1')
+
+        if adaptive and not max_decimation >= decimation:
+            raise ValueError('max_decimation must be at least decimation')
+
+        # Images are transposed with respect to the surface of the scene
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps,  # pylint: disable=no-member
+                                       (int(frame_size[0]), int(frame_size[1])))
+
+        if not self._writer.isOpened():
+            raise ValueError('Video file can not be opened with codec ' + fourcc)
+
+        self.decimation = int(decimation)
+        self._adaptive = adaptive
+        self._min_decimation = int(decimation)
+        self._max_decimation = int(max_decimation)
+
+        # The decimation is increased at most once per stall of the encoder
+        self._accepted_since_increase = True
+
+        self.captured_frames = 0
+        self.dropped_frames = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._encode, daemon=True)
+        self._thread.start()
+
+    def _encode(self):
+
+        while True:
+
+            surface = self._queue.get()
+
+            if surface is None:
+                break
+
+            pixels = pygame.surfarray.pixels3d(surface)
+            self._writer.write(np.ascontiguousarray(pixels_to_image(pixels)))
+            del pixels
+
+        self._writer.release()
+
+    def is_due(self, timestep):
+        """
+        Checks if a frame should be captured at this timestep.
+        """
+        return timestep % self.decimation == 0
+
+    def capture(self, surface):
+        """
+        Copies a Pygame Surface and queues it for encoding.
+        Drops the frame if the queue is full.
+
+        Args:
+            surface: Pygame Surface of the scene.
+
+        """
+
+        if self._thread is None:
+            raise ValueError('Video recorder is closed')
+
+        if self._queue.full():
+            self._drop_frame()
+            return
+
+        drained = self._queue.empty()
+
+        try:
+            self._queue.put_nowait(surface.copy())
+
+        except queue.Full:
+            self._drop_frame()
+            return
+
+        self.captured_frames += 1
+        self._accepted_since_increase = True
+
+        if self._adaptive and drained:
+            self.decimation = max(self.decimation // 2, self._min_decimation)
+
+    def _drop_frame(self):
+
+        self.dropped_frames += 1
+
+        if self._adaptive and self._accepted_since_increase:
+            self.decimation = min(self.decimation * 2, self._max_decimation)
+            self._accepted_since_increase = False
+
+    def close(self):
+        """
+        Encodes the remaining frames, and closes the video file.
+        """
+
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
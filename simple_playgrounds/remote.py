@@ -0,0 +1,720 @@
+""" Module implementing a local server of engines, and its client.
+
+Simulation workers and learners can run in different processes.
+An EngineServer hosts several engines with the same agents and sensors, behind a socket
+(Unix domain socket or local TCP). A client steps all of them, or a subset, with a single request.
+
+The protocol is binary. After a handshake, where the server describes its engines in JSON,
+requests and responses have a fixed layout:
+    request: header (message type, payload size), mask of the engines, number of steps,
+        actions of all the engines stacked in a float64 array.
+    response: header, then rewards, game_on and elapsed time of all engines,
+        then the values of each sensor, stacked over engines.
+Arrays are sent from and received into preallocated numpy buffers, without serialization.
+
+RemoteEngines is the client of a server. Requests can be sent without waiting for the response
+(step_async, step_wait), so that a learner can compute while the engines simulate,
+or drive several servers at once. Several step requests can be queued (see max_pending),
+and their responses are received in the order of the requests.
+Each RemoteEngine of the client presents the interface of a local Engine.
+
+A server handles one client at a time, and steps the engines of a request one after the other,
+in its own process. Pipelining overlaps the computation of the client with the simulation,
+not the simulation of several requests: to simulate in parallel, launch one server per process.
+
+Typical Usage:
+    process = launch_server(make_engine, n_engines=8, address='/tmp/playgrounds.sock')
+
+    engines = RemoteEngines('/tmp/playgrounds.sock')
+    engines.actions[:] = policy(engines.observations)
+    engines.step()
+
+    engines.close()
+
+Command line:
+    python -m simple_playgrounds.remote --factory my_module:make_engine --n-engines 8 --address /tmp/pg.sock
+"""
+
+import argparse
+import collections
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import struct
+import time
+
+import numpy as np
+
+from simple_playgrounds.utils.definitions import ActionTypes
+
+# Message type, payload size
+_HEADER = struct.Struct('<BxxxQ')
+_N_STEPS = struct.Struct('<I')
+
+_SPEC = 0
+_STEP = 1
+_RESET = 2
+_CLOSE = 3
+
+_CONNECT_TIMEOUT = 30
+
+
+def _as_bytes(array):
+    """
+    Byte view of a C-contiguous array.
+    """
+    return array.reshape(-1).view(np.uint8)
+
+
+def _send_buffers(sock, buffers):
+    """
+    Sends buffers with a single scatter-gather call when possible, without copying them.
+    """
+
+    views = [memoryview(buffer) for buffer in buffers]
+
+    while views:
+
+        sent = sock.sendmsg(views)
+
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+
+        if views and sent:
+            views[0] = views[0][sent:]
+
+
+def _recv_into(sock, buffer):
+    """
+    Fills a buffer with data received from the socket.
+    """
+
+    view = memoryview(buffer)
+    position = 0
+
+    while position < len(view):
+
+        received = sock.recv_into(view[position:])
+
+        if received == 0:
+            raise ConnectionError('Connection closed')
+
+        position += received
+
+
+def _recv_header(sock):
+
+    header = bytearray(_HEADER.size)
+    _recv_into(sock, header)
+
+    return _HEADER.unpack(header)
+
+
+def _create_socket(address):
+
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+
+def _remove_socket_file(address):
+    """
+    Removes the file of a Unix domain socket, left by a previous server.
+    """
+
+    if isinstance(address, str):
+        try:
+            os.unlink(address)
+        except FileNotFoundError:
+            pass
+
+
+class _Buffers:
+    """
+    Preallocated arrays of the requests and responses, for a given layout of engines.
+    """
+
+    def __init__(self, spec):
+
+        n_engines = spec['n_engines']
+
+        self.mask = np.zeros(n_engines, dtype=np.uint8)
+        self.n_steps = bytearray(_N_STEPS.size)
+        self.actions = np.zeros((n_engines, len(spec['actuators'])), dtype=np.float64)
+
+        self.rewards = np.zeros((n_engines, len(spec['agents'][0])), dtype=np.float64)
+        self.game_on = np.zeros(n_engines, dtype=np.bool_)
+        self.elapsed_time = np.zeros(n_engines, dtype=np.int64)
+        self.sensors = [np.zeros((n_engines,) + tuple(shape), dtype=np.lib.format.descr_to_dtype(dtype))
+                        for _, _, dtype, shape in spec['sensors']]
+
+    @property
+    def request(self):
+        return [_as_bytes(self.mask), self.n_steps, _as_bytes(self.actions)]
+
+    @property
+    def response(self):
+        return [_as_bytes(self.rewards), _as_bytes(self.game_on), _as_bytes(self.elapsed_time)] \
+               + [_as_bytes(sensor) for sensor in self.sensors]
+
+    @staticmethod
+    def size(buffers):
+        return sum(len(buffer) for buffer in buffers)
+
+
+class EngineServer:
+    """
+    Hosts engines with the same agents, actuators and sensors, and steps them on request.
+
+    Sensors whose values are not numpy arrays (e.g. SemanticRay with structured=False) are not served.
+    Engines are not reset automatically when their game ends: the client resets them.
+    Clients are served one at a time, and the engines of a request are stepped one after the other.
+    """
+
+    def __init__(self, engines, address):
+        """
+        Args:
+            engines: list of Engine.
+            address: path of a Unix domain socket, or (host, port) tuple for a local TCP socket.
+        """
+
+        self.engines = list(engines)
+        self.address = address
+
+        self._actuators = [[(agent, actuator) for agent in engine.agents for actuator in agent.get_all_actuators()]
+                           for engine in self.engines]
+        self._sensors = [[sensor for agent in engine.agents for sensor in agent.sensors
+                          if isinstance(sensor.sensor_values, np.ndarray)]
+                         for engine in self.engines]
+
+        self.spec = self._build_spec()
+        self._buffers = _Buffers(self.spec)
+
+    def _build_spec(self):
+
+        def actuators_spec(engine, actuators):
+            agents = list(engine.agents)
+            return [[agents.index(agent), actuator.part_name, actuator.action.name,
+                     actuator.action_range.name, actuator.min, actuator.max] for agent, actuator in actuators]
+
+        def sensors_spec(engine, sensors):
+            agents = list(engine.agents)
+            owners = {sensor: agent for agent in agents for sensor in agent.sensors}
+            return [[agents.index(owners[sensor]), sensor.name,
+                     np.lib.format.dtype_to_descr(sensor.sensor_values.dtype), list(sensor.sensor_values.shape)]
+                    for sensor in sensors]
+
+        def layout(specs):
+            # Names of parts and sensors can differ between engines
+            return [spec[:1] + spec[2:] for spec in specs]
+
+        spec = {'n_engines': len(self.engines),
+                'agents': [[agent.name for agent in engine.agents] for engine in self.engines],
+                'actuators': actuators_spec(self.engines[0], self._actuators[0]),
+                'sensors': sensors_spec(self.engines[0], self._sensors[0])}
+
+        for engine, actuators, sensors in zip(self.engines, self._actuators, self._sensors):
+            if len(engine.agents) != len(self.engines[0].agents) \
+                    or layout(actuators_spec(engine, actuators)) != layout(spec['actuators']) \
+                    or layout(sensors_spec(engine, sensors)) != layout(spec['sensors']):
+                raise ValueError('Engines must have the same agents, actuators and sensors')
+
+        return spec
+
+    def _update_response(self, index_engine):
+
+        engine = self.engines[index_engine]
+        buffers = self._buffers
+
+        buffers.rewards[index_engine] = [agent.reward for agent in engine.agents]
+        buffers.game_on[index_engine] = engine.game_on
+        buffers.elapsed_time[index_engine] = engine.elapsed_time
+
+        for stacked_values, sensor in zip(buffers.sensors, self._sensors[index_engine]):
+            stacked_values[index_engine] = sensor.sensor_values
+
+    def _step(self, index_engine, n_steps):
+
+        engine = self.engines[index_engine]
+
+        actions = {agent: {} for agent in engine.agents}
+
+        for (agent, actuator), value in zip(self._actuators[index_engine],
+                                            self._buffers.actions[index_engine].tolist()):
+            if actuator.action_range is ActionTypes.DISCRETE:
+                value = int(value)
+            actions[agent][actuator] = value
+
+        if n_steps == 1:
+            engine.step(actions)
+        else:
+            engine.multiple_steps(actions, n_steps)
+
+        engine.update_observations()
+
+    def _reset(self, index_engine):
+
+        engine = self.engines[index_engine]
+        engine.reset()
+        engine.update_observations()
+
+    def _handle(self, connection):
+        """
+        Answers the requests of a client, until it closes the connection or the server.
+
+        Returns:
+            True if the client asked to close the server.
+
+        """
+
+        buffers = self._buffers
+        request_size = _Buffers.size(buffers.request)
+
+        while True:
+
+            try:
+                message_type, size = _recv_header(connection)
+            except ConnectionError:
+                return False
+
+            if message_type == _CLOSE:
+                return True
+
+            if message_type == _SPEC:
+                payload = json.dumps(self.spec).encode()
+                _send_buffers(connection, [_HEADER.pack(_SPEC, len(payload)), payload])
+                continue
+
+            if message_type not in (_STEP, _RESET) or size != request_size:
+                raise ValueError('Invalid request')
+
+            for buffer in buffers.request:
+                _recv_into(connection, buffer)
+
+            n_steps, = _N_STEPS.unpack(buffers.n_steps)
+
+            for index_engine in np.flatnonzero(buffers.mask).tolist():
+
+                if message_type == _STEP:
+                    self._step(index_engine, n_steps)
+                else:
+                    self._reset(index_engine)
+
+                self._update_response(index_engine)
+
+            response = buffers.response
+            _send_buffers(connection, [_HEADER.pack(message_type, _Buffers.size(response))] + response)
+
+    def serve_forever(self):
+        """
+        Accepts clients one after the other, until a client closes the server.
+        """
+
+        for index_engine, engine in enumerate(self.engines):
+            engine.update_observations()
+            self._update_response(index_engine)
+
+        _remove_socket_file(self.address)
+
+        server_socket = _create_socket(self.address)
+        server_socket.bind(self.address)
+        server_socket.listen(1)
+
+        try:
+            closed = False
+            while not closed:
+                connection, _ = server_socket.accept()
+                with connection:
+                    closed = self._handle(connection)
+        finally:
+            server_socket.close()
+            _remove_socket_file(self.address)
+
+
+def serve(engine_factory, n_engines, address):
+    """
+    Creates engines and serves them until a client closes the server.
+
+    Args:
+        engine_factory: function without arguments returning a new Engine.
+        n_engines: number of engines.
+        address: path of a Unix domain socket, or (host, port) tuple.
+
+    """
+
+    EngineServer([engine_factory() for _ in range(n_engines)], address).serve_forever()
+
+
+def launch_server(engine_factory, n_engines, address):
+    """
+    Serves engines in a new process.
+
+    Args:
+        engine_factory: function without arguments returning a new Engine. Must be picklable.
+        n_engines: number of engines.
+        address: path of a Unix domain socket, or (host, port) tuple.
+
+    Returns:
+        multiprocessing Process of the server.
+
+    """
+
+    # Forking a process where other threads run (e.g. video encoding) could deadlock the server
+    context = multiprocessing.get_context('spawn')
+    process = context.Process(target=serve, args=(engine_factory, n_engines, address), daemon=True)
+    process.start()
+
+    return process
+
+
+class RemoteActuator:
+    """
+    Description of an actuator of a remote agent. Used as key of the actions, as for local actuators.
+    """
+
+    def __init__(self, part_name, action, action_range, min_value, max_value):
+
+        self.part_name = part_name
+        self.action = action
+        self.action_range = action_range
+        self.min = min_value
+        self.max = max_value
+
+
+class RemoteSensor:
+    """
+    Sensor of a remote agent.
+
+    Attributes:
+        name: name of the sensor.
+        sensor_values: view on the stacked values of the client, updated in place after each request.
+    """
+
+    def __init__(self, name, sensor_values):
+
+        self.name = name
+        self.sensor_values = sensor_values
+
+
+class RemoteAgent:
+    """
+    Agent of a remote engine, with its actuators, sensors and reward.
+    """
+
+    def __init__(self, name, actuators, sensors, client, index_engine, index_agent):
+        """
+        Args:
+            name: name of the agent.
+            actuators: dictionary {RemoteActuator: column in the actions of the client}.
+            sensors: list of RemoteSensor.
+            client: RemoteEngines.
+            index_engine: index of the engine in the client.
+            index_agent: index of the agent in the engine.
+        """
+
+        self.name = name
+        self.sensors = sensors
+
+        self.action_indices = actuators
+        self._client = client
+        self._index = index_engine, index_agent
+
+    def get_all_actuators(self):
+        """
+        Returns: List of the actuators of the agent.
+        """
+        return list(self.action_indices)
+
+    @property
+    def reward(self):
+        """ Reward of the agent at the last step. """
+        return self._client.rewards[self._index]
+
+
+class RemoteEngine:
+    """
+    One of the engines of a server, with the interface of a local Engine.
+
+    Observations are updated by the server after each step and reset:
+    update_observations has nothing to do.
+    """
+
+    def __init__(self, client, index_engine, agents):
+
+        self._client = client
+        self._index = index_engine
+        self.agents = agents
+
+    @property
+    def game_on(self):
+        """ False if the engine reached termination. """
+        return bool(self._client.game_on[self._index])
+
+    @property
+    def elapsed_time(self):
+        """ Number of steps since the last reset. """
+        return int(self._client.elapsed_time[self._index])
+
+    def _set_actions(self, actions):
+
+        row = self._client.actions[self._index]
+        row[:] = 0
+
+        for agent, agent_actions in actions.items():
+            for actuator, value in agent_actions.items():
+                row[agent.action_indices[actuator]] = value
+
+    def step(self, actions):
+        """
+        Runs a single step of the engine.
+
+        Args:
+            actions: Dictionary containing the actions for each RemoteAgent.
+
+        """
+        self.multiple_steps(actions, n_steps=1)
+
+    def multiple_steps(self, actions, n_steps=1):
+        """
+        Runs multiple steps of the engine, with the same actions (see Engine.multiple_steps).
+        """
+
+        self._set_actions(actions)
+
+        mask = np.zeros(self._client.n_engines, dtype=bool)
+        mask[self._index] = True
+
+        self._client.step(n_steps=n_steps, mask=mask)
+
+    def update_observations(self):
+        """
+        Observations are already up to date.
+        """
+
+    def reset(self):
+        """
+        Resets the engine to its initial state.
+        """
+
+        mask = np.zeros(self._client.n_engines, dtype=bool)
+        mask[self._index] = True
+
+        self._client.reset(mask=mask)
+
+
+class RemoteEngines:
+    """
+    Client of an EngineServer, stepping all its engines with batched requests.
+
+    Attributes:
+        engines: list of RemoteEngine.
+        actions: array of shape (n_engines, n_actuators), sent with each step request.
+        rewards: array of shape (n_engines, n_agents).
+        game_on: array of shape (n_engines,).
+        elapsed_time: array of shape (n_engines,).
+        observations: dictionary {(agent index, sensor name): array of shape (n_engines, *sensor shape)}.
+        actuators: list of RemoteActuator, in the order of the columns of actions.
+
+    Note:
+        Arrays are updated in place when a response is received.
+        Up to max_pending step requests can be queued with step_async. The actions are read when a request is sent,
+        and the responses of step_wait are received in the order of the requests.
+        The server simulates the queued requests one after the other.
+    """
+
+    def __init__(self, address, timeout=_CONNECT_TIMEOUT, max_pending=4):
+        """
+        Args:
+            address: address of the server.
+            timeout: time to wait for the server to accept the connection, in seconds.
+            max_pending: maximum number of requests waiting for their response.
+                Responses are not read while requests are queued, so it bounds the memory used by the sockets.
+        """
+
+        if max_pending < 1:
+            raise ValueError('max_pending should be at least 1')
+
+        self._socket = self._connect(address, timeout)
+
+        _send_buffers(self._socket, [_HEADER.pack(_SPEC, 0)])
+        _, size = _recv_header(self._socket)
+        payload = bytearray(size)
+        _recv_into(self._socket, payload)
+        self.spec = json.loads(payload)
+
+        self.n_engines = self.spec['n_engines']
+        self._buffers = _Buffers(self.spec)
+
+        self.actions = self._buffers.actions
+        self.rewards = self._buffers.rewards
+        self.game_on = self._buffers.game_on
+        self.elapsed_time = self._buffers.elapsed_time
+        self.observations = {(index_agent, name): values
+                             for (index_agent, name, _, _), values in zip(self.spec['sensors'], self._buffers.sensors)}
+
+        self.actuators = [RemoteActuator(part_name, ActionTypes[action], ActionTypes[action_range], min_value, max_value)
+                          for _, part_name, action, action_range, min_value, max_value in self.spec['actuators']]
+
+        self.engines = [self._build_engine(index_engine) for index_engine in range(self.n_engines)]
+
+        self._pending = collections.deque()
+        self._max_pending = max_pending
+
+        # Initial observations, without stepping any engine
+        self.step(mask=np.zeros(self.n_engines, dtype=bool))
+
+    @staticmethod
+    def _connect(address, timeout):
+
+        start = time.monotonic()
+
+        while True:
+
+            remote_socket = _create_socket(address)
+
+            try:
+                remote_socket.connect(address)
+                return remote_socket
+
+            except (FileNotFoundError, ConnectionRefusedError):
+                remote_socket.close()
+                if time.monotonic() - start > timeout:
+                    raise
+                time.sleep(0.05)
+
+    def _build_engine(self, index_engine):
+
+        agents = []
+
+        for index_agent, name in enumerate(self.spec['agents'][index_engine]):
+
+            actuators = {actuator: column for column, (actuator, (owner, *_)) in
+                         enumerate(zip(self.actuators, self.spec['actuators'])) if owner == index_agent}
+            sensors = [RemoteSensor(sensor_name, self.observations[owner, sensor_name][index_engine])
+                       for owner, sensor_name, _, _ in self.spec['sensors'] if owner == index_agent]
+
+            agents.append(RemoteAgent(name, actuators, sensors, self, index_engine, index_agent))
+
+        return RemoteEngine(self, index_engine, agents)
+
+    def _send_request(self, message_type, n_steps, mask):
+
+        if len(self._pending) >= self._max_pending:
+            raise ValueError('Too many pending requests, at most {}'.format(self._max_pending))
+
+        buffers = self._buffers
+        buffers.mask[:] = True if mask is None else mask
+        _N_STEPS.pack_into(buffers.n_steps, 0, n_steps)
+
+        request = buffers.request
+        _send_buffers(self._socket, [_HEADER.pack(message_type, _Buffers.size(request))] + request)
+
+        self._pending.append(message_type)
+
+    def _wait_response(self):
+
+        if not self._pending:
+            raise ValueError('No pending request')
+
+        message_type, size = _recv_header(self._socket)
+        response = self._buffers.response
+
+        if message_type != self._pending[0] or size != _Buffers.size(response):
+            raise ValueError('Invalid response')
+
+        for buffer in response:
+            _recv_into(self._socket, buffer)
+
+        self._pending.popleft()
+
+    def _wait_all_responses(self):
+
+        while self._pending:
+            self._wait_response()
+
+    def step_async(self, n_steps=1, mask=None):
+        """
+        Sends a step request with the current actions, without waiting for the response.
+        It is queued after the pending requests.
+
+        Args:
+            n_steps: number of steps with the same actions (see Engine.multiple_steps).
+            mask: boolean array of the engines to step. If None, all engines are stepped.
+
+        """
+        self._send_request(_STEP, n_steps, mask)
+
+    def step_wait(self):
+        """
+        Waits for the response of the oldest pending step request, and updates the observations.
+        """
+        self._wait_response()
+
+    def step(self, n_steps=1, mask=None):
+        """
+        Steps the engines with the current actions, and updates the observations.
+        Waits for the responses of all pending requests.
+        """
+        self.step_async(n_steps, mask)
+        self._wait_all_responses()
+
+    def reset(self, mask=None):
+        """
+        Resets the engines, and updates the observations.
+
+        Args:
+            mask: boolean array of the engines to reset. If None, all engines are reset.
+
+        """
+        self._send_request(_RESET, 0, mask)
+        self._wait_all_responses()
+
+    def close(self, shutdown_server=True):
+        """
+        Closes the connection.
+
+        Args:
+            shutdown_server: If True, the server stops.
+
+        """
+
+        if self._socket is None:
+            return
+
+        if shutdown_server:
+            _send_buffers(self._socket, [_HEADER.pack(_CLOSE, 0)])
+
+        self._socket.close()
+        self._socket = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Serves engines over a local socket.')
+    parser.add_argument('--factory', required=True,
+                        help='function returning a new Engine, as module:function')
+    parser.add_argument('--n-engines', type=int, default=1)
+    parser.add_argument('--address', required=True,
+                        help='path of a Unix domain socket, or port of a local TCP socket')
+    args = parser.parse_args()
+
+    module_name, function_name = args.factory.split(':')
+    engine_factory = getattr(importlib.import_module(module_name), function_name)
+
+    address = ('127.0.0.1', int(args.address)) if args.address.isdigit() else args.address
+
+    serve(engine_factory, args.n_engines, address)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@ from collections import namedtuple
 
 SIMULATION_STEPS = 10
 SPACE_DAMPING = 0.9
+SPATIAL_HASH_DEFAULT_CELL = 20
+SPATIAL_HASH_CELL_SCALE = 2
 
 
 class AgentPartTypes(IntEnum):
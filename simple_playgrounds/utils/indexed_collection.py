@@ -0,0 +1,118 @@
+""" Module implementing the collections of entities of a playground.
+
+Playgrounds can hold thousands of temporary entities, which are added and removed during an episode.
+With lists, membership tests and removals are linear in the number of entities.
+IndexedCollection keeps the insertion order of a list, but indexes its items in a dictionary,
+so that membership tests and removals take constant time.
+
+Typical Usage:
+    scene_elements = IndexedCollection()
+    scene_elements.append(element)
+    scene_elements.remove(element)
+"""
+
+
+class IndexedCollection:
+    """
+    Insertion-ordered collection of unique items, with constant time membership tests and removals.
+
+    Iteration and indexing behave as for a list.
+    Iterating is done on a snapshot, so the collection can be modified during iteration.
+    """
+
+    def __init__(self, items=()):
+        """
+        Args:
+            items: initial items of the collection.
+        """
+
+        self._items = dict.fromkeys(items)
+
+        # Snapshot of the items as a list, rebuilt after a modification
+        self._list = None
+
+    def _as_list(self):
+
+        if self._list is None:
+            self._list = list(self._items)
+
+        return self._list
+
+    def append(self, item):
+        """
+        Adds an item at the end of the collection.
+
+        Raises:
+            ValueError: if the item is already in the collection.
+        """
+
+        if item in self._items:
+            raise ValueError('Item already in collection')
+
+        self._items[item] = None
+        self._list = None
+
+    def remove(self, item):
+        """
+        Removes an item from the collection.
+
+        Raises:
+            ValueError: if the item is not in the collection.
+        """
+
+        if item not in self._items:
+            raise ValueError('Item not in collection')
+
+        del self._items[item]
+        self._list = None
+
+    def discard(self, item):
+        """
+        Removes an item from the collection, if present.
+        """
+
+        if item in self._items:
+            del self._items[item]
+            self._list = None
+
+    def clear(self):
+        """
+        Removes all the items.
+        """
+
+        self._items.clear()
+        self._list = None
+
+    def copy(self):
+        """
+        Returns:
+            Shallow copy of the collection.
+        """
+        return IndexedCollection(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._as_list())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._as_list()[index]
+
+    def __add__(self, other):
+        return self._as_list() + list(other)
+
+    def __eq__(self, other):
+
+        if isinstance(other, (IndexedCollection, list, tuple)):
+            return self._as_list() == list(other)
+
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'IndexedCollection({})'.format(self._as_list())
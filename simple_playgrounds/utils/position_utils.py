@@ -2,13 +2,11 @@
 Module containing classes to generate random positions and trajectories
 
 """
-import random
 import math
 from collections.abc import Generator
 
-import numpy as np
-
 from simple_playgrounds.utils.definitions import geometric_shapes
+from simple_playgrounds.utils.rng_utils import default_rng
 
 #pylint: disable=line-too-long
 #pylint: disable=too-many-instance-attributes
@@ -63,11 +61,16 @@ class PositionAreaSampler:
         else:
             raise ValueError('area shape not implemented')
 
-    def sample(self, center=None):
+        # Used when no Generator is provided when sampling
+        self._rng = default_rng()
+
+    def sample(self, center=None, rng=None):
         """
 
         Args:
             center:
+            rng: numpy Generator used to sample the position.
+                If None, the sampler uses its own unseeded Generator.
 
         Returns:
             position ('obj'list of 'obj'float): (x,pos_y,theta) position sampled
@@ -78,10 +81,13 @@ class PositionAreaSampler:
         if center is not None:
             self.center = center
 
+        if rng is None:
+            rng = self._rng
+
         if self.area_shape == 'rectangle':
             # split the rectangle to horizontal and vertical pieces,
             # choose based on h_threshold and then sample uniformly and shift
-            if random.random() < self.h_threshold:
+            if rng.random() < self.h_threshold:
                 width = self.width
                 length = self.length - self.excl_length
                 x_shift = 0
@@ -93,10 +99,10 @@ class PositionAreaSampler:
                 y_shift = 0
 
             sign = lambda x: math.copysign(1, x)
-            pos_x = random.uniform(-width / 2, width / 2)
+            pos_x = rng.uniform(-width / 2, width / 2)
             pos_x += sign(pos_x) * x_shift / 2
 
-            pos_y = random.uniform(-length / 2, length / 2)
+            pos_y = rng.uniform(-length / 2, length / 2)
             pos_y += sign(pos_y) * y_shift / 2
 
             pos_x_ = pos_x * math.cos(self.angle) - pos_y * math.sin(self.angle)
@@ -104,25 +110,25 @@ class PositionAreaSampler:
             pos_x = pos_x_ + self.center[0]
             pos_y = pos_y_ + self.center[1]
 
-            theta = random.uniform(self.theta_min, self.theta_max)
+            theta = rng.uniform(self.theta_min, self.theta_max)
 
         elif self.area_shape == 'circle':
-            radius = math.sqrt(random.uniform(self.excl_radius**2, self.radius**2))
-            alpha = random.random() * 2 * math.pi
+            radius = math.sqrt(rng.uniform(self.excl_radius**2, self.radius**2))
+            alpha = rng.random() * 2 * math.pi
 
             pos_x = self.center[0] + radius * math.cos(alpha)
             pos_y = self.center[1] + radius * math.sin(alpha)
-            theta = random.uniform(self.theta_min, self.theta_max)
+            theta = rng.uniform(self.theta_min, self.theta_max)
 
         elif self.area_shape == 'gaussian':
 
             pos_x = math.inf
             pos_y = math.inf
-            theta = random.uniform(self.theta_min, self.theta_max)
+            theta = rng.uniform(self.theta_min, self.theta_max)
 
             while (pos_x - self.center[0])**2 + (pos_y - self.center[1])**2 > self.radius**2:
 
-                pos_x, pos_y = np.random.multivariate_normal(self.center, [[self.variance, 0], [0, self.variance]])
+                pos_x, pos_y = rng.multivariate_normal(self.center, [[self.variance, 0], [0, self.variance]])
 
         return pos_x, pos_y, theta
 
@@ -0,0 +1,82 @@
+"""
+Module containing helpers to create seeded random number generators.
+
+All the randomness of a playground (positions, fields, textures, controllers, noise)
+is drawn from numpy Generators derived from a single seed.
+Independent streams are obtained by spawning children of a SeedSequence,
+so that parallel workers never share hidden random state.
+
+Typical Usage:
+    seeds = spawn_seeds(1234, n_workers)
+    playgrounds = [SingleRoom(size=(200, 200), seed=seed) for seed in seeds]
+"""
+
+import numpy as np
+
+
+def as_seed_sequence(seed=None):
+    """
+    Converts a seed into a numpy SeedSequence.
+    SeedSequences are copied without their spawned children: spawning mutates a SeedSequence,
+    so the same SeedSequence given twice produces the same streams.
+
+    Args:
+        seed: None, int or SeedSequence.
+            If None, fresh entropy is pulled from the OS.
+
+    Returns:
+        SeedSequence.
+
+    """
+
+    if isinstance(seed, np.random.SeedSequence):
+        return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key, pool_size=seed.pool_size)
+
+    return np.random.SeedSequence(seed)
+
+
+def spawn_seeds(seed, n_streams):
+    """
+    Generates independent child seeds from a single seed.
+    Use one child seed per worker (playground) to obtain independent random streams.
+
+    Args:
+        seed: None, int or SeedSequence.
+        n_streams: number of independent streams.
+
+    Returns:
+        List of SeedSequence.
+
+    """
+
+    return as_seed_sequence(seed).spawn(n_streams)
+
+
+def spawn_rng(seed_sequence):
+    """
+    Spawns a new independent Generator from a SeedSequence.
+    The SeedSequence keeps track of the number of children already spawned,
+    so successive calls return different streams.
+
+    Args:
+        seed_sequence: SeedSequence.
+
+    Returns:
+        numpy Generator.
+
+    """
+
+    return np.random.default_rng(seed_sequence.spawn(1)[0])
+
+
+def default_rng():
+    """
+    Creates an unseeded Generator.
+    Used by objects that are not (yet) attached to a seeded playground.
+
+    Returns:
+        numpy Generator.
+
+    """
+
+    return np.random.default_rng()
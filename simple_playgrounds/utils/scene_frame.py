@@ -0,0 +1,147 @@
+""" Module implementing the frame of the scene shared by all visual sensors and the screen.
+
+Instead of drawing the scene once per visual sensor, the engine rasterizes it once per step
+onto a SceneFrame. The frame keeps the layer of each entity, in drawing order:
+the entity, its visible mask and the rectangle where the mask was drawn.
+
+Elements that are invisible to a sensor are masked: only the rectangles of these elements
+are repainted from the background and the layers of the other entities.
+This gives the same image as drawing the scene without them.
+
+Typical Usage:
+    frame.render(background_surface, playground)
+    surface = frame.get_masked_surface(invisible_elements)
+"""
+
+import numpy as np
+import pygame
+
+
+class SceneFrame:
+    """
+    Rasterized scene, with one layer per drawn entity.
+
+    Attributes:
+        surface: Pygame Surface of the scene.
+        layers: list of (entity, visible mask, rect), in drawing order.
+    """
+
+    def __init__(self, size):
+        """
+        Args:
+            size: (width, height) of the surface, in pygame coordinates.
+        """
+
+        self.surface = pygame.Surface(size)
+        self.layers = []
+
+        self._background = None
+        self._rects = {}
+
+        # Surface where invisible elements are masked
+        self._masked_surface = pygame.Surface(size)
+
+    def render(self, background, playground, with_interactions=False):
+        """
+        Draws the scene elements and agents of the playground on the background.
+
+        Args:
+            background: Pygame Surface where the background elements are drawn.
+            playground: Playground.
+            with_interactions: If True, also draws the graspable and interactive background elements
+                and the interaction areas (used for display).
+
+        """
+
+        self._background = background
+        self.surface.blit(background, (0, 0))
+
+        self.layers = []
+        self._rects = {}
+
+        for entity in playground.scene_elements:
+
+            if not entity.background or (with_interactions and (entity.graspable or entity.interactive)):
+                self._add_layer(entity, entity.draw(self.surface, draw_interaction=with_interactions))
+
+        for agent in playground.agents:
+            for part in agent.parts:
+                self._add_layer(part, part.draw(self.surface))
+
+    def _add_layer(self, entity, rect):
+
+        if rect is not None:
+            self.layers.append((entity, entity.visible_mask, rect))
+            self._rects[entity] = rect
+
+    def get_rect(self, entity):
+        """
+        Rectangle where an entity was drawn, None if it was not drawn.
+        """
+        return self._rects.get(entity)
+
+    def get_masked_surface(self, invisible_elements, area=None):
+        """
+        Computes the scene without the invisible elements.
+
+        Args:
+            invisible_elements: collection of entities to remove from the scene.
+            area: If not None, pygame Rect of the region of interest.
+                Invisible elements outside of this region are not masked.
+
+        Returns:
+            Pygame Surface. If no invisible element needs masking, the surface of the frame itself.
+
+        """
+
+        hidden_rects = [rect for entity, _, rect in self.layers
+                        if entity in invisible_elements and (area is None or rect.colliderect(area))]
+
+        if not hidden_rects:
+            return self.surface
+
+        surface = self._masked_surface
+        surface.blit(self.surface, (0, 0))
+
+        for hidden_rect in hidden_rects:
+
+            surface.set_clip(hidden_rect)
+            surface.blit(self._background, hidden_rect, hidden_rect)
+
+            for entity, mask, rect in self.layers:
+                if entity not in invisible_elements and rect.colliderect(hidden_rect):
+                    surface.blit(mask, rect)
+
+        surface.set_clip(None)
+
+        return surface
+
+
+def surface_to_image(surface):
+    """
+    Converts a Pygame Surface of the scene into an image, with the orientation of the playground.
+
+    Args:
+        surface: Pygame Surface.
+
+    Returns:
+        Numpy array of shape (length, width, 3), scaled between 0 and 1. Color code follows OpenCV.
+
+    """
+
+    return pixels_to_image(pygame.surfarray.pixels3d(surface.copy()) / 255.)
+
+
+def pixels_to_image(pixels):
+    """
+    Converts an array of pixels, indexed as the Pygame Surface of the scene, into an image.
+
+    Args:
+        pixels: Numpy array of shape (width, length, 3), in RGB.
+
+    Returns:
+        View of shape (length, width, 3), in BGR (OpenCV color code).
+
+    """
+
+    return np.rot90(pixels, 1, (1, 0))[::-1, :, ::-1]
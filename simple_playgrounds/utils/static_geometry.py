@@ -0,0 +1,362 @@
+""" Module implementing the precomputed geometry of static occluders.
+
+Walls and other static obstacles never move, but each ray of a sensor would
+query them through pymunk at every timestep.
+StaticGeometry stores the edges and vertices of all static occluders of a playground
+as numpy arrays, and computes the closest static hit of all the rays of a sensor
+at once. Pymunk queries are then only required for dynamic shapes.
+
+Static occluders are scene elements which are not movable, do not follow waypoints,
+and have a solid visible shape. Their visible shape is put in a dedicated category,
+so that pymunk queries can exclude them (see DYNAMIC_SHAPES_FILTER).
+
+The playground rebuilds its StaticGeometry whenever a static occluder is added or removed
+(e.g. when a door opens or closes).
+A StaticGeometry can also be built from any shapes, as a snapshot of their current position.
+"""
+
+import numpy as np
+import pymunk
+
+STATIC_OCCLUDER_CATEGORY = 1 << 31
+
+DYNAMIC_SHAPES_FILTER = pymunk.ShapeFilter(mask=pymunk.ShapeFilter.ALL_MASKS() ^ STATIC_OCCLUDER_CATEGORY)
+
+
+def is_static_occluder(entity):
+    """
+    Checks if an entity can be handled by StaticGeometry.
+
+    Args:
+        entity: Entity.
+
+    Returns:
+        True if the entity never moves and blocks rays.
+
+    """
+
+    shape = entity.pm_visible_shape
+
+    return (not entity.movable
+            and not entity.follows_waypoints
+            and shape is not None
+            and not shape.sensor
+            and isinstance(shape, (pymunk.Poly, pymunk.Circle)))
+
+
+class StaticGeometry:
+    """
+    Edges and disks of static occluders, used to compute ray hits with array operations.
+
+    Polygons are decomposed into edges and vertices, so that a ray of radius r hits a polygon
+    when it hits an edge shifted outwards by r, or a disk of radius r around a vertex.
+    This matches pymunk segment queries of a single shape with a radius.
+
+    Pymunk space queries differ from single shape queries in two ways:
+    only the shapes whose bounding box is crossed by the segment of the ray are tested,
+    ignoring its radius, so rays that graze a shape outside of its bounding box miss it;
+    and rays starting within their radius of a shape hit it with alpha 0, which sensors ignore.
+    By default, the same rules are applied, so that hits match space queries.
+    """
+
+    def __init__(self, shapes, match_space_queries=True):
+        """
+        Args:
+            shapes: list of pymunk Poly or Circle shapes attached to static bodies.
+            match_space_queries: If True, rays only hit the shapes whose bounding box they cross,
+                and traverse the shapes they start in, as in pymunk space queries.
+                If False, grazing hits are also detected.
+        """
+
+        self.shapes = list(shapes)
+        self._shape_indices = {shape: index for index, shape in enumerate(self.shapes)}
+
+        self._bounding_boxes = None
+        if match_space_queries:
+            self._bounding_boxes = np.array([(bb.left, bb.bottom, bb.right, bb.top)
+                                             for bb in (shape.bb for shape in self.shapes)],
+                                            dtype=float).reshape(-1, 4)
+
+        edge_starts, edge_ends, edge_radii, edge_shapes = [], [], [], []
+        disk_centers, disk_radii, disk_shapes = [], [], []
+
+        for index, shape in enumerate(self.shapes):
+
+            body = shape.body
+
+            if isinstance(shape, pymunk.Circle):
+                disk_centers.append(body.local_to_world(shape.offset))
+                disk_radii.append(shape.radius)
+                disk_shapes.append(index)
+                continue
+
+            vertices = [body.local_to_world(vertex) for vertex in shape.get_vertices()]
+
+            for vertex, next_vertex in zip(vertices, vertices[1:] + vertices[:1]):
+                edge_starts.append(vertex)
+                edge_ends.append(next_vertex)
+                edge_radii.append(shape.radius)
+                edge_shapes.append(index)
+
+                disk_centers.append(vertex)
+                disk_radii.append(shape.radius)
+                disk_shapes.append(index)
+
+        self._edge_starts = np.array(edge_starts, dtype=float).reshape(-1, 2)
+        self._edge_vectors = np.array(edge_ends, dtype=float).reshape(-1, 2) - self._edge_starts
+        self._edge_radii = np.array(edge_radii, dtype=float)
+        self._edge_shapes = np.array(edge_shapes, dtype=int)
+
+        # Outward normals, for counter-clockwise vertices
+        lengths = np.linalg.norm(self._edge_vectors, axis=1, keepdims=True)
+        self._edge_normals = np.stack([self._edge_vectors[:, 1], -self._edge_vectors[:, 0]], axis=1)
+        self._edge_normals /= np.where(lengths > 0, lengths, 1)
+
+        self._disk_centers = np.array(disk_centers, dtype=float).reshape(-1, 2)
+        self._disk_radii = np.array(disk_radii, dtype=float)
+        self._disk_shapes = np.array(disk_shapes, dtype=int)
+
+    def _intersect(self, start, directions, length, radius, excluded_shapes):
+        """
+        Computes the distance along each ray to each edge and disk.
+
+        Returns:
+            Array of distances of shape (n_rays, n_edges + n_disks), inf if there is no hit,
+            and array of the shape index of each edge and disk.
+
+        """
+
+        # Rays against edges shifted outwards
+        edge_starts = self._edge_starts + self._edge_normals * (self._edge_radii + radius)[:, np.newaxis]
+        to_edges = edge_starts - start
+
+        denominators = (directions[:, np.newaxis, 0] * self._edge_vectors[np.newaxis, :, 1]
+                        - directions[:, np.newaxis, 1] * self._edge_vectors[np.newaxis, :, 0])
+
+        front_facing = directions @ self._edge_normals.T < 0
+        safe_denominators = np.where(front_facing, denominators, 1)
+
+        edge_t = (to_edges[:, 0] * self._edge_vectors[:, 1]
+                  - to_edges[:, 1] * self._edge_vectors[:, 0]) / safe_denominators
+        edge_u = (to_edges[np.newaxis, :, 0] * directions[:, np.newaxis, 1]
+                  - to_edges[np.newaxis, :, 1] * directions[:, np.newaxis, 0]) / safe_denominators
+
+        edge_valid = front_facing & (edge_u >= 0) & (edge_u <= 1)
+        edge_t = np.where(edge_valid, edge_t, np.inf)
+
+        # Rays against disks (circles and vertices of polygons)
+        to_start = start - self._disk_centers
+        disk_b = directions @ to_start.T
+        disk_c = np.sum(to_start**2, axis=1) - (self._disk_radii + radius)**2
+        discriminants = disk_b**2 - disk_c
+
+        disk_t = -disk_b - np.sqrt(np.maximum(discriminants, 0))
+        disk_t = np.where(discriminants >= 0, disk_t, np.inf)
+
+        all_t = np.concatenate([edge_t, disk_t], axis=1)
+        all_shapes = np.concatenate([self._edge_shapes, self._disk_shapes])
+
+        excluded = [self._shape_indices[shape] for shape in excluded_shapes
+                    if shape in self._shape_indices]
+        # Space queries hit shapes around the start of the rays with alpha 0, and sensors ignore them
+        if self._bounding_boxes is not None:
+            excluded.extend(np.flatnonzero(self._start_in_shapes(start, radius)).tolist())
+
+        invalid = (all_t <= 0) | (all_t > length) | np.isin(all_shapes, excluded)[np.newaxis, :]
+        all_t = np.where(invalid, np.inf, all_t)
+
+        # Space queries only test the shapes whose bounding box is crossed by the rays
+        if self._bounding_boxes is not None:
+            hit_rays, hit_primitives = np.nonzero(np.isfinite(all_t))
+            crossed = self._cross_bounding_boxes(start, directions[hit_rays] * length,
+                                                 all_shapes[hit_primitives])
+            all_t[hit_rays[~crossed], hit_primitives[~crossed]] = np.inf
+
+        return all_t, all_shapes
+
+    def _start_in_shapes(self, start, radius):
+        """
+        Checks which shapes contain the start point, or are within radius of it.
+
+        Returns:
+            Boolean array of shape (n_shapes,).
+
+        """
+
+        n_shapes = len(self.shapes)
+
+        # Closest point of each edge
+        to_start = start - self._edge_starts
+        squared_lengths = np.maximum(np.sum(self._edge_vectors**2, axis=1), 1e-12)
+        projections = np.clip(np.sum(to_start * self._edge_vectors, axis=1) / squared_lengths, 0, 1)
+        edge_distances = np.linalg.norm(to_start - projections[:, np.newaxis] * self._edge_vectors, axis=1)
+        near_edges = edge_distances <= self._edge_radii + radius
+
+        disk_distances = np.linalg.norm(start - self._disk_centers, axis=1)
+        near_disks = disk_distances <= self._disk_radii + radius
+
+        # Polygons contain the points that are behind all their edges
+        in_front = np.sum(to_start * self._edge_normals, axis=1) > 0
+        n_edges = np.bincount(self._edge_shapes, minlength=n_shapes)
+        inside = (n_edges > 0) & (np.bincount(self._edge_shapes, weights=in_front, minlength=n_shapes) == 0)
+
+        near = np.bincount(self._edge_shapes, weights=near_edges, minlength=n_shapes) > 0
+        near |= np.bincount(self._disk_shapes, weights=near_disks, minlength=n_shapes) > 0
+
+        return inside | near
+
+    def _cross_bounding_boxes(self, start, deltas, shape_indices):
+        """
+        Checks if segments cross the bounding box of shapes, with the slab test of pymunk.
+
+        Args:
+            start: start point of the segments.
+            deltas: array of shape (n, 2), from the start to the end of each segment.
+            shape_indices: array of shape (n,), index of the shape tested with each segment.
+
+        Returns:
+            Boolean array of shape (n,).
+
+        """
+
+        bounding_boxes = self._bounding_boxes[shape_indices]
+
+        t_min = np.full(len(deltas), -np.inf)
+        t_max = np.full(len(deltas), np.inf)
+        outside = np.zeros(len(deltas), dtype=bool)
+
+        for axis in range(2):
+
+            lower = bounding_boxes[:, axis]
+            upper = bounding_boxes[:, axis + 2]
+            delta = deltas[:, axis]
+
+            parallel = delta == 0
+            outside |= parallel & ((start[axis] < lower) | (upper < start[axis]))
+
+            safe_delta = np.where(parallel, 1, delta)
+            t_lower = (lower - start[axis]) / safe_delta
+            t_upper = (upper - start[axis]) / safe_delta
+
+            t_min = np.where(parallel, t_min, np.maximum(t_min, np.minimum(t_lower, t_upper)))
+            t_max = np.where(parallel, t_max, np.minimum(t_max, np.maximum(t_lower, t_upper)))
+
+        return ~outside & (t_min <= t_max) & (t_max >= 0) & (t_min < 1)
+
+    def distances(self, start, directions, length, radius, excluded_shapes=()):
+        """
+        Computes the distance to the closest hit of multiple rays starting from the same point.
+
+        Args:
+            start: start point of the rays, in pymunk coordinates.
+            directions: array of shape (n_rays, 2) of unit vectors.
+            length: length of the rays.
+            radius: radius of the rays.
+            excluded_shapes: shapes that the rays traverse.
+
+        Returns:
+            Array of distances, inf for rays without hit.
+
+        """
+
+        start = np.asarray(start, dtype=float)
+        all_t, _ = self._intersect(start, directions, length, radius, excluded_shapes)
+
+        if all_t.shape[1] == 0:
+            return np.full(len(directions), np.inf)
+
+        return np.min(all_t, axis=1)
+
+    def query(self, start, directions, length, radius, excluded_shapes=()):
+        """
+        Computes the closest hit of multiple rays starting from the same point.
+
+        Args:
+            start: start point of the rays, in pymunk coordinates.
+            directions: array of shape (n_rays, 2) of unit vectors.
+            length: length of the rays.
+            radius: radius of the rays.
+            excluded_shapes: shapes that the rays traverse.
+
+        Returns:
+            List containing, for each ray, a pymunk SegmentQueryInfo or None if there is no hit.
+
+        """
+
+        start = np.asarray(start, dtype=float)
+        n_rays = len(directions)
+
+        all_t, all_shapes = self._intersect(start, directions, length, radius, excluded_shapes)
+
+        if all_t.shape[1] == 0:
+            return [None] * n_rays
+
+        closest = np.argmin(all_t, axis=1)
+        closest_t = all_t[np.arange(n_rays), closest]
+
+        hit_rays = np.flatnonzero(np.isfinite(closest_t))
+        hit_primitives = closest[hit_rays]
+        hit_t = closest_t[hit_rays]
+
+        centers = start + directions[hit_rays] * hit_t[:, np.newaxis]
+
+        # Normals of edges, or from the center of disks
+        n_edges = len(self._edge_shapes)
+        on_edge = hit_primitives < n_edges
+
+        normals = np.empty_like(centers)
+        normals[on_edge] = self._edge_normals[hit_primitives[on_edge]]
+        disk_normals = centers[~on_edge] - self._disk_centers[hit_primitives[~on_edge] - n_edges]
+        normals[~on_edge] = disk_normals / np.linalg.norm(disk_normals, axis=1, keepdims=True)
+
+        points = centers - normals * radius
+
+        hits = [None] * n_rays
+
+        for index_ray, index_shape, point, normal, alpha in zip(hit_rays.tolist(),
+                                                                 all_shapes[hit_primitives].tolist(),
+                                                                 points.tolist(),
+                                                                 normals.tolist(),
+                                                                 (hit_t / length).tolist()):
+
+            hits[index_ray] = pymunk.SegmentQueryInfo(self.shapes[index_shape],
+                                                      pymunk.Vec2d(*point), pymunk.Vec2d(*normal), alpha)
+
+        return hits
+
+
+def rays_near_shapes(start, directions, lengths, shapes, radius):
+    """
+    Finds the rays that pass close to at least one of the shapes.
+    Shapes are approximated by the bounding circle of their bounding box.
+
+    Args:
+        start: start point of the rays, in pymunk coordinates.
+        directions: array of shape (n_rays, 2) of unit vectors.
+        lengths: array of length of each ray.
+        shapes: list of pymunk shapes.
+        radius: radius of the rays.
+
+    Returns:
+        Boolean array, True for rays that might hit one of the shapes.
+
+    """
+
+    if not shapes:
+        return np.zeros(len(directions), dtype=bool)
+
+    bounding_boxes = np.array([(bb.left, bb.bottom, bb.right, bb.top)
+                               for bb in (shape.bb for shape in shapes)])
+
+    centers = (bounding_boxes[:, :2] + bounding_boxes[:, 2:]) / 2
+    radii = np.linalg.norm(bounding_boxes[:, 2:] - bounding_boxes[:, :2], axis=1) / 2 + radius
+
+    to_centers = centers - np.asarray(start, dtype=float)
+
+    # Distance between each center and its closest point on each ray
+    projections = np.clip(directions @ to_centers.T, 0, np.asarray(lengths)[:, np.newaxis])
+    squared_distances = (np.sum(to_centers**2, axis=1)[np.newaxis, :]
+                         - 2 * projections * (directions @ to_centers.T)
+                         + projections**2)
+
+    return np.any(squared_distances <= radii**2, axis=1)
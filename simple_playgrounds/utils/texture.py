@@ -4,7 +4,6 @@ Documentation is incomplete/missing. Refer to the tutorials for now.
 """
 
 import math
-import random
 from abc import ABC, abstractmethod
 
 import numpy as np
@@ -12,6 +11,8 @@ from pygame import Surface
 from pygame import surfarray
 import cv2
 
+from simple_playgrounds.utils.rng_utils import default_rng
+
 #pylint: disable=all
 
 
@@ -53,6 +54,11 @@ class Texture(ABC):
         self.surface = Surface((self.size, self.size))
         self.radius = kwargs['radius']
 
+        # numpy Generator used by random textures
+        self.rng = kwargs.get('rng')
+        if self.rng is None:
+            self.rng = default_rng()
+
     @abstractmethod
     def generate(self):
 
@@ -87,7 +93,7 @@ class UniformTexture(Texture):
 
     def generate(self):
 
-        random_image = np.random.uniform(self.min, self.max, (self.size, self.size, 3))
+        random_image = self.rng.uniform(self.min, self.max, (self.size, self.size, 3))
         random_image = random_image.astype('int')
         surf = surfarray.make_surface(random_image)
         return surf
@@ -105,7 +111,7 @@ class RandomTilesTexture(Texture):
     def generate(self):
 
         size_shrink = (int(self.size*1.0/self.size_tiles), int(self.size*1.0/self.size_tiles), 3)
-        random_image = np.random.uniform(self.min, self.max, size_shrink).astype('int')
+        random_image = self.rng.uniform(self.min, self.max, size_shrink).astype('int')
         random_image = cv2.resize(random_image, ( self.size, self.size ), interpolation=cv2.INTER_NEAREST)
         surf = surfarray.make_surface(random_image)
         return surf
@@ -139,7 +145,7 @@ class UniqueRandomTilesTexture(Texture):
                 for b in b_list:
                     self.list_rgb_colors.append([r,b,g])
 
-        random.shuffle(self.list_rgb_colors)
+        self.rng.shuffle(self.list_rgb_colors)
 
     def generate(self):
         """
@@ -153,7 +159,7 @@ class UniqueRandomTilesTexture(Texture):
         min_color = [ max(0, x - self.delta_uniform) for x in color]
         max_color = [ min(255, x + self.delta_uniform) for x in color]
 
-        random_image = np.random.uniform(min_color, max_color, (int(self.size*1.0/self.size_tiles), int(self.size*1.0/self.size_tiles), 3)).astype('int')
+        random_image = self.rng.uniform(min_color, max_color, (int(self.size*1.0/self.size_tiles), int(self.size*1.0/self.size_tiles), 3)).astype('int')
         random_image = cv2.resize(random_image, ( self.size, self.size ), interpolation=cv2.INTER_NEAREST)
         surf = surfarray.make_surface(random_image)
         return surf
@@ -249,7 +255,7 @@ class CenteredRandomTilesTexture(Texture):
 
         img = np.zeros( (self.size, self.size, 3) )
 
-        colors = [ [ random.randint( self.min[i],self.max[i] ) for i in range(3)] for c in range(self.n_stripes) ]
+        colors = [ [ int(self.rng.integers( self.min[i],self.max[i], endpoint=True )) for i in range(3)] for c in range(self.n_stripes) ]
 
         x = (self.size - 1) / 2
         y = (self.size - 1) / 2
@@ -285,7 +291,7 @@ class ListCenteredRandomTiles(Texture):
 
         img = np.zeros( (self.size, self.size , 3) )
 
-        colors = random.choices( self.colors, k = self.n_stripes)
+        colors = [ self.colors[i] for i in self.rng.integers(0, len(self.colors), size=self.n_stripes) ]
 
         x = (self.size - 1) / 2
         y = (self.size - 1) / 2
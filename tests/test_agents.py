@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 from simple_playgrounds.agents.controllers import Random
 from simple_playgrounds.agents.parts.platform import ForwardPlatform, FixedPlatform, \
     HolonomicPlatform, ForwardBackwardPlatform
@@ -151,3 +154,45 @@ def test_agent_initial_position():
     playground.add_agent(agent)
     assert agent.position != pos_1
     playground.remove_agent(agent)
+
+
+# Actions given as flat arrays are dispatched as dictionaries of actions
+def test_action_vectors():
+
+    agents, engines = [], []
+
+    for _ in range(2):
+        playground = PlaygroundRegister.playgrounds['test']['basic'](seed=0)
+        agent = HeadEyeAgent(controller=Random(), interactive=True, platform=HolonomicPlatform)
+        playground.add_agent(agent)
+        agents.append(agent)
+        engines.append(Engine(playground, time_limit=50))
+
+    actuators = agents[0].get_all_actuators()
+    assert list(agents[0].action_dispatch) == actuators
+
+    rng = np.random.default_rng(0)
+
+    while engines[0].game_on:
+
+        values = rng.uniform(-2, 2, len(actuators))
+
+        engines[0].step({agents[0]: dict(zip(actuators, values.tolist()))})
+        engines[1].step({agents[1]: values})
+
+        assert agents[0].position == agents[1].position
+        assert list(agents[1].current_actions.values()) == [min(max(value, actuator.min), actuator.max)
+                                                            for actuator, value in zip(actuators, values)]
+
+    with pytest.raises(ValueError):
+        agents[1].apply_action_vector(np.zeros(len(actuators) + 1))
+
+
+def test_part_slots():
+
+    for platform in [ForwardPlatform, FixedPlatform, HolonomicPlatform, ForwardBackwardPlatform]:
+
+        agent = HeadEyeAgent(controller=Random(), interactive=True, platform=platform)
+
+        for part in agent.parts:
+            assert not hasattr(part, '__dict__')
@@ -1,13 +1,29 @@
+import asyncio
+import math
+import os
+import socket
+import threading
+import time
+
+import cv2
+import numpy as np
+import pygame
+import pytest
+
 from simple_playgrounds.agents.controllers import Random
 from simple_playgrounds.agents import BaseAgent
-from simple_playgrounds import Engine
-from simple_playgrounds.agents.sensors import Touch
+from simple_playgrounds import Engine, EpisodeRecorder, EpisodeReplayer, VideoRecorder
+from simple_playgrounds.remote import RemoteEngines, launch_server
+from simple_playgrounds.agents.sensors import Touch, Lidar
 from simple_playgrounds.agents.parts import ForwardPlatform
 
 from simple_playgrounds.playground import PlaygroundRegister
 
-from simple_playgrounds.playgrounds.empty import SingleRoom
-from simple_playgrounds.utils.position_utils import PositionAreaSampler
+from simple_playgrounds.playgrounds.empty import SingleRoom, ConnectedRooms2D
+from simple_playgrounds.playgrounds.scene_elements import Basic, Candy, Dispenser, Field
+from simple_playgrounds.utils.definitions import ActionTypes
+from simple_playgrounds.utils.position_utils import PositionAreaSampler, Trajectory
+from simple_playgrounds.utils.rng_utils import spawn_seeds
 
 
 # Add/remove agent from a playground
@@ -195,6 +211,44 @@ def test_multisteps():
         playground.remove_agent(agent)
 
 
+# Frame-skip fast path gives the same runs as multiple_steps
+# (playgrounds with grasping are not reproducible, as pymunk solves constraints in memory order)
+def test_frame_skip():
+
+    for pg_name in ['contacts', 'fields', 'teleports']:
+
+        runs = []
+
+        for fused in [False, True]:
+
+            playground = PlaygroundRegister.playgrounds['test'][pg_name](seed=1)
+            agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+            agent.add_sensor(Touch(name='touch', anchor=agent.base_platform))
+            playground.add_agent(agent)
+
+            engine = Engine(playground, time_limit=200)
+            positions, rewards = [], []
+
+            while engine.game_on:
+
+                actions = {agent: agent.controller.generate_actions()}
+
+                if fused:
+                    observations, step_rewards, _ = engine.frame_skip(actions, n_repeats=4)
+                    assert observations[agent]['touch'] is agent.sensors[0].sensor_values
+                    assert step_rewards[0] == agent.reward
+                else:
+                    engine.multiple_steps(actions, n_steps=4)
+                    engine.update_observations()
+
+                positions.append(agent.position)
+                rewards.append(agent.reward)
+
+            runs.append((positions, rewards, engine.elapsed_time))
+
+        assert runs[0] == runs[1]
+
+
 def test_agent_in_different_environments():
 
     print('Testing of agent moving to different environments')
@@ -254,3 +308,678 @@ def test_agent_in_different_environments():
     pg_1.reset()
     pg_2.reset()
     pg_1.add_agent(agent)
+
+
+def _run_seeded_playground(seed):
+
+    playground = PlaygroundRegister.playgrounds['test']['basic'](seed=seed)
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform,
+                      noise_params={'type': 'gaussian', 'scale': 0.1})
+    agent.add_sensor(Touch(anchor=agent.base_platform,
+                           noise_params={'type': 'gaussian', 'scale': 1}))
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=50)
+    engine.run()
+
+    return agent.position, agent.sensors[0].sensor_values
+
+
+# Same seed gives identical runs, different seeds give different runs
+def test_seeded_playgrounds():
+
+    position_1, values_1 = _run_seeded_playground(42)
+    position_2, values_2 = _run_seeded_playground(42)
+    position_3, _ = _run_seeded_playground(43)
+
+    assert position_1 == position_2
+    assert (values_1 == values_2).all()
+    assert position_1 != position_3
+
+
+# Seeding twice with the same SeedSequence gives identical runs
+def test_seed_sequence_reuse():
+
+    seed_sequence = np.random.SeedSequence(42)
+
+    position_1, values_1 = _run_seeded_playground(seed_sequence)
+    position_2, values_2 = _run_seeded_playground(seed_sequence)
+
+    assert position_1 == position_2
+    assert (values_1 == values_2).all()
+
+    playground = PlaygroundRegister.playgrounds['test']['basic']()
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    agent.add_sensor(Touch(anchor=agent.base_platform, noise_params={'type': 'gaussian', 'scale': 1}))
+    playground.add_agent(agent)
+    engine = Engine(playground, time_limit=20)
+
+    observations = []
+    for _ in range(2):
+        playground.seed(seed_sequence)
+        engine.reset()
+
+        while engine.game_on:
+            engine.step(engine.get_actions())
+            engine.update_observations()
+
+        observations.append((agent.position, agent.sensors[0].sensor_values.copy()))
+
+    assert observations[0][0] == observations[1][0]
+    assert (observations[0][1] == observations[1][1]).all()
+
+
+def test_seeded_workers():
+
+    seeds = spawn_seeds(42, 2)
+
+    doorsteps = [ConnectedRooms2D(doorstep_type='random', seed=seed).doorsteps for seed in seeds]
+    assert doorsteps[0] != doorsteps[1]
+
+    doorsteps_replay = ConnectedRooms2D(doorstep_type='random', seed=spawn_seeds(42, 2)[0]).doorsteps
+    assert doorsteps[0] == doorsteps_replay
+
+
+# Grasp constraints are reused, and only in the space while an element is held
+def test_grasp_constraints():
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    playground = PlaygroundRegister.playgrounds['test']['grasp']()
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=300, seed=1)
+
+    all_constraints = set()
+
+    while engine.game_on:
+        engine.step(engine.get_actions())
+
+        held_elements = playground.held_elements
+        constraints_in_space = set(playground.space.constraints)
+
+        for part, element in held_elements.items():
+            assert part.is_holding
+            constraints = playground._grasp_constraints[element][part]
+            assert constraints_in_space.issuperset(constraints)
+            all_constraints.update(constraints)
+
+        assert len(constraints_in_space & all_constraints) == 3 * len(held_elements)
+
+    assert len(all_constraints) == 3 * sum(len(by_part) for by_part in playground._grasp_constraints.values())
+
+    playground.remove_agent(agent)
+    assert not playground.held_elements
+    assert not set(playground.space.constraints) & all_constraints
+
+
+# Reused grasp constraints hold elements where they are grasped
+def test_grasp_again():
+
+    playground = SingleRoom(size=(200, 200), seed=0)
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    agent.initial_position = [100, 100, 0]
+    playground.add_agent(agent)
+
+    element = Basic([125, 100, 0], default_config_key='circle', radius=5, mass=5,
+                    movable=True, graspable=True, interaction_range=10)
+    playground.add_scene_element(element)
+
+    part = agent.base_platform
+
+    part.apply_action(part.grasp_actuator, 1)
+    playground.update()
+    assert playground.held_elements == {part: element}
+
+    part.apply_action(part.grasp_actuator, 0)
+    playground.update()
+    assert not playground.held_elements
+
+    element.position = [100, 122, 0]
+
+    part.apply_action(part.grasp_actuator, 1)
+    for _ in range(5):
+        playground.update()
+        assert playground.held_elements == {part: element}
+        assert np.allclose(element.position, [100, 122, 0])
+
+
+# Overlaps tracked by collision callbacks match the geometry of the shapes
+def test_overlap_tracking():
+
+    n_overlaps = 0
+
+    for pg_name in ['teleports', 'grasp']:
+
+        agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+        playground = PlaygroundRegister.playgrounds['test'][pg_name]()
+        playground.add_agent(agent)
+
+        engine = Engine(playground, time_limit=500, seed=2)
+
+        while engine.game_on:
+            engine.step(engine.get_actions())
+
+            for element in playground.scene_elements:
+
+                element_shapes = [shape for shape in (element.pm_interaction_shape, element.pm_grasp_shape)
+                                  if shape is not None]
+                overlaps = any(part.pm_visible_shape.shapes_collide(shape).points
+                               for part in agent.parts for shape in element_shapes)
+
+                assert playground._agent_overlaps_with_element(agent, element) == overlaps
+                n_overlaps += overlaps
+
+        playground.remove_agent(agent)
+        assert not playground._overlaps
+        assert not playground._overlapping_agents
+
+    assert n_overlaps > 0
+
+
+# Touching the body of an element is not an overlap with its interaction areas
+def test_body_contact_overlap():
+
+    playground = SingleRoom(size=(200, 200), seed=0)
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    agent.initial_position = [100, 100, 0]
+    playground.add_agent(agent)
+
+    obstacle = Basic([114, 100, 0], default_config_key='circle', radius=5)
+    graspable = Basic([100, 125, 0], default_config_key='circle', radius=5, mass=5,
+                      movable=True, graspable=True, interaction_range=10)
+    playground.add_scene_element(obstacle)
+    playground.add_scene_element(graspable)
+
+    part = agent.base_platform
+    part.apply_action(part.grasp_actuator, 1)
+    playground.update()
+
+    assert agent.base_platform.pm_visible_shape.shapes_collide(obstacle.pm_visible_shape).points
+    assert not playground._agent_overlaps_with_element(agent, obstacle)
+
+    assert not agent.base_platform.pm_visible_shape.shapes_collide(graspable.pm_visible_shape).points
+    assert playground._agent_overlaps_with_element(agent, graspable)
+    assert playground.held_elements == {part: graspable}
+
+    # Removing an element releases it and forgets its overlaps
+    playground.remove_scene_element(graspable)
+    assert not playground.held_elements
+    assert not playground._overlaps
+    assert not playground._overlapping_agents
+
+
+# Scene elements keep their insertion order, and are indexed by shape
+def test_indexed_collections():
+
+    playground = SingleRoom(size=(200, 200))
+    n_walls = len(playground.scene_elements)
+
+    elements = [Basic([50 + 20 * index, 100, 0], default_config_key='circle') for index in range(5)]
+    for element in elements:
+        playground.add_scene_element(element)
+
+    assert playground.scene_elements[n_walls:] == elements
+    assert playground.get_entity_from_shape(elements[2].pm_visible_shape) is elements[2]
+
+    # Elements can be removed while iterating
+    for element in playground.scene_elements:
+        if element in elements[1:3]:
+            playground.remove_scene_element(element)
+
+    assert playground.scene_elements[n_walls:] == [elements[0]] + elements[3:]
+    assert elements[1] not in playground.scene_elements
+    assert playground.get_entity_from_shape(elements[1].pm_visible_shape) is None
+
+    playground.reset()
+    assert len(playground.scene_elements) == n_walls + len(elements)
+    assert all(element in playground.scene_elements for element in elements)
+
+    # Removed elements are discarded from the entities of their producer only
+    field = Field(Candy, production_area=PositionAreaSampler(area_shape='circle', center=[100, 100], radius=50),
+                  probability=1, limit=3)
+    other_field = Field(Candy, production_area=PositionAreaSampler(area_shape='circle', center=[100, 100], radius=50),
+                        probability=0)
+    dispenser = Dispenser([100, 50, 0], entity_produced=Candy)
+    for producer in [field, other_field, dispenser]:
+        playground.add_scene_element(producer)
+
+    playground.update()
+    _, (dispensed,) = dispenser.activate(playground)
+    playground.add_scene_element(dispensed)
+
+    produced = field.produced_entities[0]
+    assert produced.produced_by is field and dispensed.produced_by is dispenser
+    assert elements[0].produced_by is None
+
+    playground.remove_scene_element(produced)
+    playground.remove_scene_element(dispensed)
+    assert produced not in field.produced_entities and len(field.produced_entities) == 0
+    assert dispensed not in dispenser.produced_entities
+
+
+def _build_recorded_playground():
+
+    playground = PlaygroundRegister.playgrounds['test']['basic'](seed=0)
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    agent.add_sensor(Lidar(anchor=agent.base_platform, invisible_elements=agent.parts, name='lidar'))
+    playground.add_agent(agent)
+
+    return playground, agent
+
+
+def test_episode_recording(tmp_path):
+
+    playground, agent = _build_recorded_playground()
+
+    recorder = EpisodeRecorder(tmp_path, chunk_size=7)
+    engine = Engine(playground, time_limit=20, recorder=recorder)
+
+    positions, lidar_values, rewards = [agent.position], [], []
+    while engine.game_on:
+        engine.step(engine.get_actions())
+        engine.update_observations()
+        positions.append(agent.position)
+        lidar_values.append(agent.sensors[0].sensor_values.copy())
+        rewards.append(agent.reward)
+
+    engine.reset()
+    recorder.close()
+
+    replayer = EpisodeReplayer(tmp_path)
+    assert len(replayer) == len(positions) + 1
+    assert replayer[0]['observations'] is None
+    assert replayer[-1]['episode'] == 1
+
+    for index in [1, 7, 13, len(positions) - 1]:
+        step = replayer[index]
+        assert step['timestep'] == index
+        assert step['rewards'][agent.name] == rewards[index - 1]
+        assert (step['observations'][agent.name]['lidar'] == lidar_values[index - 1]).all()
+
+    assert (replayer.read('timestep', 5, 15) == list(range(5, 15))).all()
+
+    # Poses are restored in a new playground, without stepping the physics
+    replay_playground, replay_agent = _build_recorded_playground()
+
+    for index in [3, 12]:
+        replayer.restore(index, replay_playground)
+        assert replay_agent.position == pytest.approx(positions[index])
+
+    image = replayer.generate_frame(12, replay_playground)
+    assert image.shape == (replay_playground.length, replay_playground.width, 3)
+
+
+def _build_facing_engine(recorder=None):
+
+    playground = PlaygroundRegister.playgrounds['test']['basic'](seed=0)
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    agent.add_sensor(Lidar(anchor=agent.base_platform, invisible_elements=agent.parts, name='lidar'))
+    agent.initial_position = [100, 40, math.pi / 2]
+    playground.add_agent(agent)
+
+    hexagon = playground.scene_elements[-1]
+
+    return Engine(playground, time_limit=20, recorder=recorder), agent, hexagon
+
+
+# Entities removed during the recording are not seen by sensors recomputed from restored steps
+def test_restore_removed_element(tmp_path):
+
+    recorder = EpisodeRecorder(tmp_path)
+    engine, agent, hexagon = _build_facing_engine(recorder)
+
+    lidar_values = []
+    for step in range(6):
+        if step == 3:
+            engine.playground.remove_scene_element(hexagon)
+        engine.step({agent: {}})
+        engine.update_observations()
+        lidar_values.append(agent.sensors[0].sensor_values.copy())
+
+    recorder.close()
+    assert not np.array_equal(lidar_values[1], lidar_values[4])
+
+    replayer = EpisodeReplayer(tmp_path)
+    replay_engine, replay_agent, replay_hexagon = _build_facing_engine()
+
+    for index in [5, 2, 4]:
+        present = replayer.restore(index, replay_engine.playground)
+        assert (replay_hexagon in present) == (index < 4)
+        assert (replay_hexagon in replay_engine.playground.scene_elements) == (index < 4)
+
+        replay_engine.update_observations()
+        assert np.array_equal(replay_agent.sensors[0].sensor_values, lidar_values[index - 1])
+
+
+def test_video_recording(tmp_path):
+
+    playground, _ = _build_recorded_playground()
+    engine = Engine(playground, time_limit=30)
+
+    path = str(tmp_path / 'video.mp4')
+    video = engine.start_video(path, queue_size=64, adaptive=False)
+    engine.run()
+    engine.stop_video()
+
+    assert video.captured_frames + video.dropped_frames == engine.elapsed_time
+    assert video.dropped_frames == 0
+
+    capture = cv2.VideoCapture(path)
+    assert capture.get(cv2.CAP_PROP_FRAME_COUNT) == video.captured_frames
+    assert capture.get(cv2.CAP_PROP_FRAME_WIDTH) == playground.width
+
+
+class _StalledWriter:
+    """ VideoWriter which encodes a frame only when it is allowed to. """
+
+    def __init__(self, writer):
+        self._writer = writer
+        self.permits = threading.Semaphore(0)
+
+    def write(self, image):
+        self.permits.acquire()
+        self._writer.write(image)
+
+    def release(self):
+        self._writer.release()
+
+
+def _wait_queue_size(video, queue_size):
+    while video._queue.qsize() != queue_size:
+        time.sleep(0.001)
+
+
+# Adaptive decimation increases once per stall of the encoder, up to a limit, and recovers
+def test_video_decimation(tmp_path):
+
+    surface = pygame.Surface((20, 20))
+    video = VideoRecorder(str(tmp_path / 'video.mp4'), (20, 20), queue_size=2, max_decimation=4)
+    video._writer = _StalledWriter(video._writer)
+
+    # The encoding thread blocks on the first frame, and the next ones fill the queue
+    video.capture(surface)
+    _wait_queue_size(video, 0)
+    video.capture(surface)
+    video.capture(surface)
+
+    for _ in range(5):
+        video.capture(surface)
+    assert video.dropped_frames == 5
+    assert video.decimation == 2
+
+    # After a frame is accepted, the next drop increases the decimation again, up to its limit
+    for _ in range(2):
+        video._writer.permits.release()
+        _wait_queue_size(video, 1)
+        video.capture(surface)
+        video.capture(surface)
+    assert video.dropped_frames == 7
+    assert video.decimation == 4
+
+    # Once the encoder caught up, the decimation goes back to its initial value
+    video._writer.permits.release(100)
+    _wait_queue_size(video, 0)
+    video.capture(surface)
+    assert video.decimation == 2
+    _wait_queue_size(video, 0)
+    video.capture(surface)
+    assert video.decimation == 1
+
+    video.close()
+    assert video.captured_frames == 7
+
+
+# Engines stepped concurrently from an event loop give the same runs as sequential engines
+def test_async_engines():
+
+    def build_engine(seed):
+        playground, agent = _build_recorded_playground()
+        playground.seed(seed)
+        return Engine(playground, time_limit=30), agent
+
+    sequential = []
+    for seed in range(4):
+        engine, agent = build_engine(seed)
+        engine.run()
+        sequential.append(agent.position)
+
+    async def run_engine(engine):
+        while engine.game_on:
+            await engine.astep(engine.get_actions())
+
+    async def run_all(engines):
+        await asyncio.gather(*(run_engine(engine) for engine in engines))
+
+    engines, agents = zip(*(build_engine(seed) for seed in range(4)))
+    asyncio.run(run_all(engines))
+
+    assert [agent.position for agent in agents] == sequential
+
+
+def _make_remote_engine():
+
+    playground, _ = _build_recorded_playground()
+    return Engine(playground, time_limit=20)
+
+
+# Remote engines give the same observations as local engines with the same actions
+def test_remote_engines(tmp_path):
+
+    address = str(tmp_path / 'engines.sock')
+    process = launch_server(_make_remote_engine, n_engines=3, address=address)
+
+    local_engine = _make_remote_engine()
+    local_agent = local_engine.agents[0]
+    local_actuators = local_agent.get_all_actuators()
+
+    with RemoteEngines(address) as engines:
+
+        assert len(engines.engines) == 3
+        remote_agent = engines.engines[1].agents[0]
+        assert [actuator.action for actuator in remote_agent.get_all_actuators()] \
+            == [actuator.action for actuator in local_actuators]
+
+        rng = np.random.default_rng(0)
+
+        while local_engine.game_on:
+
+            values = rng.uniform(-1, 1, len(local_actuators))
+            values[[actuator.action_range is ActionTypes.DISCRETE for actuator in local_actuators]] = 0
+
+            local_engine.step({local_agent: dict(zip(local_actuators, values))})
+            local_engine.update_observations()
+
+            engines.actions[:] = values
+            engines.step_async()
+            engines.step_wait()
+
+            assert (engines.elapsed_time == local_engine.elapsed_time).all()
+            assert np.array_equal(remote_agent.sensors[0].sensor_values, local_agent.sensors[0].sensor_values)
+
+        assert not engines.game_on.any()
+
+        # Single engines have the interface of a local engine
+        engines.engines[1].reset()
+        assert engines.engines[1].game_on and engines.engines[1].elapsed_time == 0
+        assert engines.elapsed_time[0] == local_engine.elapsed_time
+
+        engines.engines[1].step({remote_agent: {remote_agent.get_all_actuators()[0]: 1}})
+        assert engines.engines[1].elapsed_time == 1
+
+    process.join(timeout=10)
+    assert process.exitcode == 0
+    assert not os.path.exists(address)
+
+    # A socket file left by a crashed server doesn't prevent a new server from binding the address
+    stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale_socket.bind(address)
+    stale_socket.close()
+
+    process = launch_server(_make_remote_engine, n_engines=3, address=address)
+
+    with RemoteEngines(address, max_pending=3) as engines:
+
+        # Queued requests are answered in order
+        masks = np.tril(np.ones((3, 3), dtype=bool))
+        for mask in masks:
+            engines.step_async(mask=mask)
+
+        with pytest.raises(ValueError):
+            engines.step_async()
+
+        for expected_time in np.cumsum(masks, axis=0):
+            engines.step_wait()
+            assert engines.elapsed_time.tolist() == expected_time.tolist()
+
+    process.join(timeout=10)
+    assert process.exitcode == 0
+
+
+def test_physics_threads():
+
+    playground = SingleRoom(size=(200, 200), physics_threads=2)
+    assert playground.space.threads == 2
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=50)
+    engine.run()
+
+    assert 0 < agent.position[0] < playground.size[0]
+    assert 0 < agent.position[1] < playground.size[1]
+
+    with pytest.raises(ValueError):
+        SingleRoom(physics_threads=4)
+
+
+def _forward_trajectory(adaptive):
+
+    playground = SingleRoom(size=(600, 600), seed=0)
+    if adaptive:
+        playground.configure_substeps(adaptive=True, min_substeps=2, max_substeps=20)
+
+    agent = BaseAgent(controller=Random(), interactive=False, platform=ForwardPlatform)
+    agent.initial_position = [150, 300, 0]
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=100)
+    platform = agent.base_platform
+
+    trajectory = []
+    for step in range(60):
+        actions = {platform.longitudinal_force_actuator: 1,
+                   platform.angular_velocity_actuator: 0.3 if step >= 30 else 0}
+        engine.step({agent: actions})
+        trajectory.append(agent.position)
+
+    return np.array(trajectory), playground
+
+
+def test_adaptive_substeps():
+
+    fixed_trajectory, playground = _forward_trajectory(adaptive=False)
+    assert playground.substep_counts == {10: 60}
+
+    adaptive_trajectory, playground = _forward_trajectory(adaptive=True)
+    assert sum(playground.substep_counts.values()) == 60
+    assert all(2 <= substeps <= 20 for substeps in playground.substep_counts)
+    assert playground.substep_counts[10] < 60
+
+    # Actions transmit the same impulse whatever the number of substeps
+    travelled = np.linalg.norm(fixed_trajectory[-1, :2] - fixed_trajectory[0, :2])
+    assert travelled > 100
+    assert np.abs(fixed_trajectory - adaptive_trajectory).max() < 0.02 * travelled
+
+    # Fast bodies require more substeps
+    agent = playground.agents[0]
+    agent.base_platform.pm_body.velocity = (100 * playground.min_shape_size, 0)
+    playground.update()
+    assert playground.substeps == 20
+
+    with pytest.raises(ValueError):
+        playground.configure_substeps(adaptive=True, min_substeps=4, max_substeps=2)
+
+
+def test_sleeping_elements():
+
+    playground = SingleRoom(size=(200, 200), seed=0)
+    playground.configure_sleeping(idle_speed=0.1, sleep_time=5)
+
+    element = Basic([100, 100, 0], default_config_key='circle', radius=10, mass=5, movable=True)
+    playground.add_scene_element(element)
+
+    for _ in range(10):
+        playground.update()
+    assert playground.sleeping_elements == [element]
+
+    # A static element following waypoints wakes up the sleeping elements it moves onto
+    trajectory = Trajectory('waypoints', trajectory_duration=20, waypoints=[[100, 40], [100, 160]])
+    obstacle = Basic(trajectory, default_config_key='square', radius=10)
+    playground.add_scene_element(obstacle)
+
+    positions = []
+    for _ in range(20):
+        playground.update()
+        positions.append(element.position)
+
+    assert positions[0] != positions[-1]
+
+    # Grasped elements are woken up, and held elements never sleep
+    playground = PlaygroundRegister.playgrounds['test']['grasp'](seed=0)
+    playground.configure_sleeping(idle_speed=0.1, sleep_time=5)
+
+    for _ in range(20):
+        playground.update()
+    assert len(playground.sleeping_elements) == len([elem for elem in playground.scene_elements if elem.movable])
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    playground.add_agent(agent)
+    engine = Engine(playground, time_limit=300, seed=0)
+
+    n_grasped_sleeping = 0
+    while engine.game_on:
+        sleeping_elements = set(playground.sleeping_elements)
+        engine.step(engine.get_actions())
+
+        for element in playground.held_elements.values():
+            assert element not in playground.sleeping_elements
+            n_grasped_sleeping += element in sleeping_elements
+
+    assert n_grasped_sleeping > 0
+
+
+def test_spatial_hash_broadphase():
+
+    playground = PlaygroundRegister.playgrounds['test']['contacts'](seed=0)
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    agent.add_sensor(Lidar(anchor=agent.base_platform, invisible_elements=agent.parts, normalize=False))
+    playground.add_agent(agent)
+
+    assert playground.configure_broadphase('tree') is None
+
+    cell_size, count = playground.configure_broadphase()
+    assert playground.broadphase == 'spatial_hash'
+    assert 1 <= cell_size < max(playground.size)
+
+    # Cells are twice as large as the typical movable shape
+    sizes = sorted(max(shape.bb.right - shape.bb.left, shape.bb.top - shape.bb.bottom)
+                   for shape in playground.space.shapes
+                   if not shape.sensor and shape.body.body_type != shape.body.STATIC)
+    assert cell_size == pytest.approx(2 * sizes[len(sizes) // 2])
+    assert count >= 10 * len(playground.space.shapes)
+
+    engine = Engine(playground, time_limit=50)
+    engine.run()
+
+    assert 0 < agent.position[0] < playground.size[0]
+    assert 0 < agent.position[1] < playground.size[1]
+    assert agent.sensors[0].sensor_values.min() < agent.sensors[0]._range
+
+    with pytest.raises(ValueError):
+        playground.configure_broadphase('tree')
@@ -1,13 +1,20 @@
+import numpy as np
+import pygame
+import pytest
+
 
 from simple_playgrounds.agents.sensors import RgbCamera, GreyCamera, Lidar,\
     Touch, SemanticRay, SemanticCones, TopdownSensor
 
+from simple_playgrounds.agents.sensors.noise import NoisePool
 from simple_playgrounds.agents.controllers import Random
-from simple_playgrounds.agents import BaseAgent
+from simple_playgrounds.agents import BaseAgent, HeadAgent
 from simple_playgrounds.agents.parts import ForwardPlatform
 from simple_playgrounds import Engine
 
 from simple_playgrounds.playground import PlaygroundRegister
+from simple_playgrounds.playgrounds.scene_elements import Door
+from simple_playgrounds.utils.static_geometry import StaticGeometry
 
 # Add/remove agent from a playground
 
@@ -49,3 +56,312 @@ def test_camera_sensors():
 
         playground.remove_agent(agent)
         playground.reset()
+
+
+def test_sensor_buffers():
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+
+    lidar = Lidar(anchor=agent.base_platform, invisible_elements=agent.parts,
+                  resolution=32, max_range=100, fov=180, dtype='float32')
+    topdown = TopdownSensor(anchor=agent.base_platform, invisible_elements=agent.parts,
+                            resolution=32, max_range=100, fov=180, normalize=False, dtype='uint8',
+                            noise_params={'type': 'salt_pepper', 'probability': 0.1})
+    agent.add_sensor(lidar)
+    agent.add_sensor(topdown)
+
+    playground = PlaygroundRegister.playgrounds['test']['basic']()
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=10)
+    engine.update_observations()
+    lidar_buffer, topdown_buffer = lidar.sensor_values, topdown.sensor_values
+
+    engine.run()
+
+    assert lidar.sensor_values is lidar_buffer
+    assert topdown.sensor_values is topdown_buffer
+    assert lidar.sensor_values.dtype == np.float32
+    assert topdown.sensor_values.dtype == np.uint8
+
+    with pytest.raises(ValueError):
+        TopdownSensor(anchor=agent.base_platform, resolution=32, max_range=100, fov=180,
+                      normalize=True, dtype='uint8')
+
+
+def test_sensor_update_period():
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+
+    lidar = Lidar(anchor=agent.base_platform, invisible_elements=agent.parts, name='lidar')
+    topdown = TopdownSensor(anchor=agent.base_platform, invisible_elements=agent.parts,
+                            resolution=32, max_range=100, fov=180, name='topdown',
+                            update_period=4, update_phase=1)
+    agent.add_sensor(lidar)
+    agent.add_sensor(topdown)
+
+    playground = PlaygroundRegister.playgrounds['test']['basic']()
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=20)
+
+    topdown_updates = []
+    while engine.game_on:
+        engine.step(engine.get_actions())
+        engine.update_observations()
+
+        staleness = engine.get_observations_staleness()[agent]
+        assert staleness['lidar'] == 0
+        if staleness['topdown'] == 0:
+            topdown_updates.append(engine.elapsed_time)
+
+    assert topdown_updates == [1, 5, 9, 13, 17]
+
+    engine.reset()
+    assert engine.get_observations_staleness()[agent]['topdown'] is None
+
+    with pytest.raises(ValueError):
+        Lidar(anchor=agent.base_platform, update_period=2, update_phase=2)
+
+
+def test_sensor_noise_pool():
+
+    pools = [NoisePool(rng=np.random.default_rng(7), block_size=100) for _ in range(2)]
+
+    # Draws larger than the block, and across block boundaries, are reproducible
+    for shape in [(64,), (32, 32, 3), (10,)]:
+        assert np.array_equal(pools[0].standard_normal(shape), pools[1].standard_normal(shape))
+        assert np.array_equal(pools[0].uniform(shape), pools[1].uniform(shape))
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+
+    lidar = Lidar(anchor=agent.base_platform, invisible_elements=agent.parts, resolution=1000,
+                  normalize=False, noise_params={'type': 'salt_pepper', 'probability': 0.2})
+    camera = RgbCamera(anchor=agent.base_platform, invisible_elements=agent.parts,
+                       noise_params={'type': 'gaussian', 'scale': 10})
+    agent.add_sensor(lidar)
+    agent.add_sensor(camera)
+
+    assert lidar.noise_pool is camera.noise_pool is agent.sensor_noise_pool
+
+    playground = PlaygroundRegister.playgrounds['test']['basic']()
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=10)
+    engine.run()
+
+    assert 0 <= camera.sensor_values.min() and camera.sensor_values.max() <= 1
+    corrupted = np.mean((lidar.sensor_values == 0) | (lidar.sensor_values == lidar._range))
+    assert corrupted > 0.1
+
+
+def test_sensor_slots():
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+
+    sensors = [sensor_class(anchor=agent.base_platform, invisible_elements=agent.parts)
+               for sensor_class in [RgbCamera, GreyCamera, Lidar, Touch, SemanticRay, SemanticCones]]
+    sensors.append(TopdownSensor(anchor=agent.base_platform, resolution=32, max_range=100, fov=180))
+
+    for sensor in sensors:
+        assert not hasattr(sensor, '__dict__')
+
+    # Sensors which are not attached to an agent create their noise pool when noise is first applied
+    lidar = Lidar(anchor=agent.base_platform, invisible_elements=agent.parts,
+                  noise_params={'type': 'gaussian', 'scale': 1})
+    assert lidar.noise_pool is None
+
+    playground = PlaygroundRegister.playgrounds['test']['basic']()
+    playground.add_agent(agent)
+    lidar.update(playground=playground)
+
+    assert lidar.noise_pool is not None
+
+
+def test_semantic_structured():
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+
+    sensors = {}
+    for structured in [False, True]:
+        sensors['ray', structured] = SemanticRay(anchor=agent.base_platform, invisible_elements=agent.parts,
+                                                 structured=structured)
+        sensors['cone', structured] = SemanticCones(anchor=agent.base_platform, invisible_elements=agent.parts,
+                                                    structured=structured)
+    for sensor in sensors.values():
+        agent.add_sensor(sensor)
+
+    playground = PlaygroundRegister.playgrounds['test']['basic']()
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=20)
+
+    while engine.game_on:
+        engine.step(engine.get_actions())
+        engine.update_observations()
+
+        for sensor_type in ['ray', 'cone']:
+
+            detections = sensors[sensor_type, False].sensor_values
+            array = sensors[sensor_type, True].sensor_values
+            n_detections = sensors[sensor_type, True].n_detections
+
+            assert n_detections == len(detections) > 0
+            assert np.all(array['entity_id'][n_detections:] == -1)
+
+            for detection, row in zip(detections, array[:n_detections]):
+                assert detection.entity.entity_id == row['entity_id']
+                assert np.isclose(detection.distance, row['distance'])
+                assert np.isclose(detection.angle, row['angle'])
+
+                distance = np.linalg.norm(row['relative_position'])
+                assert distance <= sensors[sensor_type, True]._range + detection.entity.radius + 1
+
+
+def test_static_geometry():
+
+    for seed in range(5):
+
+        agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+
+        sensors = {}
+        for static_geometry in [False, True]:
+            sensors['lidar', static_geometry] = Lidar(anchor=agent.base_platform, invisible_elements=agent.parts,
+                                                      resolution=360, fov=360, max_range=300,
+                                                      static_geometry=static_geometry)
+            sensors['rgb', static_geometry] = RgbCamera(anchor=agent.base_platform, invisible_elements=agent.parts,
+                                                        resolution=360, fov=360, max_range=300,
+                                                        static_geometry=static_geometry)
+        for sensor in sensors.values():
+            agent.add_sensor(sensor)
+
+        playground = PlaygroundRegister.playgrounds['test']['doors'](seed=seed)
+        playground.add_agent(agent)
+
+        engine = Engine(playground, time_limit=50)
+
+        while engine.game_on:
+            engine.step(engine.get_actions())
+
+            # Opening and closing doors updates the static geometry
+            n_static_occluders = len(playground.static_geometry.shapes)
+            door = [elem for elem in playground._static_occluders if isinstance(elem, Door)][0]
+            playground.remove_scene_element(door)
+            assert len(playground.static_geometry.shapes) == n_static_occluders - 1
+            engine.update_observations()
+            playground.add_scene_element(door)
+            assert len(playground.static_geometry.shapes) == n_static_occluders
+            assert set(playground.dynamic_shapes) \
+                == set(playground.space.shapes) - set(playground.static_geometry.shapes)
+
+            # Static geometry follows the rules of pymunk space queries
+            assert np.allclose(sensors['lidar', True].sensor_values, sensors['lidar', False].sensor_values)
+            assert np.array_equal(sensors['rgb', True].sensor_values, sensors['rgb', False].sensor_values)
+
+
+def test_touch_contacts():
+
+    agent = BaseAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+
+    touch = Touch(anchor=agent.base_platform, invisible_elements=agent.parts,
+                  resolution=64, max_range=10, normalize=False)
+    lidar = Lidar(anchor=agent.base_platform, invisible_elements=agent.parts,
+                  resolution=64, fov=360, max_range=agent.base_platform.radius + 10, normalize=False)
+    agent.add_sensor(touch)
+    agent.add_sensor(lidar)
+
+    playground = PlaygroundRegister.playgrounds['test']['contacts'](seed=0)
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=100)
+
+    n_rays, n_grazing = 0, 0
+
+    while engine.game_on:
+        engine.step(engine.get_actions())
+        engine.update_observations()
+
+        # Skin deformation computed by casting rays with pymunk
+        ray_values = 10 - np.clip(lidar.sensor_values - agent.base_platform.radius, 0, None)
+
+        differences = touch.sensor_values - ray_values
+        assert np.all(differences > -1e-3)
+
+        # Pymunk broadphase misses grazing hits, which the analytic intersection detects:
+        # only the radius of these rays reaches a shape, their center line misses all of them
+        grazing = differences > 1e-3
+        if grazing.any():
+            angles = agent.base_platform.pm_body.angle + touch._ray_angles
+            directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+            geometry = StaticGeometry(touch._get_touched_shapes(playground), match_space_queries=False)
+            center_distances = geometry.distances(agent.base_platform.pm_body.position, directions,
+                                                  touch._range, radius=0)[::-1]
+            assert np.all(np.isinf(center_distances[grazing]))
+
+        n_rays += grazing.size
+        n_grazing += grazing.sum()
+
+    assert n_grazing / n_rays < 0.03
+
+
+def test_shared_frame():
+
+    agents = [HeadAgent(controller=Random(), interactive=True, platform=ForwardPlatform) for _ in range(2)]
+
+    for agent in agents:
+        agent.add_sensor(TopdownSensor(anchor=agent.base_platform, invisible_elements=agent.parts,
+                                       fov=360, resolution=64, max_range=100))
+
+    playground = PlaygroundRegister.playgrounds['test']['grasp']()
+    for agent in agents:
+        playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=20)
+
+    while engine.game_on:
+        engine.step(engine.get_actions())
+        engine.update_observations()
+
+        frame = engine._frame
+
+        for agent in agents:
+
+            # Masking gives the same image as drawing the scene without the invisible elements
+            reference = engine._surface_background.copy()
+            for entity, mask, rect in frame.layers:
+                if entity not in agent.parts:
+                    reference.blit(mask, rect)
+
+            masked = frame.get_masked_surface(set(agent.parts))
+            assert np.array_equal(pygame.surfarray.array3d(masked), pygame.surfarray.array3d(reference))
+
+
+def test_topdown_surface_formats():
+
+    agent = HeadAgent(controller=Random(), interactive=True, platform=ForwardPlatform)
+    sensor = TopdownSensor(anchor=agent.base_platform, invisible_elements=agent.parts,
+                           fov=360, resolution=64, max_range=100, normalize=False)
+    agent.add_sensor(sensor)
+
+    playground = PlaygroundRegister.playgrounds['test']['grasp']()
+    playground.add_agent(agent)
+
+    engine = Engine(playground, time_limit=20)
+
+    while engine.game_on:
+        engine.step(engine.get_actions())
+        engine.update_observations()
+
+        frame = engine._frame
+        values_32_bits = sensor.sensor_values.copy()
+
+        # Surfaces without a 32-bit layout are sampled from their RGB pixels
+        surface, masked_surface = frame.surface, frame._masked_surface
+        frame.surface = pygame.Surface(surface.get_size(), depth=24)
+        frame.surface.blit(surface, (0, 0))
+        frame._masked_surface = pygame.Surface(surface.get_size(), depth=24)
+
+        sensor._compute_raw_sensor(playground, frame)
+        assert np.array_equal(sensor.sensor_values, values_32_bits)
+
+        frame.surface, frame._masked_surface = surface, masked_surface